@@ -0,0 +1,66 @@
+"""
+Mesure l'empreinte mémoire d'une population de personnes selon sa représentation :
+objets avec __dict__ (ancienne Personne), objets Personne à __slots__ et PersonneTable.
+
+Usage: python -m benchmarks.bench_memoire [nb_personnes]
+"""
+import sys
+import tracemalloc
+
+import numpy as np
+
+from src.gpe.models.personne import Personne, PersonneTable
+
+
+class PersonneAvecDict:
+    # Même structure que Personne avant l'ajout de __slots__
+
+    def __init__(self, nom, age, revenu_annuel, loyer, depenses_mensuelles, objectif, duree_epargne,
+                 versement_mensuel_utilisateur=0):
+        self.nom = nom
+        self.age = age
+        self.revenu_annuel = revenu_annuel
+        self.loyer = loyer
+        self.depenses_mensuelles = depenses_mensuelles
+        self.objectif = objectif
+        self.duree_epargne = duree_epargne
+        self.versement_mensuel_utilisateur = versement_mensuel_utilisateur
+
+
+def generer_colonnes(nb_personnes: int, graine: int = 0):
+    rng = np.random.default_rng(graine)
+    return (
+        [f"Client {i}" for i in range(nb_personnes)],
+        rng.integers(18, 80, nb_personnes).tolist(),
+        rng.normal(32000, 8000, nb_personnes).tolist(),
+        rng.normal(800, 200, nb_personnes).tolist(),
+        rng.normal(700, 150, nb_personnes).tolist(),
+        rng.normal(100000, 30000, nb_personnes).tolist(),
+        rng.integers(1, 40, nb_personnes).tolist(),
+        rng.normal(300, 100, nb_personnes).tolist(),
+    )
+
+
+def mesurer(construire) -> int:
+    tracemalloc.start()
+    objet = construire()
+    taille, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objet
+    return taille
+
+
+def main(nb_personnes: int = 1_000_000):
+    colonnes = generer_colonnes(nb_personnes)
+    mesures = {
+        "Personne avec __dict__": mesurer(lambda: [PersonneAvecDict(*v) for v in zip(*colonnes)]),
+        "Personne avec __slots__": mesurer(lambda: [Personne(*v) for v in zip(*colonnes)]),
+        "PersonneTable": mesurer(lambda: PersonneTable(*colonnes)),
+    }
+    print(f"{nb_personnes} personnes (hors valeurs partagées : noms, nombres déjà alloués)")
+    for representation, taille in mesures.items():
+        print(f"{representation:<25} {taille / 1e6:>10.1f} Mo  {taille / nb_personnes:>8.1f} octets/personne")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
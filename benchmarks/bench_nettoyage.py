@@ -0,0 +1,66 @@
+"""
+Compare le nettoyage vectorisé de nettoyer_dataframe_personne au nettoyage ligne à ligne
+(apply de nettoyer_valeur_manquante puis de convertir_en_float / convertir_en_int).
+
+Usage: python -m benchmarks.bench_nettoyage [nb_lignes]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.gpe.utils import nettoyer_dataframe_personne, nettoyer_valeur_manquante, convertir_en_float, convertir_en_int
+
+
+def generer_personnes_sales(nb_lignes: int, graine: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(graine)
+    df = pd.DataFrame({
+        "nom": [f"Client {i}" for i in range(nb_lignes)],
+        "age": rng.integers(18, 80, nb_lignes).astype(object),
+        "revenu_annuel": rng.normal(32000, 8000, nb_lignes).round(2).astype(object),
+        "loyer": rng.normal(800, 200, nb_lignes).round(2).astype(object),
+        "depenses_mensuelles": rng.normal(700, 150, nb_lignes).round(2).astype(object),
+        "versement_mensuel_utilisateur": rng.normal(300, 100, nb_lignes).round(2).astype(object),
+        "objectif": rng.normal(100000, 30000, nb_lignes).round(2),
+        "duree_epargne": rng.integers(1, 40, nb_lignes),
+    })
+    # Environ 1% de valeurs manquantes sous forme de texte
+    for col in ["age", "revenu_annuel", "loyer", "depenses_mensuelles", "versement_mensuel_utilisateur"]:
+        sales = rng.random(nb_lignes) < 0.01
+        df.loc[sales, col] = rng.choice(["None", ""], sales.sum())
+    return df
+
+
+def nettoyer_ligne_a_ligne(df: pd.DataFrame) -> pd.DataFrame:
+    df_clean = df.copy()
+    for col in df_clean.columns:
+        df_clean[col] = df_clean[col].apply(nettoyer_valeur_manquante)
+    for col in ["revenu_annuel", "loyer", "depenses_mensuelles", "versement_mensuel_utilisateur"]:
+        df_clean[col] = df_clean[col].apply(convertir_en_float)
+    df_clean["age"] = df_clean["age"].apply(convertir_en_int)
+    df_clean["age"] = df_clean["age"].astype("Int64" if df_clean["age"].isna().any() else int)
+    return df_clean
+
+
+def chronometrer(fonction, df: pd.DataFrame, repetitions: int = 3) -> float:
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction(df)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main(nb_lignes: int = 1_000_000):
+    df = generer_personnes_sales(nb_lignes)
+    t_ligne = chronometrer(nettoyer_ligne_a_ligne, df)
+    t_vecteur = chronometrer(nettoyer_dataframe_personne, df)
+    print(f"{nb_lignes} lignes")
+    print(f"Ligne à ligne : {t_ligne:.3f} s")
+    print(f"Vectorisé     : {t_vecteur:.3f} s")
+    print(f"Accélération  : x{t_ligne / t_vecteur:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
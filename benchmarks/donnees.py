@@ -0,0 +1,55 @@
+"""
+Génère des fichiers CSV synthétiques de personnes et de produits d'épargne pour les benchmarks.
+
+Usage: python -m benchmarks.donnees dossier [nb_lignes ...]
+"""
+import sys
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_nettoyage import generer_personnes_sales
+
+
+def generer_epargnes(nb_lignes: int, graine: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(graine)
+    versement_max = rng.integers(1, 200, nb_lignes) * 1000.0
+    # Environ un tiers des produits sans plafond de versement
+    versement_max[rng.random(nb_lignes) < 0.3] = np.nan
+    return pd.DataFrame({
+        "nom": [f"Produit {i}" for i in range(nb_lignes)],
+        "taux_interet": rng.uniform(0.0, 0.08, nb_lignes).round(4),
+        "fiscalite": rng.choice([0.0, 0.172, 0.3], nb_lignes),
+        "duree_min": rng.choice([0, 0, 0, 4, 5, 8], nb_lignes),
+        "versement_max": versement_max,
+    })
+
+
+def generer_fichiers(dossier: str, nb_lignes: int, graine: int = 0) -> Tuple[Path, Path]:
+    """
+    Écrit personnes_<nb_lignes>.csv et epargnes_<nb_lignes>.csv dans dossier.
+
+    Les personnes contiennent environ 1 % de valeurs manquantes par colonne numérique, sous
+    forme de 'None' ou de cellule vide, comme les fichiers clients réels.
+
+    Returns:
+        Tuple[Path, Path]: Chemins des fichiers de personnes et de produits d'épargne
+    """
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    personnes_csv = dossier / f"personnes_{nb_lignes}.csv"
+    epargnes_csv = dossier / f"epargnes_{nb_lignes}.csv"
+    generer_personnes_sales(nb_lignes, graine).to_csv(personnes_csv, index=False)
+    generer_epargnes(nb_lignes, graine).to_csv(epargnes_csv, index=False)
+    return personnes_csv, epargnes_csv
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    for nb in [int(n) for n in sys.argv[2:]] or [1_000, 100_000, 1_000_000]:
+        for chemin in generer_fichiers(sys.argv[1], nb):
+            print(chemin)
@@ -0,0 +1,221 @@
+"""
+Suite de benchmarks de la chaîne complète : import, nettoyage, calcul des intérêts, suggestions
+et écriture du rapport, sur des données synthétiques de plusieurs tailles.
+
+Chaque étape est chronométrée (meilleur temps sur plusieurs répétitions), puis rejouée une fois
+sous tracemalloc pour relever son pic mémoire. Les mesures sont écrites dans un fichier JSON qui
+sert de référence : --comparer signale les étapes plus lentes qu'une référence précédente.
+
+Usage:
+    python -m benchmarks.suite [--tailles 1000 100000 1000000] [--sortie mesures.json]
+                               [--comparer reference.json] [--tolerance 0.2]
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.donnees import generer_fichiers
+from src.gpe.core import (import_personnes, import_epargnes, suggestion_epargne, suggestion_epargne_batch,
+                          suggestion_epargne_flux, iter_personnes)
+from src.gpe.rapport import EcrivainRapport
+from src.gpe.utils import calcul_interets_composes, nettoyer_dataframe_personne, nettoyer_dataframe_epargne
+
+TAILLES = [1_000, 100_000, 1_000_000]
+
+# Taille du catalogue utilisé pour les suggestions, proche de celui de src/gpe/data/epargnes.csv
+NB_PRODUITS_CATALOGUE = 12
+
+# suggestion_epargne évalue une personne à la fois : on la mesure sur un échantillon
+NB_PERSONNES_SCALAIRE = 10_000
+
+# Les résultats du rapport sont gardés en mémoire avant d'être écrits : échantillon borné
+NB_PERSONNES_RAPPORT = 100_000
+
+TAILLE_BLOC = 10_000
+
+
+class Etape:
+    """
+    Une étape mesurée : preparer() est appelé hors chronomètre et renvoie l'argument de executer().
+    """
+
+    def __init__(self, nom: str, executer: Callable, preparer: Callable[[], object] = lambda: None,
+                 elements: Optional[int] = None):
+        self.nom = nom
+        self.executer = executer
+        self.preparer = preparer
+        self.elements = elements
+
+
+def chronometrer(etape: Etape, repetitions: int) -> float:
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        argument = etape.preparer()
+        debut = time.perf_counter()
+        etape.executer(argument)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def pic_memoire(etape: Etape) -> int:
+    argument = etape.preparer()
+    resultat = None
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        resultat = etape.executer(argument)
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultat
+    return pic - base
+
+
+def etapes(personnes_csv: Path, epargnes_csv: Path, dossier: Path, nb_lignes: int) -> List[Etape]:
+    personnes_brutes = pd.read_csv(personnes_csv)
+    epargnes_brutes = pd.read_csv(epargnes_csv)
+    catalogue = import_epargnes(str(epargnes_csv))[:NB_PRODUITS_CATALOGUE]
+    personnes = import_personnes(str(personnes_csv))
+    echantillon_scalaire = personnes[:NB_PERSONNES_SCALAIRE]
+    echantillon_rapport = personnes[:NB_PERSONNES_RAPPORT]
+    del personnes
+
+    rng = np.random.default_rng(0)
+    versements = rng.uniform(100, 20_000, nb_lignes)
+    taux = rng.uniform(0.0, 0.08, nb_lignes)
+    durees = rng.integers(1, 40, nb_lignes)
+
+    def suggestions_scalaires(_):
+        for personne in echantillon_scalaire:
+            suggestion_epargne(personne, catalogue, personne.objectif, personne.duree_epargne)
+
+    def suggestions_en_flux(_):
+        # Les résultats de chaque bloc sont abandonnés aussitôt, pour borner la mémoire à 1M personnes
+        for _, resultats in suggestion_epargne_flux(iter_personnes(str(personnes_csv), TAILLE_BLOC), catalogue):
+            pass
+
+    def ecrire(resultats):
+        with EcrivainRapport(str(dossier / "rapport.txt")) as ecrivain:
+            ecrivain.ecrire(echantillon_rapport, resultats)
+
+    return [
+        Etape("import_personnes", lambda _: import_personnes(str(personnes_csv)), elements=nb_lignes),
+        Etape("import_epargnes", lambda _: import_epargnes(str(epargnes_csv)), elements=nb_lignes),
+        Etape("nettoyer_dataframe_personne", nettoyer_dataframe_personne,
+              preparer=personnes_brutes.copy, elements=nb_lignes),
+        Etape("nettoyer_dataframe_epargne", nettoyer_dataframe_epargne,
+              preparer=epargnes_brutes.copy, elements=nb_lignes),
+        Etape("calcul_interets_composes", lambda _: calcul_interets_composes(versements, taux, durees),
+              elements=nb_lignes),
+        Etape("suggestion_epargne", suggestions_scalaires, elements=len(echantillon_scalaire)),
+        Etape("suggestion_epargne_batch", lambda _: suggestion_epargne_batch(echantillon_rapport, catalogue),
+              elements=len(echantillon_rapport)),
+        Etape("import_et_suggestions_en_flux", suggestions_en_flux, elements=nb_lignes),
+        Etape("rapport_texte", ecrire, preparer=lambda: suggestion_epargne_batch(echantillon_rapport, catalogue),
+              elements=len(echantillon_rapport)),
+    ]
+
+
+def mesurer_taille(nb_lignes: int, repetitions: int) -> Dict[str, dict]:
+    mesures = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        personnes_csv, epargnes_csv = generer_fichiers(dossier, nb_lignes)
+        for etape in etapes(personnes_csv, epargnes_csv, Path(dossier), nb_lignes):
+            temps = chronometrer(etape, repetitions)
+            mesures[etape.nom] = {
+                "temps_s": temps,
+                "pic_memoire_octets": pic_memoire(etape),
+                "elements": etape.elements,
+            }
+            print(f"{nb_lignes:>9} {etape.nom:<32} {temps:>10.4f} s "
+                  f"{mesures[etape.nom]['pic_memoire_octets'] / 1e6:>10.1f} Mo", flush=True)
+    return mesures
+
+
+def metadonnees() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plateforme": platform.platform(),
+    }
+
+
+def comparer(mesures: dict, reference: dict, tolerance: float) -> List[str]:
+    """
+    Compare les temps à ceux d'une référence.
+
+    Returns:
+        List[str]: Les étapes en régression, plus lentes que la référence au-delà de tolerance
+    """
+    regressions = []
+    print(f"\n{'Taille':>9} {'Étape':<32} {'Référence':>10} {'Actuel':>10} {'Rapport':>8}")
+    for taille, etapes_mesurees in mesures["mesures"].items():
+        for nom, mesure in etapes_mesurees.items():
+            ancienne = reference.get("mesures", {}).get(taille, {}).get(nom)
+            if ancienne is None:
+                continue
+            rapport = mesure["temps_s"] / ancienne["temps_s"]
+            regression = rapport > 1 + tolerance
+            if regression:
+                regressions.append(f"{taille}/{nom}")
+            print(f"{taille:>9} {nom:<32} {ancienne['temps_s']:>10.4f} {mesure['temps_s']:>10.4f} "
+                  f"{rapport:>7.2f}x{'  RÉGRESSION' if regression else ''}")
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de la chaîne import → suggestions → rapport.")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES, help="Nombres de lignes générées")
+    parser.add_argument("--repetitions", type=int, default=3,
+                        help="Répétitions par étape (une seule au-delà de 100 000 lignes)")
+    parser.add_argument("--sortie", default="mesures_benchmarks.json", help="Fichier JSON des mesures")
+    parser.add_argument("--comparer", default=None, metavar="REFERENCE",
+                        help="Fichier JSON de référence auquel comparer les temps")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Ralentissement relatif toléré avant de signaler une régression")
+    args = parser.parse_args(arguments)
+
+    # Les messages d'import fausseraient les mesures et noieraient le tableau
+    logging.getLogger("src.gpe").setLevel(logging.ERROR)
+
+    mesures = {"meta": metadonnees(), "mesures": {}}
+    for nb_lignes in args.tailles:
+        repetitions = args.repetitions if nb_lignes <= 100_000 else 1
+        mesures["mesures"][str(nb_lignes)] = mesurer_taille(nb_lignes, repetitions)
+
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(mesures, f, indent=2)
+    print(f"Mesures écrites dans {args.sortie}")
+
+    if args.comparer is not None:
+        with open(args.comparer, encoding="utf-8") as f:
+            regressions = comparer(mesures, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} régression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
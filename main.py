@@ -1,9 +1,26 @@
+import argparse
+import cProfile
+import logging
 import sys
 from pathlib import Path
+from typing import List, Optional
 
-from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne
+from src.gpe.cache import CacheImports
+from src.gpe.core import import_personnes, import_epargnes, iter_personnes, suggestion_epargne_batch, suggestion_epargne_flux
+from src.gpe.models.epargne import EpargneIndex
+from src.gpe.models.personne import Personne
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.parallele import suggestion_epargne_parallele
+from src.gpe import profilage
+from src.gpe.rapport import EcrivainRapport, ecrire_rapport
 
-def main():
+def afficher_suggestions(personnes: List[Personne], resultats: ResultatsEpargne):
+    # Rapport texte formaté en masse et écrit d'un bloc sur la sortie standard
+    ecrire_rapport(personnes, resultats)
+
+def main(taille_bloc: Optional[int] = None, nb_processus: Optional[int] = None, dossier_cache: Optional[str] = None,
+         top_k: Optional[int] = None, rapport: Optional[str] = None, par_personne: bool = False,
+         format_rapport: Optional[str] = None):
     # Définir les chemins des fichiers
     current_dir = Path(__file__).parent
     personnes_csv = current_dir / "src" / "gpe" / "data" / "personnes.csv"
@@ -17,47 +34,87 @@ def main():
         print(f"Erreur: Le fichier {epargnes_csv} n'existe pas.")
         sys.exit(1)
 
+    # Cache optionnel des imports nettoyés
+    cache = CacheImports(dossier_cache) if dossier_cache is not None else None
+
+    # Mode flux : les personnes sont lues, évaluées et affichées bloc par bloc
+    if taille_bloc is not None:
+        try:
+            epargnes = EpargneIndex(import_epargnes(str(epargnes_csv), cache=cache))
+            blocs = iter_personnes(str(personnes_csv), taille_bloc=taille_bloc)
+            with EcrivainRapport(rapport, format=format_rapport, par_personne=par_personne) as ecrivain:
+                for personnes, resultats in suggestion_epargne_flux(blocs, epargnes, top_k=top_k):
+                    ecrivain.ecrire(personnes, resultats)
+        except Exception as e:
+            print(f"Erreur lors du chargement des données: {e}")
+            sys.exit(1)
+        return
+
     # Charger les données
     try:
-        personnes = import_personnes(str(personnes_csv))
-        epargnes = import_epargnes(str(epargnes_csv))
+        with profilage.etape("chargement"):
+            personnes = import_personnes(str(personnes_csv), cache=cache)
+            # Catalogue indexé une fois, pour écarter les produits qu'aucune durée n'atteint
+            epargnes = EpargneIndex(import_epargnes(str(epargnes_csv), cache=cache))
     except Exception as e:
         print(f"Erreur lors du chargement des données: {e}")
         sys.exit(1)
 
     print(f"Chargement réussi: {len(personnes)} personnes et {len(epargnes)} produits d'épargne.")
 
-    # Pour chaque personne, suggérer des plans d'épargne
-    for personne in personnes:
-        print("\n" + "="*120)
-        print(f"Suggestions d'épargne pour {personne.nom}:")
-        print(f"Âge: {personne.age} ans")
-        print(f"Revenu annuel: {personne.revenu_annuel:.2f} €")
-        print(f"Capacité d'épargne mensuelle: {personne._calcul_capacite_epargne():.2f} €")
-        print(f"Objectif: {personne.objectif:.2f} €")
-        print(f"Durée d'épargne: {personne.duree_epargne} ans")
-        print("-"*120)
-
-        # Appeler la fonction de suggestion d'épargne
-        resultats = suggestion_epargne(
-            personne=personne,
-            epargnes=epargnes,
-            objectif=personne.objectif,
-            duree=personne.duree_epargne
-        )
-
-        if not resultats:
-            print("Aucune suggestion d'épargne disponible pour cette personne.")
-            continue
-
-        resultats = [r for r in resultats if r.objectif_atteint]
-        # Trier les résultats par capital final décroissant
-        resultats_tries = sorted(resultats, key=lambda r: r.montant_net_final, reverse=True)
-
-        print(f"{'Produit':<45} {'Effort mensuel':>15} {'Capital final':>15} {'Intérêts bruts':>15} {'Intérêts nets':>15} {'Versement total':>15} {'Versement max épargne':>15}")
-        print("-" * 120)
-        for resultat in resultats_tries:
-            resultat.afficher()
+    # Calculer en une passe toutes les suggestions d'épargne, éventuellement sur plusieurs processus
+    if nb_processus is None:
+        resultats = suggestion_epargne_batch(personnes, epargnes, top_k=top_k)
+    else:
+        resultats = suggestion_epargne_parallele(personnes, epargnes, nb_processus=nb_processus, top_k=top_k)
+    if rapport is None:
+        afficher_suggestions(personnes, resultats)
+    else:
+        ecrire_rapport(personnes, resultats, rapport, format=format_rapport, par_personne=par_personne)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Suggestions d'épargne pour chaque personne du fichier.")
+    parser.add_argument("--taille-bloc", type=int, default=None,
+                        help="Lire et traiter les personnes en flux, par blocs de cette taille")
+    parser.add_argument("--processus", type=int, default=None,
+                        help="Répartir le calcul des suggestions sur ce nombre de processus")
+    parser.add_argument("--cache", default=None, metavar="DOSSIER",
+                        help="Mettre en cache dans ce dossier les imports nettoyés, réutilisés tant que les fichiers sont inchangés")
+    parser.add_argument("--top-k", type=int, default=None, metavar="K",
+                        help="N'afficher que les K meilleures suggestions qui atteignent l'objectif, par personne ; "
+                             "une personne dont aucune suggestion n'atteint l'objectif est alors signalée par "
+                             "« Aucune suggestion d'épargne disponible » au lieu d'un tableau vide")
+    parser.add_argument("--rapport", default=None, metavar="FICHIER",
+                        help="Écrire le rapport dans ce fichier (.txt, .csv ou .jsonl, éventuellement suivi de .gz) "
+                             "plutôt que sur la sortie standard")
+    parser.add_argument("--par-personne", action="store_true",
+                        help="Écrire un fichier de rapport par personne, --rapport désignant alors un dossier")
+    parser.add_argument("--format", default=None, choices=["texte", "csv", "jsonl"],
+                        help="Format du rapport, déduit de l'extension de --rapport par défaut")
+    parser.add_argument("--profile", nargs="?", const="etapes", default=None, metavar="FICHIER",
+                        help="Afficher sur la sortie d'erreur le temps passé dans chaque étape et les compteurs ; "
+                             "avec FICHIER, enregistrer aussi un profil cProfile lisible par pstats")
+    args = parser.parse_args()
+    if args.par_personne and args.rapport is None:
+        parser.error("--par-personne nécessite --rapport")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    options = dict(taille_bloc=args.taille_bloc, nb_processus=args.processus, dossier_cache=args.cache,
+                   top_k=args.top_k, rapport=args.rapport, par_personne=args.par_personne,
+                   format_rapport=args.format)
+    if args.profile is None:
+        main(**options)
+    else:
+        profilage.activer()
+        try:
+            if args.profile == "etapes":
+                main(**options)
+            else:
+                profileur = cProfile.Profile()
+                try:
+                    profileur.runcall(main, **options)
+                finally:
+                    profileur.dump_stats(args.profile)
+        finally:
+            sys.stdout.flush()
+            print(profilage.rapport_etapes(), file=sys.stderr)
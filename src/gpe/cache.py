@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from src.gpe.stockage import ecrire_colonnes, lire_colonnes
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand le nettoyage change, pour invalider les entrées existantes
+VERSION_CACHE = 2
+
+FICHIER_INDEX = 'index.json'
+
+
+def empreinte_fichier(fichier: str, taille_bloc: int = 1 << 20) -> str:
+    """
+    Calcule l'empreinte BLAKE2b du contenu d'un fichier, lu par blocs.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    with open(fichier, 'rb') as f:
+        for bloc in iter(lambda: f.read(taille_bloc), b''):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+class CacheImports:
+    """
+    Cache disque des DataFrames nettoyés, pour ne pas relire ni renettoyer un fichier inchangé.
+
+    Une entrée est identifiée par le type de données et l'empreinte du contenu du fichier source.
+    Pour éviter de relire le fichier à chaque fois, l'empreinte est mémorisée avec le chemin, la
+    taille et la date de modification : elle n'est recalculée que si l'une des deux change. Un
+    fichier modifié a donc automatiquement une autre clé. Au-delà de taille_max octets, les
+    entrées les moins récemment utilisées sont supprimées.
+
+    Attributes:
+        dossier (Path): Dossier du cache
+        taille_max (int): Taille maximale du cache en octets
+        succes (int): Nombre d'imports servis par le cache
+        echecs (int): Nombre d'imports ayant dû lire le fichier source
+    """
+
+    def __init__(self, dossier: str, taille_max: int = 1 << 30):
+        if taille_max <= 0:
+            raise ValueError(f"La taille maximale doit être positive: {taille_max}")
+        self.dossier = Path(dossier)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+
+    def _lire_index(self) -> dict:
+        try:
+            with open(self.dossier / FICHIER_INDEX, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"fichiers": {}, "entrees": {}, "horloge": 0}
+
+    def _ecrire_index(self, index: dict) -> None:
+        temporaire = self.dossier / f"{FICHIER_INDEX}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temporaire, self.dossier / FICHIER_INDEX)
+
+    @staticmethod
+    def _tic(index: dict) -> int:
+        # Horloge logique : l'ordre des accès ne dépend pas de la résolution de l'horloge système
+        index["horloge"] = index.get("horloge", 0) + 1
+        return index["horloge"]
+
+    def _cle(self, index: dict, fichier: str, type_donnees: str) -> str:
+        chemin = str(Path(fichier).resolve())
+        stat = os.stat(chemin)
+        connu = index["fichiers"].get(chemin)
+        if connu is not None and connu["taille"] == stat.st_size and connu["mtime_ns"] == stat.st_mtime_ns:
+            empreinte = connu["empreinte"]
+        else:
+            empreinte = empreinte_fichier(chemin)
+            index["fichiers"][chemin] = {"taille": stat.st_size, "mtime_ns": stat.st_mtime_ns, "empreinte": empreinte}
+        # Un même contenu se lit différemment selon l'extension (séparateur du .txt par exemple)
+        format_fichier = Path(fichier).suffix.lower().lstrip('.')
+        return f"{type_donnees}-v{VERSION_CACHE}-{format_fichier}-{empreinte}"
+
+    def charger(self, fichier: str, type_donnees: str, charger_source: Callable[[str], "pd.DataFrame"]) -> "pd.DataFrame":
+        """
+        Renvoie le DataFrame nettoyé du fichier, depuis le cache s'il est à jour, sinon en appelant
+        charger_source puis en le mettant en cache.
+
+        Args:
+            fichier (str): Fichier source
+            type_donnees (str): Type de données (par exemple "personnes"), qui fait partie de la clé
+            charger_source (Callable[[str], pd.DataFrame]): Lecture et nettoyage du fichier source
+
+        Returns:
+            pd.DataFrame: Le DataFrame nettoyé
+        """
+        index = self._lire_index()
+        cle = self._cle(index, fichier, type_donnees)
+        entree = index["entrees"].get(cle)
+
+        if entree is not None and (self.dossier / cle).is_dir():
+            self.succes += 1
+            logger.info(f"Cache: succès pour {fichier}")
+            df = lire_colonnes(str(self.dossier / cle))
+            entree["dernier_acces"] = self._tic(index)
+            self._ecrire_index(index)
+            return df
+
+        self.echecs += 1
+        logger.info(f"Cache: échec pour {fichier}, lecture du fichier source")
+        df = charger_source(fichier)
+
+        # Écrire dans un dossier temporaire puis renommer, pour ne jamais exposer d'entrée partielle
+        temporaire = self.dossier / f"{cle}.tmp"
+        shutil.rmtree(temporaire, ignore_errors=True)
+        ecrire_colonnes(df, str(temporaire))
+        shutil.rmtree(self.dossier / cle, ignore_errors=True)
+        os.replace(temporaire, self.dossier / cle)
+
+        octets = sum(f.stat().st_size for f in (self.dossier / cle).iterdir())
+        index["entrees"][cle] = {"octets": octets, "dernier_acces": self._tic(index)}
+        self._evincer(index)
+        self._ecrire_index(index)
+        return df
+
+    def _evincer(self, index: dict) -> None:
+        entrees = index["entrees"]
+        total = sum(e["octets"] for e in entrees.values())
+        for cle in sorted(entrees, key=lambda c: entrees[c]["dernier_acces"]):
+            if total <= self.taille_max:
+                break
+            total -= entrees.pop(cle)["octets"]
+            shutil.rmtree(self.dossier / cle, ignore_errors=True)
+            logger.info(f"Cache: entrée {cle} supprimée")
+
+        # Oublier les empreintes dont l'entrée n'existe plus
+        cles = set(entrees)
+        index["fichiers"] = {
+            chemin: f for chemin, f in index["fichiers"].items()
+            if any(cle.endswith(f["empreinte"]) for cle in cles)
+        }
+
+    def vider(self) -> None:
+        """
+        Supprime toutes les entrées du cache.
+        """
+        shutil.rmtree(self.dossier, ignore_errors=True)
+        self.dossier.mkdir(parents=True, exist_ok=True)
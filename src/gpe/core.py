@@ -1,31 +1,55 @@
 import os
+import heapq
 import logging
-import pandas as pd
-from typing import List, Union
+import numpy as np
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 from dataclasses import dataclass
 
-from src.gpe.models.personne import Personne
-from src.gpe.models.epargne import Epargne
-from src.gpe.models.resultat import ResultatEpargne
-from src.gpe.utils import nettoyer_dataframe_personne, nettoyer_dataframe_epargne, calcul_interets_composes
+from src.gpe.models.personne import Personne, PersonneTable
+from src.gpe.models.epargne import Epargne, EpargneIndex
+from src.gpe.models.resultat import ResultatEpargne, ResultatsEpargne
+from src.gpe.cache import CacheImports
+from src.gpe.profilage import chronometre, compter, etape
+from src.gpe.stockage import EXTENSIONS_BINAIRES, est_format_binaire, lire_dataframe_binaire, ecrire_dataframe_binaire
+from src.gpe.utils import nettoyer_dataframe_personne, nettoyer_dataframe_epargne, TableFacteursCroissance
+
+# pandas n'est importé que dans les fonctions de lecture et d'écriture, pour que le calcul seul
+# n'en paie pas le chargement
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def import_personnes(fichier: str) -> List[Personne]:
+# Facteurs de croissance partagés par tous les calculs de suggestion du processus
+table_facteurs = TableFacteursCroissance()
+
+# Valeurs sans lesquelles une personne ne peut pas être évaluée ; l'âge, seulement affiché dans
+# les rapports, peut manquer
+VALEURS_REQUISES_PERSONNE = ['revenu_annuel', 'loyer', 'depenses_mensuelles', 'objectif', 'duree_epargne']
+
+@dataclass
+class LigneRejetee:
     """
-    Importe des données de personnes depuis un fichier et les convertit en objets Personne.
+    Ligne d'un fichier importé qui n'a pas pu être convertie en objet.
 
-    Args:
-        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX)
+    Attributes:
+        ligne (int): Numéro de la ligne dans le fichier (l'en-tête est la ligne 1)
+        motif (str): Raison du rejet
+    """
+    ligne: int
+    motif: str
+
+
+def _verifier_format(fichier: str) -> str:
+    """
+    Vérifie que le fichier existe et que son format est supporté.
 
     Returns:
-        List[Personne]: Liste d'objets Personne
+        str: L'extension du fichier, en minuscules
 
     Raises:
-        ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
+        ValueError: Si le format du fichier n'est pas supporté
         FileNotFoundError: Si le fichier n'existe pas
     """
     if not os.path.exists(fichier):
@@ -34,63 +58,214 @@ def import_personnes(fichier: str) -> List[Personne]:
 
     # Déterminer le format du fichier
     extension = Path(fichier).suffix.lower()
+    if extension not in ('.csv', '.txt', '.xlsx') + EXTENSIONS_BINAIRES:
+        logger.error(f"Format de fichier non supporté: {extension}")
+        raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT, XLSX, PARQUET ou COLONNES.")
+    return extension
 
-    try:
-        # Charger les données selon le format
-        if extension == '.csv':
-            df = pd.read_csv(fichier)
-        elif extension == '.txt':
-            df = pd.read_csv(fichier, sep='\t')
-        elif extension == '.xlsx':
-            df = pd.read_excel(fichier)
-        else:
-            logger.error(f"Format de fichier non supporté: {extension}")
-            raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT ou XLSX.")
 
-        # Vérifier que les colonnes nécessaires sont présentes
-        colonnes_requises = ['nom', 'age', 'revenu_annuel', 'loyer', 'depenses_mensuelles', 'objectif']
-        colonnes_manquantes = [col for col in colonnes_requises if col not in df.columns]
+@chronometre("lecture")
+def _lire_fichier(fichier: str) -> "pd.DataFrame":
+    """
+    Lit un fichier CSV, TXT (tabulé), XLSX, Parquet ou un dossier de colonnes dans un DataFrame.
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    import pandas as pd
+    extension = _verifier_format(fichier)
+
+    # Charger les données selon le format
+    if extension == '.csv':
+        return pd.read_csv(fichier)
+    elif extension == '.txt':
+        return pd.read_csv(fichier, sep='\t')
+    elif extension == '.xlsx':
+        return pd.read_excel(fichier)
+    else:
+        return lire_dataframe_binaire(fichier)
 
-        # Gérer les différentes orthographes possibles pour la durée
-        if 'duree_epargne' not in df.columns and 'duree' not in df.columns and 'durée' not in df.columns:
-            colonnes_manquantes.append('duree_epargne/duree/durée')
 
-        if colonnes_manquantes:
-            logger.error(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
-            raise ValueError(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+def _lire_fichier_par_blocs(fichier: str, taille_bloc: int) -> Iterator["pd.DataFrame"]:
+    """
+    Lit un fichier CSV ou TXT (tabulé) par blocs de taille_bloc lignes. Les autres formats ne
+    pouvant pas être lus par morceaux, ils sont chargés entiers (projetés en mémoire pour un
+    dossier de colonnes) puis découpés.
 
-        # Standardiser le nom de la colonne durée
-        if 'durée' in df.columns:
-            df = df.rename(columns={'durée': 'duree_epargne'})
-        elif 'duree' in df.columns:
-            df = df.rename(columns={'duree': 'duree_epargne'})
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    import pandas as pd
+    extension = _verifier_format(fichier)
 
-        # Nettoyer les données
-        df_clean = nettoyer_dataframe_personne(df)
+    if extension not in ('.csv', '.txt'):
+        df = _lire_fichier(fichier)
+        for debut in range(0, len(df), taille_bloc):
+            yield df.iloc[debut:debut + taille_bloc]
+        return
+
+    # L'index des blocs continue d'un bloc à l'autre, ce qui garde les numéros de ligne justes
+    sep = '\t' if extension == '.txt' else ','
+    with pd.read_csv(fichier, sep=sep, chunksize=taille_bloc) as lecteur:
+        while True:
+            with etape("lecture"):
+                df = next(lecteur, None)
+            if df is None:
+                return
+            yield df
+
+
+def _separer_lignes_incompletes(df: "pd.DataFrame", colonnes: List[str], rejets: List[LigneRejetee]) -> "pd.DataFrame":
+    """
+    Retire du DataFrame les lignes dont une des colonnes indiquées est vide, et les ajoute à rejets.
+    """
+    manquantes = df[colonnes].isna()
+    incompletes = manquantes.any(axis=1).to_numpy()
+    if not incompletes.any():
+        return df
+
+    # L'index du DataFrame lu compte les lignes de données à partir de 0, après l'en-tête
+    for indice, masque in zip(df.index[incompletes], manquantes.to_numpy()[incompletes]):
+        colonnes_vides = [col for col, vide in zip(colonnes, masque) if vide]
+        rejets.append(LigneRejetee(ligne=int(indice) + 2, motif=f"Valeurs manquantes: {colonnes_vides}"))
+    return df[~incompletes]
 
-        # Convertir en objets Personne
-        personnes = []
-        for _, row in df_clean.iterrows():
-            try:
-                # Gérer le cas où versement_mensuel_utilisateur est absent
-                versement = row.get('versement_mensuel_utilisateur', 0)
-                if pd.isna(versement):
-                    versement = 0
-
-                personne = Personne(
-                    nom=row['nom'],
-                    age=row['age'],
-                    revenu_annuel=row['revenu_annuel'],
-                    loyer=row['loyer'],
-                    depenses_mensuelles=row['depenses_mensuelles'],
-                    objectif=row['objectif'],
-                    duree_epargne=row['duree_epargne'],
-                    versement_mensuel_utilisateur=versement
-                )
-                personnes.append(personne)
-            except Exception as e:
-                logger.warning(f"Impossible de créer une personne à partir de la ligne {row}: {str(e)}")
 
+def charger_dataframe_personnes(fichier: str, cache: Optional[CacheImports] = None) -> "pd.DataFrame":
+    """
+    Lit et nettoie un fichier de personnes sans créer d'objets Personne. Les formats binaires
+    (Parquet, dossier de colonnes) contiennent des données déjà nettoyées et ne repassent pas
+    par nettoyer_dataframe_personne.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        cache (CacheImports, optional): Cache des imports nettoyés, utilisé pour les formats texte et XLSX
+
+    Returns:
+        pd.DataFrame: Données nettoyées, la colonne durée étant renommée en duree_epargne
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if est_format_binaire(fichier):
+        return _preparer_dataframe_personnes(_lire_fichier(fichier), nettoyer=False)
+    if cache is not None:
+        _verifier_format(fichier)
+        return cache.charger(fichier, 'personnes', lambda f: _preparer_dataframe_personnes(_lire_fichier(f)))
+    return _preparer_dataframe_personnes(_lire_fichier(fichier))
+
+
+def _preparer_dataframe_personnes(df: "pd.DataFrame", nettoyer: bool = True) -> "pd.DataFrame":
+    """
+    Vérifie les colonnes d'un DataFrame de personnes, standardise la colonne durée et, si demandé,
+    le nettoie.
+
+    Raises:
+        ValueError: Si des colonnes sont manquantes ou si les données sont invalides
+    """
+    # Vérifier que les colonnes nécessaires sont présentes
+    colonnes_requises = ['nom', 'age', 'revenu_annuel', 'loyer', 'depenses_mensuelles', 'objectif']
+    colonnes_manquantes = [col for col in colonnes_requises if col not in df.columns]
+
+    # Gérer les différentes orthographes possibles pour la durée
+    if 'duree_epargne' not in df.columns and 'duree' not in df.columns and 'durée' not in df.columns:
+        colonnes_manquantes.append('duree_epargne/duree/durée')
+
+    if colonnes_manquantes:
+        logger.error(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+        raise ValueError(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+
+    # Standardiser le nom de la colonne durée
+    if 'durée' in df.columns:
+        df = df.rename(columns={'durée': 'duree_epargne'})
+    elif 'duree' in df.columns:
+        df = df.rename(columns={'duree': 'duree_epargne'})
+
+    # Nettoyer les données
+    if not nettoyer:
+        return df
+    with etape("nettoyage"):
+        return nettoyer_dataframe_personne(df)
+
+
+@chronometre("construction")
+def _construire_personnes(df_clean: "pd.DataFrame", rejets: List[LigneRejetee]) -> List[Personne]:
+    """
+    Convertit un DataFrame de personnes nettoyé en objets Personne, colonne par colonne.
+    Les lignes incomplètes sont ajoutées à rejets.
+    """
+    df_valide = _separer_lignes_incompletes(df_clean, VALEURS_REQUISES_PERSONNE, rejets)
+
+    # Gérer le cas où versement_mensuel_utilisateur est absent
+    if 'versement_mensuel_utilisateur' in df_valide.columns:
+        versements = df_valide['versement_mensuel_utilisateur'].fillna(0).tolist()
+    else:
+        versements = [0] * len(df_valide)
+
+    # Un âge absent devient None plutôt que pd.NA
+    ages = df_valide['age'].astype(object).where(df_valide['age'].notna(), None)
+    colonnes = zip(
+        df_valide['nom'].tolist(),
+        ages.tolist(),
+        df_valide['revenu_annuel'].tolist(),
+        df_valide['loyer'].tolist(),
+        df_valide['depenses_mensuelles'].tolist(),
+        df_valide['objectif'].tolist(),
+        df_valide['duree_epargne'].tolist(),
+        versements,
+    )
+    return [
+        Personne(
+            nom=nom,
+            age=age,
+            revenu_annuel=revenu_annuel,
+            loyer=loyer,
+            depenses_mensuelles=depenses_mensuelles,
+            objectif=objectif,
+            duree_epargne=duree_epargne,
+            versement_mensuel_utilisateur=versement
+        )
+        for nom, age, revenu_annuel, loyer, depenses_mensuelles, objectif, duree_epargne, versement in colonnes
+    ]
+
+
+@chronometre("import_personnes")
+def import_personnes(fichier: str, rejets: Optional[List[LigneRejetee]] = None,
+                     cache: Optional[CacheImports] = None) -> List[Personne]:
+    """
+    Importe des données de personnes depuis un fichier et les convertit en objets Personne.
+
+    Les lignes auxquelles il manque une valeur nécessaire au calcul (revenu, loyer, dépenses,
+    objectif ou durée) sont écartées et décrites dans rejets. Une ligne sans âge est gardée, avec
+    un âge None.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        rejets (List[LigneRejetee], optional): Liste complétée avec les lignes rejetées
+        cache (CacheImports, optional): Cache des imports nettoyés, pour ne pas renettoyer un fichier inchangé
+
+    Returns:
+        List[Personne]: Liste d'objets Personne
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if rejets is None:
+        rejets = []
+    nb_rejets_initial = len(rejets)
+
+    try:
+        personnes = _construire_personnes(charger_dataframe_personnes(fichier, cache), rejets)
+
+        nb_rejets = len(rejets) - nb_rejets_initial
+        compter("personnes_importees", len(personnes))
+        compter("lignes_rejetees", nb_rejets)
+        if nb_rejets:
+            logger.warning(f"{nb_rejets} lignes rejetées lors de l'import de {fichier}")
         logger.info(f"Import réussi: {len(personnes)} personnes importées depuis {fichier}")
         return personnes
 
@@ -98,70 +273,202 @@ def import_personnes(fichier: str) -> List[Personne]:
         logger.error(f"Erreur lors de l'import du fichier {fichier}: {str(e)}")
         raise
 
-def import_epargnes(fichier: str) -> List[Epargne]:
+
+def iter_personnes(fichier: str, taille_bloc: int = 100_000,
+                   rejets: Optional[List[LigneRejetee]] = None) -> Iterator[List[Personne]]:
     """
-    Importe des données d'épargne depuis un fichier et les convertit en objets Epargne.
+    Importe un fichier de personnes en flux, par blocs nettoyés d'au plus taille_bloc lignes,
+    pour que la mémoire utilisée dépende de la taille des blocs et non de celle du fichier.
 
     Args:
-        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX)
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        taille_bloc (int): Nombre de lignes lues par bloc
+        rejets (List[LigneRejetee], optional): Liste complétée avec les lignes rejetées
+
+    Yields:
+        List[Personne]: Les personnes valides de chaque bloc
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté, si taille_bloc n'est pas positive
+            ou si les données sont invalides
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if taille_bloc <= 0:
+        raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+    if rejets is None:
+        rejets = []
+    nb_rejets_initial = len(rejets)
+    nb_personnes = 0
+
+    try:
+        nettoyer = not est_format_binaire(fichier)
+        for df in _lire_fichier_par_blocs(fichier, taille_bloc):
+            with etape("import_personnes"):
+                personnes = _construire_personnes(_preparer_dataframe_personnes(df, nettoyer), rejets)
+            nb_personnes += len(personnes)
+            yield personnes
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import du fichier {fichier}: {str(e)}")
+        raise
+
+    nb_rejets = len(rejets) - nb_rejets_initial
+    compter("personnes_importees", nb_personnes)
+    compter("lignes_rejetees", nb_rejets)
+    if nb_rejets:
+        logger.warning(f"{nb_rejets} lignes rejetées lors de l'import de {fichier}")
+    logger.info(f"Import en flux réussi: {nb_personnes} personnes importées depuis {fichier}")
+
+
+@chronometre("import_personnes")
+def charger_personne_table(fichier: str, rejets: Optional[List[LigneRejetee]] = None,
+                           cache: Optional[CacheImports] = None) -> PersonneTable:
+    """
+    Importe des personnes directement en colonnes, sans créer d'objets Personne.
+
+    Les lignes incomplètes sont écartées comme dans import_personnes.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        rejets (List[LigneRejetee], optional): Liste complétée avec les lignes rejetées
+        cache (CacheImports, optional): Cache des imports nettoyés, pour ne pas renettoyer un fichier inchangé
 
     Returns:
-        List[Epargne]: Liste d'objets Epargne
+        PersonneTable: Les personnes valides
 
     Raises:
         ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
         FileNotFoundError: Si le fichier n'existe pas
     """
-    if not os.path.exists(fichier):
-        logger.error(f"Le fichier {fichier} n'existe pas")
-        raise FileNotFoundError(f"Le fichier {fichier} n'existe pas")
-
-    # Déterminer le format du fichier
-    extension = Path(fichier).suffix.lower()
+    if rejets is None:
+        rejets = []
+    nb_rejets_initial = len(rejets)
 
     try:
-        # Charger les données selon le format
-        if extension == '.csv':
-            df = pd.read_csv(fichier)
-        elif extension == '.txt':
-            df = pd.read_csv(fichier, sep='\t')
-        elif extension == '.xlsx':
-            df = pd.read_excel(fichier)
-        else:
-            logger.error(f"Format de fichier non supporté: {extension}")
-            raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT ou XLSX.")
+        df = _separer_lignes_incompletes(charger_dataframe_personnes(fichier, cache), VALEURS_REQUISES_PERSONNE, rejets)
+        versements = df['versement_mensuel_utilisateur'].fillna(0) if 'versement_mensuel_utilisateur' in df.columns else None
+        table = PersonneTable(
+            nom=df['nom'].to_numpy(dtype=object),
+            age=df['age'].to_numpy(dtype=float, na_value=np.nan),
+            revenu_annuel=df['revenu_annuel'].to_numpy(dtype=float),
+            loyer=df['loyer'].to_numpy(dtype=float),
+            depenses_mensuelles=df['depenses_mensuelles'].to_numpy(dtype=float),
+            objectif=df['objectif'].to_numpy(dtype=float),
+            duree_epargne=df['duree_epargne'].to_numpy(dtype=float),
+            versement_mensuel_utilisateur=None if versements is None else versements.to_numpy(dtype=float),
+        )
+        compter("personnes_importees", len(table))
+        compter("lignes_rejetees", len(rejets) - nb_rejets_initial)
+        logger.info(f"Import réussi: {len(table)} personnes importées en colonnes depuis {fichier}")
+        return table
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import du fichier {fichier}: {str(e)}")
+        raise
+
+
+def charger_dataframe_epargnes(fichier: str, cache: Optional[CacheImports] = None) -> "pd.DataFrame":
+    """
+    Lit et nettoie un fichier de produits d'épargne sans créer d'objets Epargne. Les formats
+    binaires (Parquet, dossier de colonnes) contiennent des données déjà nettoyées et ne repassent
+    pas par nettoyer_dataframe_epargne.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        cache (CacheImports, optional): Cache des imports nettoyés, utilisé pour les formats texte et XLSX
+
+    Returns:
+        pd.DataFrame: Données nettoyées
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if cache is not None and not est_format_binaire(fichier):
+        _verifier_format(fichier)
+        return cache.charger(fichier, 'epargnes', _charger_dataframe_epargnes)
+    return _charger_dataframe_epargnes(fichier)
+
+
+def _charger_dataframe_epargnes(fichier: str) -> "pd.DataFrame":
+    df = _lire_fichier(fichier)
+
+    # Vérifier que les colonnes nécessaires sont présentes
+    colonnes_requises = ['nom', 'taux_interet', 'fiscalite', 'duree_min']
+    colonnes_manquantes = [col for col in colonnes_requises if col not in df.columns]
+
+    if colonnes_manquantes:
+        logger.error(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+        raise ValueError(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+
+    # Nettoyer les données
+    if est_format_binaire(fichier):
+        return df
+    with etape("nettoyage"):
+        return nettoyer_dataframe_epargne(df)
+
+
+@chronometre("import_epargnes")
+def import_epargnes(fichier: str, rejets: Optional[List[LigneRejetee]] = None,
+                    cache: Optional[CacheImports] = None) -> List[Epargne]:
+    """
+    Importe des données d'épargne depuis un fichier et les convertit en objets Epargne.
+
+    Les lignes sans taux d'intérêt, fiscalité ou durée minimale sont écartées et décrites dans rejets.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        rejets (List[LigneRejetee], optional): Liste complétée avec les lignes rejetées
+        cache (CacheImports, optional): Cache des imports nettoyés, pour ne pas renettoyer un fichier inchangé
 
-        # Vérifier que les colonnes nécessaires sont présentes
-        colonnes_requises = ['nom', 'taux_interet', 'fiscalite', 'duree_min']
-        colonnes_manquantes = [col for col in colonnes_requises if col not in df.columns]
+    Returns:
+        List[Epargne]: Liste d'objets Epargne
 
-        if colonnes_manquantes:
-            logger.error(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
-            raise ValueError(f"Colonnes manquantes dans le fichier: {colonnes_manquantes}")
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté ou si les données sont invalides
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if rejets is None:
+        rejets = []
+    nb_rejets_initial = len(rejets)
 
-        # Nettoyer les données
-        df_clean = nettoyer_dataframe_epargne(df)
+    try:
+        df_clean = charger_dataframe_epargnes(fichier, cache)
+        df_valide = _separer_lignes_incompletes(df_clean, ['taux_interet', 'fiscalite', 'duree_min'], rejets)
 
-        # Convertir en objets Epargne
+        # Convertir en objets Epargne, colonne par colonne ; un versement_max NaN devient None et
+        # une volatilité absente vaut 0 (taux fixe)
         epargnes = []
-        for _, row in df_clean.iterrows():
+        if 'volatilite' in df_valide.columns:
+            volatilites = df_valide['volatilite'].fillna(0.0).astype(float).tolist()
+        else:
+            volatilites = [0.0] * len(df_valide)
+        colonnes = zip(
+            df_valide.index.tolist(),
+            df_valide['nom'].tolist(),
+            df_valide['taux_interet'].tolist(),
+            df_valide['fiscalite'].tolist(),
+            df_valide['duree_min'].tolist(),
+            df_valide['versement_max'].astype(object).where(df_valide['versement_max'].notna(), None).tolist(),
+            volatilites,
+        )
+        for indice, nom, taux_interet, fiscalite, duree_min, versement_max, volatilite in colonnes:
             try:
-                # Gérer le cas où versement_max est NaN
-                versement_max = row.get('versement_max')
-                if pd.isna(versement_max):
-                    versement_max = None
-
-                epargne = Epargne(
-                    nom=row['nom'],
-                    taux_interet=row['taux_interet'],
-                    fiscalite=row['fiscalite'],
-                    duree_min=row['duree_min'],
-                    versement_max=versement_max
-                )
-                epargnes.append(epargne)
+                epargnes.append(Epargne(
+                    nom=nom,
+                    taux_interet=taux_interet,
+                    fiscalite=fiscalite,
+                    duree_min=duree_min,
+                    versement_max=versement_max,
+                    volatilite=volatilite
+                ))
             except Exception as e:
-                logger.warning(f"Impossible de créer une épargne à partir de la ligne {row}: {str(e)}")
+                rejets.append(LigneRejetee(ligne=int(indice) + 2, motif=str(e)))
 
+        nb_rejets = len(rejets) - nb_rejets_initial
+        compter("epargnes_importees", len(epargnes))
+        compter("lignes_rejetees", nb_rejets)
+        if nb_rejets:
+            logger.warning(f"{nb_rejets} lignes rejetées lors de l'import de {fichier}")
         logger.info(f"Import réussi: {len(epargnes)} produits d'épargne importés depuis {fichier}")
         return epargnes
 
@@ -169,17 +476,50 @@ def import_epargnes(fichier: str) -> List[Epargne]:
         logger.error(f"Erreur lors de l'import du fichier {fichier}: {str(e)}")
         raise
 
+def _ecrire_dataframe(df: "pd.DataFrame", fichier: str) -> None:
+    """
+    Écrit un DataFrame au format donné par l'extension du fichier.
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté
+    """
+    # Déterminer le format du fichier
+    extension = Path(fichier).suffix.lower()
+
+    if extension == '.csv':
+        df.to_csv(fichier, index=False)
+    elif extension == '.txt':
+        df.to_csv(fichier, sep='\t', index=False)
+    elif extension == '.xlsx':
+        try:
+            df.to_excel(fichier, index=False)
+        except ImportError as e:
+            logger.error(f"Impossible de sauvegarder au format Excel: {str(e)}")
+            logger.info("Installation du package openpyxl requise pour le format Excel. Utilisation du format CSV par défaut.")
+            # Sauvegarder en CSV à la place
+            csv_path = Path(fichier).with_suffix('.csv')
+            df.to_csv(csv_path, index=False)
+            logger.info(f"Sauvegardé en CSV à la place: {csv_path}")
+    elif extension in EXTENSIONS_BINAIRES:
+        ecrire_dataframe_binaire(df, fichier)
+    else:
+        logger.error(f"Format de fichier non supporté: {extension}")
+        raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT, XLSX, PARQUET ou COLONNES.")
+
+
 def save_personnes(personnes: List[Personne], fichier: str) -> None:
     """
     Sauvegarde une liste de personnes dans un fichier.
 
     Args:
         personnes (List[Personne]): Liste d'objets Personne à sauvegarder
-        fichier (str): Chemin vers le fichier de destination (formats supportés: CSV, TXT, XLSX)
+        fichier (str): Chemin vers le fichier de destination (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
 
     Raises:
         ValueError: Si le format du fichier n'est pas supporté
     """
+    import pandas as pd
+
     # Créer un DataFrame à partir des objets Personne
     data = []
     for p in personnes:
@@ -196,30 +536,9 @@ def save_personnes(personnes: List[Personne], fichier: str) -> None:
 
     df = pd.DataFrame(data)
 
-    # Déterminer le format du fichier
-    extension = Path(fichier).suffix.lower()
-
     try:
         # Sauvegarder selon le format
-        if extension == '.csv':
-            df.to_csv(fichier, index=False)
-        elif extension == '.txt':
-            df.to_csv(fichier, sep='\t', index=False)
-        elif extension == '.xlsx':
-            try:
-                df.to_excel(fichier, index=False)
-            except ImportError as e:
-                logger.error(f"Impossible de sauvegarder au format Excel: {str(e)}")
-                logger.info("Installation du package openpyxl requise pour le format Excel. Utilisation du format CSV par défaut.")
-                # Sauvegarder en CSV à la place
-                csv_path = Path(fichier).with_suffix('.csv')
-                df.to_csv(csv_path, index=False)
-                logger.info(f"Sauvegardé en CSV à la place: {csv_path}")
-                return  # Sortir de la fonction après la sauvegarde alternative
-        else:
-            logger.error(f"Format de fichier non supporté: {extension}")
-            raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT ou XLSX.")
-
+        _ecrire_dataframe(df, fichier)
         logger.info(f"Sauvegarde réussie: {len(personnes)} personnes sauvegardées dans {fichier}")
 
     except Exception as e:
@@ -232,11 +551,13 @@ def save_epargnes(epargnes: List[Epargne], fichier: str) -> None:
 
     Args:
         epargnes (List[Epargne]): Liste d'objets Epargne à sauvegarder
-        fichier (str): Chemin vers le fichier de destination (formats supportés: CSV, TXT, XLSX)
+        fichier (str): Chemin vers le fichier de destination (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
 
     Raises:
         ValueError: Si le format du fichier n'est pas supporté
     """
+    import pandas as pd
+
     # Créer un DataFrame à partir des objets Epargne
     data = []
     for e in epargnes:
@@ -245,47 +566,89 @@ def save_epargnes(epargnes: List[Epargne], fichier: str) -> None:
             'taux_interet': e.taux_interet,
             'fiscalite': e.fiscalite,
             'duree_min': e.duree_min,
-            'versement_max': e.versement_max
+            'versement_max': e.versement_max,
+            'volatilite': e.volatilite
         })
 
     df = pd.DataFrame(data)
 
-    # Déterminer le format du fichier
-    extension = Path(fichier).suffix.lower()
-
     try:
         # Sauvegarder selon le format
-        if extension == '.csv':
-            df.to_csv(fichier, index=False)
-        elif extension == '.txt':
-            df.to_csv(fichier, sep='\t', index=False)
-        elif extension == '.xlsx':
-            try:
-                df.to_excel(fichier, index=False)
-            except ImportError as e:
-                logger.error(f"Impossible de sauvegarder au format Excel: {str(e)}")
-                logger.info("Installation du package openpyxl requise pour le format Excel. Utilisation du format CSV par défaut.")
-                # Sauvegarder en CSV à la place
-                csv_path = Path(fichier).with_suffix('.csv')
-                df.to_csv(csv_path, index=False)
-                logger.info(f"Sauvegardé en CSV à la place: {csv_path}")
-                return  # Sortir de la fonction après la sauvegarde alternative
-        else:
-            logger.error(f"Format de fichier non supporté: {extension}")
-            raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT ou XLSX.")
-
+        _ecrire_dataframe(df, fichier)
         logger.info(f"Sauvegarde réussie: {len(epargnes)} produits d'épargne sauvegardés dans {fichier}")
 
     except Exception as e:
         logger.error(f"Erreur lors de la sauvegarde dans le fichier {fichier}: {str(e)}")
         raise
 
-def suggestion_epargne(personne: Personne, epargnes: List[Epargne], objectif: float, duree: int) -> List[ResultatEpargne]:
+def save_resultats(resultats: ResultatsEpargne, fichier: str) -> None:
+    """
+    Sauvegarde des résultats d'épargne dans un fichier, colonne par colonne.
+
+    Args:
+        resultats (ResultatsEpargne): Résultats à sauvegarder
+        fichier (str): Chemin vers le fichier de destination (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté
+    """
+    try:
+        _ecrire_dataframe(resultats.to_dataframe(), fichier)
+        logger.info(f"Sauvegarde réussie: {len(resultats)} résultats sauvegardés dans {fichier}")
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la sauvegarde dans le fichier {fichier}: {str(e)}")
+        raise
+
+
+def import_resultats(fichier: str) -> ResultatsEpargne:
+    """
+    Importe des résultats d'épargne sauvegardés par save_resultats.
+
+    Args:
+        fichier (str): Chemin vers le fichier à importer (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+
+    Returns:
+        ResultatsEpargne: Les résultats en colonnes
+
+    Raises:
+        ValueError: Si le format du fichier n'est pas supporté ou si des colonnes manquent
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    try:
+        df = _lire_fichier(fichier)
+        colonnes = {col: df[col].to_numpy() for col in df.columns if col != "nom_personne"}
+        colonnes["nom_produit_epargne"] = df["nom_produit_epargne"].to_numpy(dtype=object)
+        resultats = ResultatsEpargne(colonnes)
+        logger.info(f"Import réussi: {len(resultats)} résultats importés depuis {fichier}")
+        return resultats
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import du fichier {fichier}: {str(e)}")
+        raise
+
+
+@chronometre("suggestion")
+def suggestion_epargne(personne: Personne, epargnes: Union[List[Epargne], EpargneIndex], objectif: float, duree: int,
+                       facteurs: Optional[TableFacteursCroissance] = None, top_k: Optional[int] = None) -> List[ResultatEpargne]:
+    if facteurs is None:
+        facteurs = table_facteurs
+    if top_k is not None and top_k <= 0:
+        raise ValueError(f"top_k doit être positif: {top_k}")
+
     # Calculer la capacité d'épargne mensuelle de la personne
     capacite_epargne_mensuelle = personne._calcul_capacite_epargne()
 
-    # Liste pour stocker les résultats
+    # Avec un catalogue indexé, ne parcourir que les produits accessibles au plus petit des scénarios
+    if isinstance(epargnes, EpargneIndex):
+        versement_mensuel_min = min(personne.versement_mensuel_utilisateur, 0.25 * capacite_epargne_mensuelle,
+                                    1.00 * capacite_epargne_mensuelle)
+        epargnes = epargnes.eligibles(duree, versement_mensuel_min * 12 * duree)
+
+    # Liste pour stocker les résultats ; avec top_k, tas des k meilleurs résultats qui atteignent
+    # l'objectif, de clé (capital net, -rang) pour départager les ex aequo comme un tri stable
     resultats = []
+    rang = 0
 
     # Pour chaque produit d'épargne
     for epargne in epargnes:
@@ -294,6 +657,9 @@ def suggestion_epargne(personne: Personne, epargnes: List[Epargne], objectif: fl
             # Ignorer ce produit si la durée est insuffisante
             continue
 
+        # Facteur de croissance du produit, commun à tous les scénarios
+        facteur = facteurs.facteur(epargne.taux_interet, duree)
+
         # Définir les scénarios d'effort (pourcentages de la capacité d'épargne)
         scenarios = [
             (personne.versement_mensuel_utilisateur, 0),  # L'effort saisi par l'utilisateur
@@ -318,7 +684,7 @@ def suggestion_epargne(personne: Personne, epargnes: List[Epargne], objectif: fl
             versement_total = versement_annuel * duree
 
             # Calculer le capital brut avec intérêts
-            capital_brut = calcul_interets_composes(versement_annuel, epargne.taux_interet, duree)
+            capital_brut = versement_annuel * facteur
 
             # Intérêt total brut
             interet_total_brut = capital_brut - versement_total
@@ -332,7 +698,13 @@ def suggestion_epargne(personne: Personne, epargnes: List[Epargne], objectif: fl
             if epargne.versement_max and versement_total > epargne.versement_max:
                 continue
 
-            resultats.append(ResultatEpargne(
+            if top_k is not None:
+                rang += 1
+                cle = (capital_net, -rang)
+                if capital_net < objectif or (len(resultats) == top_k and cle <= resultats[0][:2]):
+                    continue
+
+            resultat = ResultatEpargne(
                 nom_produit_epargne=epargne.nom,
                 effort_mensuel=pourcentage,
                 total_versement=versement_total,
@@ -341,7 +713,358 @@ def suggestion_epargne(personne: Personne, epargnes: List[Epargne], objectif: fl
                 objectif_atteint=capital_net >= objectif,
                 interet_brut=interet_total_brut,
                 interet_net=interet_total_net
-            ))
+            )
 
+            if top_k is None:
+                resultats.append(resultat)
+            elif len(resultats) < top_k:
+                heapq.heappush(resultats, (capital_net, -rang, resultat))
+            else:
+                heapq.heapreplace(resultats, (capital_net, -rang, resultat))
 
+    if top_k is not None:
+        # Du meilleur au moins bon, les ex aequo dans l'ordre du catalogue
+        resultats = [resultat for _, _, resultat in sorted(resultats, key=lambda e: (-e[0], -e[1]))]
+    compter("resultats_produits", len(resultats))
     return resultats
+
+
+@chronometre("suggestion")
+def suggestion_epargne_batch(personnes: Union[List[Personne], PersonneTable], epargnes: Union[List[Epargne], EpargneIndex],
+                             facteurs: Optional[TableFacteursCroissance] = None,
+                             top_k: Optional[int] = None) -> ResultatsEpargne:
+    """
+    Évalue en une seule passe vectorisée la grille personnes × produits × scénarios d'effort.
+
+    Les résultats sont identiques à ceux de suggestion_epargne appelée pour chaque personne avec
+    objectif=personne.objectif et duree=personne.duree_epargne, et sont rangés dans le même ordre
+    (personne, puis produit, puis scénario).
+
+    Args:
+        personnes (List[Personne] | PersonneTable): Personnes à évaluer, en liste ou déjà en colonnes
+        epargnes (List[Epargne] | EpargneIndex): Catalogue des produits d'épargne ; indexé, les
+            produits dont la durée minimale dépasse la durée de toutes les personnes sont écartés
+            avant de construire la grille
+        facteurs (TableFacteursCroissance, optional): Cache des facteurs de croissance, par défaut
+            celui partagé du module
+        top_k (int, optional): Ne garder, pour chaque personne, que les top_k meilleurs résultats
+            qui atteignent l'objectif, triés par montant_net_final décroissant (les ex aequo dans
+            l'ordre du catalogue), comme suggestion_epargne(..., top_k=top_k)
+
+    Returns:
+        ResultatsEpargne: Résultats en colonnes, une ligne par scénario retenu. Les colonnes
+        indice_personne et indice_epargne renvoient aux positions dans les listes d'entrée ;
+        versement_max_epargne vaut NaN pour un produit sans plafond.
+    """
+    if facteurs is None:
+        facteurs = table_facteurs
+
+    # Colonnes des personnes, de forme (P, 1, 1)
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+    versement_utilisateur = personnes["versement_mensuel_utilisateur"]
+    objectif = personnes["objectif"][:, None, None]
+    duree = personnes["duree_epargne"][:, None, None]
+
+    # Avec un catalogue indexé, ne garder que les produits accessibles à la plus longue durée du bloc
+    positions_epargnes = None
+    if isinstance(epargnes, EpargneIndex) and len(personnes):
+        positions_epargnes = np.array(epargnes.indices_eligibles(float(personnes["duree_epargne"].max())), dtype=np.intp)
+        epargnes = [epargnes[i] for i in positions_epargnes]
+
+    # Colonnes des produits, de forme (1, E, 1) ; un plafond absent devient NaN
+    taux_interet = np.array([e.taux_interet for e in epargnes], dtype=float)[None, :, None]
+    fiscalite = np.array([e.fiscalite for e in epargnes], dtype=float)[None, :, None]
+    duree_min = np.array([np.nan if e.duree_min is None else e.duree_min for e in epargnes], dtype=float)[None, :, None]
+    versement_max = np.array([np.nan if e.versement_max is None else e.versement_max for e in epargnes], dtype=float)
+
+    # Scénarios d'effort, de forme (P, 1, S), dans l'ordre de suggestion_epargne
+    capacite = personnes._calcul_capacite_epargne()
+    versement_mensuel = np.stack([
+        versement_utilisateur,  # L'effort saisi par l'utilisateur
+        0.25 * capacite,        # 25% de la capacité
+        0.50 * capacite,        # 50% de la capacité
+        0.75 * capacite,        # 75% de la capacité
+        1.00 * capacite         # 100% de la capacité
+    ], axis=1)[:, None, :]
+    pourcentages = np.array([0, 25, 50, 75, 100], dtype=float)
+
+    forme = (len(personnes), len(epargnes), len(pourcentages))
+    versement_annuel = versement_mensuel * 12
+    versement_total = np.broadcast_to(versement_annuel * duree, forme)
+
+    # Masques d'éligibilité (durée minimale) et de plafond (NaN = pas de plafond)
+    eligible = ~(duree < duree_min)
+    sous_plafond = ~(versement_total > versement_max[None, :, None])
+    masque = eligible & sous_plafond
+
+    # Capital brut avec intérêts : un facteur de croissance par produit et par durée distincte
+    durees, indice_duree = np.unique(personnes["duree_epargne"], return_inverse=True)
+    facteur = facteurs.facteurs(taux_interet.ravel(), durees)[:, indice_duree].T[:, :, None]
+    capital_brut = versement_annuel * facteur
+
+    interet_brut = capital_brut - versement_total
+    interet_net = interet_brut * (1 - fiscalite)
+    capital_net = interet_net + versement_total
+
+    if top_k is not None:
+        masque = _masque_top_k(masque & (capital_net >= objectif), capital_net, top_k)
+
+    indice_personne, indice_epargne, indice_scenario = np.nonzero(masque)
+    noms = np.array([e.nom for e in epargnes], dtype=object)
+
+    resultats = ResultatsEpargne({
+        "indice_personne": indice_personne,
+        "indice_epargne": indice_epargne if positions_epargnes is None else positions_epargnes[indice_epargne],
+        "nom_produit_epargne": noms[indice_epargne],
+        "effort_mensuel": pourcentages[indice_scenario],
+        "total_versement": versement_total[masque],
+        "versement_max_epargne": versement_max[indice_epargne],
+        "montant_net_final": capital_net[masque],
+        "objectif_atteint": (capital_net >= objectif)[masque],
+        "interet_brut": interet_brut[masque],
+        "interet_net": interet_net[masque],
+    })
+    if top_k is not None:
+        # np.lexsort est stable : les ex aequo gardent l'ordre du catalogue
+        resultats = resultats[np.lexsort((-resultats["montant_net_final"], resultats["indice_personne"]))]
+    compter("resultats_produits", len(resultats))
+    return resultats
+
+
+def _masque_top_k(retenu: np.ndarray, valeurs: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Restreint un masque (P, E, S) aux top_k plus grandes valeurs retenues de chaque personne, par
+    np.partition plutôt que par un tri complet. À la limite, les ex aequo sont pris dans l'ordre
+    du catalogue.
+    """
+    if top_k <= 0:
+        raise ValueError(f"top_k doit être positif: {top_k}")
+    nb_personnes = retenu.shape[0]
+    if nb_personnes == 0 or retenu.size == 0:
+        # Aucune personne ou aucun produit : rien à départager
+        return retenu
+    retenu = retenu.reshape(nb_personnes, -1)
+    if top_k >= retenu.shape[1]:
+        return retenu.reshape(valeurs.shape)
+
+    candidates = np.where(retenu, valeurs.reshape(nb_personnes, -1), -np.inf)
+    seuil = -np.partition(-candidates, top_k - 1, axis=1)[:, top_k - 1:top_k]
+    superieures = retenu & (candidates > seuil)
+    egales = retenu & (candidates == seuil)
+    places = top_k - superieures.sum(axis=1, keepdims=True)
+    return (superieures | (egales & (np.cumsum(egales, axis=1) <= places))).reshape(valeurs.shape)
+
+
+def suggestion_epargne_flux(blocs_personnes: Iterable[List[Personne]],
+                            epargnes: Union[List[Epargne], EpargneIndex],
+                            top_k: Optional[int] = None) -> Iterator[Tuple[List[Personne], ResultatsEpargne]]:
+    """
+    Enchaîne suggestion_epargne_batch sur un flux de blocs de personnes, par exemple celui
+    d'iter_personnes, sans jamais garder plus d'un bloc en mémoire. Le catalogue est indexé une
+    fois pour toutes, pour écarter dans chaque bloc les produits qu'aucune durée n'atteint.
+
+    Args:
+        blocs_personnes (Iterable[List[Personne]]): Blocs de personnes à évaluer
+        epargnes (List[Epargne] | EpargneIndex): Catalogue des produits d'épargne
+        top_k (int, optional): Nombre de meilleurs résultats gardés par personne, voir
+            suggestion_epargne_batch
+
+    Yields:
+        Tuple[List[Personne], ResultatsEpargne]: Chaque bloc et ses résultats, dont indice_personne
+        renvoie à la position dans le bloc
+    """
+    if not isinstance(epargnes, EpargneIndex):
+        epargnes = EpargneIndex(epargnes)
+    for personnes in blocs_personnes:
+        yield personnes, suggestion_epargne_batch(personnes, epargnes, top_k=top_k)
+
+
+@chronometre("effort_minimal")
+def effort_minimal_batch(personnes: Union[List[Personne], PersonneTable], epargnes: List[Epargne],
+                         facteurs: Optional[TableFacteursCroissance] = None) -> "pd.DataFrame":
+    """
+    Calcule directement, pour chaque personne et chaque produit, le versement mensuel minimal qui
+    atteint l'objectif de la personne sur sa durée d'épargne.
+
+    Le capital net étant linéaire en le versement annuel v, il vaut v * (n + (facteur - n) * (1 - fiscalite))
+    pour une durée n : le versement minimal s'obtient par une seule division, au lieu d'essayer
+    les cinq scénarios d'effort de suggestion_epargne. Il est ensuite ajusté au flottant près
+    pour que le capital net, calculé comme dans suggestion_epargne, atteigne bien l'objectif.
+
+    Args:
+        personnes (List[Personne] | PersonneTable): Personnes à évaluer
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        facteurs (TableFacteursCroissance, optional): Cache des facteurs de croissance, par défaut
+            celui partagé du module
+
+    Returns:
+        pd.DataFrame: Une ligne par couple personne × produit pour lequel l'objectif est atteignable
+        (durée minimale respectée, plafond de versement non dépassé), avec indice_personne,
+        indice_epargne, nom_produit_epargne, versement_mensuel_min, total_versement,
+        montant_net_final, interet_brut, interet_net et dans_capacite (versement minimal au plus
+        égal à la capacité d'épargne mensuelle)
+    """
+    import pandas as pd
+    if facteurs is None:
+        facteurs = table_facteurs
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+
+    # Grille personnes × produits, de forme (P, E)
+    objectif = personnes["objectif"][:, None]
+    duree = personnes["duree_epargne"][:, None]
+    capacite = personnes._calcul_capacite_epargne()[:, None]
+    taux_interet = np.array([e.taux_interet for e in epargnes], dtype=float)
+    fiscalite = np.array([e.fiscalite for e in epargnes], dtype=float)[None, :]
+    duree_min = np.array([np.nan if e.duree_min is None else e.duree_min for e in epargnes], dtype=float)[None, :]
+    versement_max = np.array([np.nan if e.versement_max is None else e.versement_max for e in epargnes], dtype=float)[None, :]
+
+    durees, indice_duree = np.unique(personnes["duree_epargne"], return_inverse=True)
+    facteur = facteurs.facteurs(taux_interet, durees)[:, indice_duree].T
+
+    # Capital net par euro versé chaque année
+    rendement_net = duree + (facteur - duree) * (1 - fiscalite)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        versement_mensuel = np.maximum(objectif, 0) / (12 * rendement_net)
+    atteignable = ~(duree < duree_min) & (rendement_net > 0)
+
+    def evaluer(versement_mensuel):
+        # Mêmes opérations que suggestion_epargne, pour des montants identiques
+        versement_annuel = versement_mensuel * 12
+        versement_total = versement_annuel * duree
+        interet_brut = versement_annuel * facteur - versement_total
+        interet_net = interet_brut * (1 - fiscalite)
+        return versement_total, interet_brut, interet_net, interet_net + versement_total
+
+    versement_total, interet_brut, interet_net, capital_net = evaluer(versement_mensuel)
+    for _ in range(8):
+        insuffisant = atteignable & (capital_net < objectif)
+        if not insuffisant.any():
+            break
+        versement_mensuel = np.where(insuffisant, np.nextafter(versement_mensuel, np.inf), versement_mensuel)
+        versement_total, interet_brut, interet_net, capital_net = evaluer(versement_mensuel)
+
+    masque = atteignable & (capital_net >= objectif) & ~(versement_total > versement_max)
+
+    indice_personne, indice_epargne = np.nonzero(masque)
+    noms = np.array([e.nom for e in epargnes], dtype=object)
+    return pd.DataFrame({
+        "indice_personne": indice_personne,
+        "indice_epargne": indice_epargne,
+        "nom_produit_epargne": pd.Categorical(noms[indice_epargne]),
+        "versement_mensuel_min": versement_mensuel[masque],
+        "total_versement": versement_total[masque],
+        "montant_net_final": capital_net[masque],
+        "interet_brut": interet_brut[masque],
+        "interet_net": interet_net[masque],
+        "dans_capacite": (versement_mensuel <= capacite)[masque],
+    })
+
+
+@chronometre("allocation")
+def allocation_optimale_batch(personnes: Union[List[Personne], PersonneTable], epargnes: List[Epargne],
+                              versement_mensuel: Optional[np.ndarray] = None,
+                              facteurs: Optional[TableFacteursCroissance] = None) -> "pd.DataFrame":
+    """
+    Répartit le versement mensuel de chaque personne entre plusieurs produits éligibles, de façon
+    à maximiser le capital net final en respectant le plafond de versement de chaque produit.
+
+    Le capital net étant linéaire en le versement annuel de chaque produit (rendement_net par
+    euro versé, voir effort_minimal_batch), le problème est un programme linéaire dont la solution
+    est gloutonne : les produits sont remplis jusqu'à leur plafond par rendement net décroissant,
+    le reste débordant sur le suivant. Le tri, la somme cumulée des plafonds et l'écrêtage sont
+    faits sur toute la grille personnes × produits à la fois.
+
+    Args:
+        personnes (List[Personne] | PersonneTable): Personnes à évaluer
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        versement_mensuel (np.ndarray, optional): Versement mensuel à répartir, par personne ; par
+            défaut la capacité d'épargne mensuelle. Un versement négatif compte pour 0
+        facteurs (TableFacteursCroissance, optional): Cache des facteurs de croissance, par défaut
+            celui partagé du module
+
+    Returns:
+        pd.DataFrame: Une ligne par couple personne × produit recevant une part du versement, par
+        personne puis par rendement décroissant, avec indice_personne, indice_epargne,
+        nom_produit_epargne, versement_mensuel, total_versement, montant_net_final, interet_brut et
+        interet_net du produit, puis, pour la personne, capital_net_total, objectif_atteint et
+        non_place_mensuel (part du versement qu'aucun plafond ne permet de placer). Une personne
+        à qui rien n'est alloué (versement nul ou aucun produit éligible) a une seule ligne, avec
+        indice_epargne -1, un nom de produit manquant et des montants nuls
+    """
+    import pandas as pd
+    if facteurs is None:
+        facteurs = table_facteurs
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+    if versement_mensuel is None:
+        versement_mensuel = personnes._calcul_capacite_epargne()
+    versement_annuel = np.maximum(np.broadcast_to(np.asarray(versement_mensuel, dtype=float), (len(personnes),)), 0) * 12
+
+    # Grille personnes × produits, de forme (P, E)
+    objectif = personnes["objectif"]
+    duree = personnes["duree_epargne"][:, None]
+    taux_interet = np.array([e.taux_interet for e in epargnes], dtype=float)
+    fiscalite = np.array([e.fiscalite for e in epargnes], dtype=float)[None, :]
+    duree_min = np.array([np.nan if e.duree_min is None else e.duree_min for e in epargnes], dtype=float)[None, :]
+    versement_max = np.array([np.nan if e.versement_max is None else e.versement_max for e in epargnes], dtype=float)[None, :]
+
+    durees, indice_duree = np.unique(personnes["duree_epargne"], return_inverse=True)
+    facteur = facteurs.facteurs(taux_interet, durees)[:, indice_duree].T.reshape(len(personnes), len(epargnes))
+    rendement_net = duree + (facteur - duree) * (1 - fiscalite)
+    eligible = ~(duree < duree_min) & (duree > 0) & (rendement_net > 0)
+
+    # Versement annuel maximal de chaque produit : infini sans plafond, nul si le produit n'est pas éligible
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plafond_annuel = np.where(np.isnan(versement_max), np.inf, versement_max / duree)
+    plafond_annuel = np.where(eligible, plafond_annuel, 0.0)
+
+    # Remplissage glouton par rendement net décroissant (ex aequo dans l'ordre du catalogue)
+    ordre = np.argsort(np.where(eligible, -rendement_net, np.inf), axis=1, kind="stable")
+    plafonds_tries = np.take_along_axis(plafond_annuel, ordre, axis=1)
+    cumul = np.cumsum(plafonds_tries, axis=1)
+    deja_place = np.concatenate([np.zeros((len(personnes), 1)), cumul[:, :-1]], axis=1)
+    alloue_trie = np.clip(versement_annuel[:, None] - deja_place, 0, plafonds_tries)
+    alloue = np.empty_like(alloue_trie)
+    np.put_along_axis(alloue, ordre, alloue_trie, axis=1)
+
+    # Mêmes opérations que suggestion_epargne, produit par produit
+    versement_total = alloue * duree
+    interet_brut = alloue * facteur - versement_total
+    interet_net = interet_brut * (1 - fiscalite)
+    capital_net = interet_net + versement_total
+
+    capital_net_total = capital_net.sum(axis=1)
+    non_place = np.maximum(versement_annuel - (cumul[:, -1] if len(epargnes) else 0), 0) / 12
+
+    place = alloue_trie > 0
+    indice_personne, rang = np.nonzero(place)
+    indice_epargne = ordre[indice_personne, rang]
+    montants = {
+        "versement_mensuel": alloue[indice_personne, indice_epargne] / 12,
+        "total_versement": versement_total[indice_personne, indice_epargne],
+        "montant_net_final": capital_net[indice_personne, indice_epargne],
+        "interet_brut": interet_brut[indice_personne, indice_epargne],
+        "interet_net": interet_net[indice_personne, indice_epargne],
+    }
+
+    # Une ligne sans produit, aux montants nuls, pour chaque personne à qui rien n'est alloué
+    sans_produit = np.flatnonzero(~place.any(axis=1))
+    ordre_lignes = np.argsort(np.concatenate([indice_personne, sans_produit]), kind="stable")
+    indice_personne = np.concatenate([indice_personne, sans_produit])[ordre_lignes]
+    indice_epargne = np.concatenate([indice_epargne, np.full(len(sans_produit), -1)])[ordre_lignes]
+    montants = {col: np.concatenate([valeurs, np.zeros(len(sans_produit))])[ordre_lignes]
+                for col, valeurs in montants.items()}
+
+    # L'indice -1 désigne le nom manquant ajouté en fin de liste
+    noms = np.array([e.nom for e in epargnes] + [None], dtype=object)
+    return pd.DataFrame({
+        "indice_personne": indice_personne,
+        "indice_epargne": indice_epargne,
+        "nom_produit_epargne": pd.Categorical(noms[indice_epargne]),
+        **montants,
+        "capital_net_total": capital_net_total[indice_personne],
+        "objectif_atteint": (capital_net_total >= objectif)[indice_personne],
+        "non_place_mensuel": non_place[indice_personne],
+    })
@@ -0,0 +1,262 @@
+"""
+Calcul incrémental des suggestions d'épargne, avec un stockage disque des passages précédents.
+
+Le dossier contient un instantané des personnes et des produits, qui sert à repérer les lignes
+modifiées, et les résultats, répartis en segments : chaque passage n'écrit qu'un segment avec
+les résultats recalculés, et note dans index.json les personnes et produits dont il remplace
+tous les résultats. Les écritures de résultats sont ainsi proportionnelles aux changements, et
+non à la population. Au-delà de SEGMENTS_MAX segments, ils sont fusionnés en un seul. Les
+instantanés, eux, sont réécrits en entier quand une entrée change.
+
+Les dossiers écrits par un passage ont des noms nouveaux, et index.json, qui les désigne, est
+remplacé en dernier : un passage interrompu laisse le passage précédent intact.
+"""
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.gpe.core import suggestion_epargne_batch
+from src.gpe.models.epargne import Epargne
+from src.gpe.models.personne import Personne, PersonneTable
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.stockage import ecrire_colonnes, lire_colonnes
+from src.gpe.utils import TableFacteursCroissance
+
+logger = logging.getLogger(__name__)
+
+DOSSIER_RESULTATS = 'resultats'
+FICHIER_INDEX = 'index.json'
+
+# Nombre de segments de résultats au-delà duquel ils sont fusionnés en un seul
+SEGMENTS_MAX = 8
+
+
+def _dataframe_personnes(personnes: PersonneTable) -> pd.DataFrame:
+    df = pd.DataFrame(personnes.colonnes)
+    if df['nom'].duplicated().any():
+        raise ValueError("Les noms des personnes doivent être uniques pour le calcul incrémental")
+    return df
+
+
+def _dataframe_epargnes(epargnes: List[Epargne]) -> pd.DataFrame:
+    df = pd.DataFrame({
+        'nom': [e.nom for e in epargnes],
+        'taux_interet': [e.taux_interet for e in epargnes],
+        'fiscalite': [e.fiscalite for e in epargnes],
+        'duree_min': [np.nan if e.duree_min is None else e.duree_min for e in epargnes],
+        'versement_max': [np.nan if e.versement_max is None else e.versement_max for e in epargnes],
+    }).astype({'taux_interet': float, 'fiscalite': float, 'duree_min': float, 'versement_max': float})
+    if df['nom'].duplicated().any():
+        raise ValueError("Les noms des produits d'épargne doivent être uniques pour le calcul incrémental")
+    return df
+
+
+def _lignes_modifiees(ancien: pd.DataFrame, nouveau: pd.DataFrame) -> np.ndarray:
+    """
+    Renvoie, pour chaque ligne de nouveau, si elle est absente d'ancien ou si une de ses valeurs
+    a changé, en comparant les lignes par nom.
+    """
+    ancien = ancien.drop_duplicates('nom').set_index('nom')
+    nouveau = nouveau.set_index('nom')
+    colonnes = [col for col in nouveau.columns if col in ancien.columns]
+
+    aligne = ancien.reindex(nouveau.index)[colonnes]
+    identiques = (aligne.to_numpy(dtype=object) == nouveau[colonnes].to_numpy(dtype=object)) | \
+        (aligne.isna().to_numpy() & nouveau[colonnes].isna().to_numpy())
+    return ~nouveau.index.isin(ancien.index) | ~identiques.all(axis=1)
+
+
+def _ecrire_dossier(dossier: Path, index: dict, prefixe: str, df: pd.DataFrame) -> str:
+    """
+    Écrit df dans un nouveau dossier de colonnes, nommé d'après le compteur de index.
+
+    Returns:
+        str: Le nom du dossier, relatif à dossier
+    """
+    nom = f"{prefixe}{index['prochain']:06d}.colonnes"
+    index['prochain'] += 1
+    # Reste éventuel d'un passage interrompu avant l'écriture de l'index
+    shutil.rmtree(dossier / nom, ignore_errors=True)
+    ecrire_colonnes(df, str(dossier / nom))
+    return nom
+
+
+def _lire_index(dossier: Path) -> Optional[dict]:
+    try:
+        with open(dossier / FICHIER_INDEX, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _valider(dossier: Path, index: dict, obsoletes: Sequence[Optional[str]]) -> None:
+    # Le remplacement de l'index rend le passage définitif ; les dossiers qu'il ne désigne plus sont ensuite supprimés
+    temporaire = dossier / f"{FICHIER_INDEX}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(temporaire, dossier / FICHIER_INDEX)
+    for nom in obsoletes:
+        if nom is not None:
+            shutil.rmtree(dossier / nom, ignore_errors=True)
+
+
+def _dataframe_resultats(resultats: ResultatsEpargne, noms_personnes: np.ndarray) -> pd.DataFrame:
+    # Les résultats sont rattachés aux personnes par nom, leurs positions pouvant changer d'un passage à l'autre
+    colonnes = {col: resultats[col] for col in ResultatsEpargne.COLONNES}
+    colonnes['nom_personne'] = noms_personnes[resultats['indice_personne']]
+    return pd.DataFrame(colonnes)
+
+
+def _ajouter_segment(dossier: Path, index: dict, df_resultats: pd.DataFrame,
+                     personnes: Sequence[str], epargnes: Sequence[str]) -> None:
+    """
+    Écrit un segment de résultats qui remplace tous les résultats précédents des personnes et des
+    produits indiqués ; index est mis à jour mais pas enregistré.
+    """
+    nom = _ecrire_dossier(dossier, index, f"{DOSSIER_RESULTATS}/", df_resultats) if len(df_resultats) else None
+    index['segments'].append({'dossier': nom, 'personnes': list(personnes), 'epargnes': list(epargnes)})
+
+
+def _lire_resultats(dossier: Path, index: dict) -> pd.DataFrame:
+    """
+    Rassemble les lignes encore valables de tous les segments : une ligne est remplacée si un
+    segment plus récent recalcule sa personne ou son produit.
+    """
+    morceaux = []
+    personnes_remplacees: set = set()
+    epargnes_remplacees: set = set()
+    for segment in reversed(index['segments']):
+        if segment['dossier'] is not None:
+            df = lire_colonnes(str(dossier / segment['dossier']), mmap=False)
+            valables = ~df['nom_personne'].isin(personnes_remplacees) & ~df['nom_produit_epargne'].isin(epargnes_remplacees)
+            morceaux.append(df[valables.to_numpy()])
+        personnes_remplacees.update(segment['personnes'])
+        epargnes_remplacees.update(segment['epargnes'])
+    if not morceaux:
+        return pd.DataFrame({col: [] for col in list(ResultatsEpargne.COLONNES) + ['nom_personne']})
+    return pd.concat(morceaux[::-1], ignore_index=True)
+
+
+def _sauvegarder_complet(dossier: Path, index: Optional[dict], df_personnes: pd.DataFrame,
+                         df_epargnes: pd.DataFrame, resultats: ResultatsEpargne) -> None:
+    # Un seul segment avec tous les résultats, qui remplace les segments et instantanés précédents
+    dossier.mkdir(parents=True, exist_ok=True)
+    obsoletes = []
+    if index is not None:
+        obsoletes = [index['personnes'], index['epargnes']] + [segment['dossier'] for segment in index['segments']]
+    nouvel_index = {'prochain': index['prochain'] if index is not None else 0, 'segments': []}
+    nouvel_index['personnes'] = _ecrire_dossier(dossier, nouvel_index, 'personnes.', df_personnes)
+    nouvel_index['epargnes'] = _ecrire_dossier(dossier, nouvel_index, 'epargnes.', df_epargnes)
+    _ajouter_segment(dossier, nouvel_index, _dataframe_resultats(resultats, df_personnes['nom'].to_numpy(dtype=object)),
+                     [], [])
+    _valider(dossier, nouvel_index, obsoletes)
+
+
+def _reindexer(resultats: ResultatsEpargne, positions_personnes: np.ndarray,
+               positions_epargnes: Optional[np.ndarray] = None) -> ResultatsEpargne:
+    # Ramener les indices d'un calcul partiel aux positions dans les listes complètes
+    resultats.colonnes['indice_personne'] = positions_personnes[resultats['indice_personne']]
+    if positions_epargnes is not None:
+        resultats.colonnes['indice_epargne'] = positions_epargnes[resultats['indice_epargne']]
+    return resultats
+
+
+def suggestion_epargne_incrementale(personnes: Union[List[Personne], PersonneTable], epargnes: List[Epargne],
+                                    dossier: str, facteurs: Optional[TableFacteursCroissance] = None) -> ResultatsEpargne:
+    """
+    Calcule les suggestions d'épargne en ne recalculant que ce qui a changé depuis le passage précédent.
+
+    Les personnes et les produits sont comparés par nom aux entrées enregistrées dans dossier.
+    Seules les cellules personne × produit dont la personne ou le produit est nouveau ou modifié
+    sont recalculées ; les autres résultats sont repris du passage précédent, et ceux des
+    personnes ou produits disparus sont supprimés. Seuls les résultats recalculés sont écrits,
+    dans un nouveau segment, avec les entrées si elles ont changé. Le premier passage calcule tout.
+
+    Le résultat est identique à suggestion_epargne_batch(personnes, epargnes).
+
+    Args:
+        personnes (List[Personne] | PersonneTable): Personnes à évaluer, aux noms uniques
+        epargnes (List[Epargne]): Catalogue des produits d'épargne, aux noms uniques
+        dossier (str): Dossier où sont conservés les entrées et résultats du passage précédent
+        facteurs (TableFacteursCroissance, optional): Cache des facteurs de croissance
+
+    Returns:
+        ResultatsEpargne: Résultats en colonnes, dans l'ordre de suggestion_epargne_batch
+
+    Raises:
+        ValueError: Si des personnes ou des produits ont le même nom
+    """
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+    df_personnes = _dataframe_personnes(personnes)
+    df_epargnes = _dataframe_epargnes(epargnes)
+    chemin = Path(dossier)
+    index = _lire_index(chemin)
+
+    if index is None:
+        logger.info(f"Calcul incrémental: aucun passage précédent dans {dossier}, calcul complet")
+        resultats = suggestion_epargne_batch(personnes, epargnes, facteurs)
+        _sauvegarder_complet(chemin, None, df_personnes, df_epargnes, resultats)
+        return resultats
+
+    anciennes_personnes = lire_colonnes(str(chemin / index['personnes']), mmap=False)
+    anciennes_epargnes = lire_colonnes(str(chemin / index['epargnes']), mmap=False)
+    personnes_modifiees = _lignes_modifiees(anciennes_personnes, df_personnes)
+    epargnes_modifiees = _lignes_modifiees(anciennes_epargnes, df_epargnes)
+    personnes_retirees = sorted(set(anciennes_personnes['nom']) - set(df_personnes['nom']))
+    epargnes_retirees = sorted(set(anciennes_epargnes['nom']) - set(df_epargnes['nom']))
+    anciens = _lire_resultats(chemin, index)
+
+    # Reprendre les anciens résultats dont ni la personne ni le produit n'ont changé
+    indice_personne = pd.Index(df_personnes['nom']).get_indexer(anciens['nom_personne'])
+    indice_epargne = pd.Index(df_epargnes['nom']).get_indexer(anciens['nom_produit_epargne'])
+    garder = (indice_personne >= 0) & (indice_epargne >= 0)
+    garder[garder] = ~personnes_modifiees[indice_personne[garder]] & ~epargnes_modifiees[indice_epargne[garder]]
+    colonnes = {col: anciens[col].to_numpy(dtype=dtype)[garder] for col, dtype in ResultatsEpargne.COLONNES.items()}
+    colonnes['indice_personne'] = indice_personne[garder]
+    colonnes['indice_epargne'] = indice_epargne[garder]
+    repris = ResultatsEpargne(colonnes)
+
+    # Recalculer les personnes modifiées sur tout le catalogue, et les autres sur les produits modifiés
+    positions_modifiees = np.flatnonzero(personnes_modifiees)
+    positions_inchangees = np.flatnonzero(~personnes_modifiees)
+    positions_epargnes = np.flatnonzero(epargnes_modifiees)
+    recalcules = ResultatsEpargne.concatener([
+        _reindexer(suggestion_epargne_batch(personnes[positions_modifiees], epargnes, facteurs), positions_modifiees),
+        _reindexer(suggestion_epargne_batch(personnes[positions_inchangees], [epargnes[i] for i in positions_epargnes], facteurs),
+                   positions_inchangees, positions_epargnes),
+    ])
+
+    # Remettre les résultats dans l'ordre personne, produit, scénario (l'effort croît avec le scénario)
+    resultats = ResultatsEpargne.concatener([repris, recalcules])
+    resultats = resultats[np.lexsort((resultats['effort_mensuel'], resultats['indice_epargne'], resultats['indice_personne']))]
+
+    logger.info(f"Calcul incrémental: {len(positions_modifiees)} personnes et {len(positions_epargnes)} produits modifiés, "
+                f"{len(recalcules)} résultats recalculés, {len(repris)} repris")
+
+    noms_personnes = df_personnes['nom'].to_numpy(dtype=object)
+    personnes_remplacees = noms_personnes[positions_modifiees].tolist() + personnes_retirees
+    epargnes_remplacees = df_epargnes['nom'].to_numpy(dtype=object)[positions_epargnes].tolist() + epargnes_retirees
+    if not personnes_remplacees and not epargnes_remplacees:
+        return resultats
+    if len(index['segments']) >= SEGMENTS_MAX:
+        _sauvegarder_complet(chemin, index, df_personnes, df_epargnes, resultats)
+        return resultats
+
+    obsoletes = []
+    _ajouter_segment(chemin, index, _dataframe_resultats(recalcules, noms_personnes),
+                     personnes_remplacees, epargnes_remplacees)
+    if personnes_remplacees:
+        obsoletes.append(index['personnes'])
+        index['personnes'] = _ecrire_dossier(chemin, index, 'personnes.', df_personnes)
+    if epargnes_remplacees:
+        obsoletes.append(index['epargnes'])
+        index['epargnes'] = _ecrire_dossier(chemin, index, 'epargnes.', df_epargnes)
+    _valider(chemin, index, obsoletes)
+    return resultats
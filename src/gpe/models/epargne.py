@@ -1,11 +1,20 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional, Sequence
+
+
 class Epargne:
 
-    def __init__(self, nom: str, taux_interet: float, fiscalite: float, duree_min: int, versement_max: float = None):
+    __slots__ = ("nom", "taux_interet", "fiscalite", "duree_min", "versement_max", "volatilite")
+
+    def __init__(self, nom: str, taux_interet: float, fiscalite: float, duree_min: int, versement_max: float = None,
+                 volatilite: float = 0.0):
         self.nom = nom
         self.taux_interet = taux_interet
         self.fiscalite = fiscalite
         self.duree_min = duree_min
         self.versement_max = versement_max
+        # Écart type annuel du taux, utilisé par les projections Monte-Carlo ; 0 pour un taux fixe
+        self.volatilite = volatilite
 
     def __repr__(self):
         return f"""
@@ -14,7 +23,8 @@ Epargne(
 \ttaux_interet={self.taux_interet},
 \tfiscalite={self.fiscalite},
 \tduree_min={self.duree_min},
-\tversement_max={self.versement_max}
+\tversement_max={self.versement_max},
+\tvolatilite={self.volatilite}
 )
 """
 
@@ -24,6 +34,74 @@ Epargne(
                 f"une fiscalité de {self.fiscalite}, une durée minimale de {self.duree_min} ans, "
                 f"{versement_info}.")
 
+class EpargneIndex:
+    """
+    Catalogue de produits d'épargne indexé par durée minimale et par plafond de versement.
+
+    L'index se parcourt comme la liste d'origine, dans le même ordre, et peut donc remplacer
+    le catalogue partout où une liste d'Epargne est attendue. eligibles() trouve par
+    bissection les produits accessibles à une durée et un versement total donnés.
+    """
+
+    def __init__(self, epargnes: Sequence[Epargne]):
+        self.epargnes = list(epargnes)
+
+        # Une durée minimale absente ne restreint pas le produit
+        self._durees_min = [0 if e.duree_min is None else e.duree_min for e in self.epargnes]
+        self._ordre_duree = sorted(range(len(self.epargnes)), key=self._durees_min.__getitem__)
+        self._durees_triees = [self._durees_min[i] for i in self._ordre_duree]
+
+        plafonnes = [i for i, e in enumerate(self.epargnes) if e.versement_max is not None]
+        self._ordre_plafond = sorted(plafonnes, key=lambda i: self.epargnes[i].versement_max)
+        self._plafonds_tries = [self.epargnes[i].versement_max for i in self._ordre_plafond]
+        self._sans_plafond = [i for i, e in enumerate(self.epargnes) if e.versement_max is None]
+
+    def __len__(self) -> int:
+        return len(self.epargnes)
+
+    def __iter__(self) -> Iterator[Epargne]:
+        return iter(self.epargnes)
+
+    def __getitem__(self, indice: int) -> Epargne:
+        return self.epargnes[indice]
+
+    def eligibles(self, duree: float, versement_total: Optional[float] = None) -> List[Epargne]:
+        """
+        Renvoie les produits dont la durée minimale est au plus duree et, si versement_total est
+        donné, dont le plafond éventuel est au moins versement_total.
+
+        Seule la plus petite des deux listes de candidats (par durée, par plafond) est parcourue.
+
+        Args:
+            duree (float): Durée d'épargne en années
+            versement_total (float, optional): Total des versements prévus sur la durée
+
+        Returns:
+            List[Epargne]: Les produits éligibles, dans l'ordre du catalogue
+        """
+        return [self.epargnes[i] for i in self.indices_eligibles(duree, versement_total)]
+
+    def indices_eligibles(self, duree: float, versement_total: Optional[float] = None) -> List[int]:
+        """
+        Comme eligibles(), mais renvoie les positions des produits dans le catalogue.
+
+        Returns:
+            List[int]: Les positions croissantes des produits éligibles
+        """
+        nb_par_duree = bisect_right(self._durees_triees, duree)
+        if versement_total is None:
+            candidats = self._ordre_duree[:nb_par_duree]
+        else:
+            debut_plafond = bisect_left(self._plafonds_tries, versement_total)
+            nb_par_plafond = len(self._sans_plafond) + len(self._ordre_plafond) - debut_plafond
+            if nb_par_duree <= nb_par_plafond:
+                candidats = [i for i in self._ordre_duree[:nb_par_duree]
+                             if self.epargnes[i].versement_max is None or self.epargnes[i].versement_max >= versement_total]
+            else:
+                candidats = [i for i in self._sans_plafond + self._ordre_plafond[debut_plafond:]
+                             if self._durees_min[i] <= duree]
+        return sorted(candidats)
+
 if __name__ == '__main__':
     epargne_1 = Epargne(
         nom="Livret A",
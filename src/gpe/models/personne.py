@@ -1,5 +1,12 @@
+import numpy as np
+from typing import Iterator, Optional, Sequence
+
+
 class Personne:
 
+    __slots__ = ("nom", "age", "revenu_annuel", "loyer", "depenses_mensuelles", "objectif", "duree_epargne",
+                 "versement_mensuel_utilisateur")
+
     def __init__(self, nom: str, age: int, revenu_annuel: float, loyer: float, depenses_mensuelles: float, objectif: float, duree_epargne: int, versement_mensuel_utilisateur: float = 0):
         self.nom = nom
         self.age = age
@@ -36,6 +43,76 @@ Personne(
         return (self.revenu_annuel / 12) - self.loyer - self.depenses_mensuelles
 
 
+class PersonneTable:
+    """
+    Population de personnes stockée en colonnes NumPy parallèles, une par attribut de Personne.
+
+    L'accès par entier (ou l'itération) construit à la demande la Personne correspondante ;
+    l'accès par nom d'attribut renvoie la colonne.
+    """
+
+    COLONNES = {
+        "nom": object,
+        "age": np.float64,
+        "revenu_annuel": np.float64,
+        "loyer": np.float64,
+        "depenses_mensuelles": np.float64,
+        "objectif": np.float64,
+        "duree_epargne": np.float64,
+        "versement_mensuel_utilisateur": np.float64,
+    }
+
+    def __init__(self, nom: Sequence[str], age: Sequence[int], revenu_annuel: Sequence[float], loyer: Sequence[float],
+                 depenses_mensuelles: Sequence[float], objectif: Sequence[float], duree_epargne: Sequence[int],
+                 versement_mensuel_utilisateur: Optional[Sequence[float]] = None):
+        if versement_mensuel_utilisateur is None:
+            versement_mensuel_utilisateur = np.zeros(len(nom))
+        valeurs = (nom, age, revenu_annuel, loyer, depenses_mensuelles, objectif, duree_epargne,
+                   versement_mensuel_utilisateur)
+        self.colonnes = {col: np.asarray(v, dtype=dtype) for (col, dtype), v in zip(self.COLONNES.items(), valeurs)}
+
+        tailles = {col: len(v) for col, v in self.colonnes.items()}
+        if len(set(tailles.values())) > 1:
+            raise ValueError(f"Les colonnes n'ont pas toutes la même taille: {tailles}")
+
+    @classmethod
+    def depuis_personnes(cls, personnes: Sequence[Personne]) -> "PersonneTable":
+        """
+        Construit la table à partir d'une liste de Personne.
+        """
+        return cls(*([getattr(p, col) for p in personnes] for col in cls.COLONNES))
+
+    def __len__(self) -> int:
+        return len(self.colonnes["nom"])
+
+    def __getitem__(self, cle):
+        if isinstance(cle, str):
+            return self.colonnes[cle]
+        if isinstance(cle, (int, np.integer)):
+            if cle < 0:
+                cle += len(self)
+            if not 0 <= cle < len(self):
+                raise IndexError(f"Indice {cle} hors limites pour {len(self)} personnes")
+            return self._personne(int(cle))
+        return PersonneTable(*(valeurs[cle] for valeurs in self.colonnes.values()))
+
+    def __iter__(self) -> Iterator[Personne]:
+        for indice in range(len(self)):
+            yield self._personne(indice)
+
+    def _personne(self, indice: int) -> Personne:
+        # Les entiers sont stockés en float pour admettre NaN ; on les restitue en int
+        valeurs = {col: v[indice].item() if isinstance(v[indice], np.generic) else v[indice]
+                   for col, v in self.colonnes.items()}
+        for col in ("age", "duree_epargne"):
+            if float(valeurs[col]).is_integer():
+                valeurs[col] = int(valeurs[col])
+        return Personne(**valeurs)
+
+    def _calcul_capacite_epargne(self) -> np.ndarray:
+        return (self.colonnes["revenu_annuel"] / 12) - self.colonnes["loyer"] - self.colonnes["depenses_mensuelles"]
+
+
 if __name__ == '__main__':
     personne_1 = Personne(
         nom="Jacques",
@@ -1,4 +1,10 @@
-import pandas as pd
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.gpe.models.personne import Personne
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class ResultatEpargne:
 
@@ -33,14 +39,245 @@ class ResultatEpargne:
               f"{self.total_versement:>15.2f} €"
               f"{'Aucun' if not self.versement_max_epargne else f'{self.versement_max_epargne:.2f} €':>15}")
 
-    def to_dataframe(self):
-        pd.DataFrame({
-            "nom_produit_epargne": self.nom_produit_epargne,
-            "effort_mensuel": self.effort_mensuel,
-            "total_versement": self.total_versement,
-            "versement_max_epargne": self.versement_max_epargne,
-            "montant_net_final": self.montant_net_final,
-            "objectif_atteint": self.objectif_atteint,
-            "interet_brut": self.interet_brut,
-            "interet_net": self.interet_net,
-        })
\ No newline at end of file
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Returns:
+            pd.DataFrame: Le résultat sous forme d'un DataFrame d'une ligne
+        """
+        return ResultatsEpargne.depuis_liste([self]).to_dataframe()
+
+
+class VueResultatEpargne(ResultatEpargne):
+    """
+    Vue légère sur une ligne d'un ResultatsEpargne.
+
+    Les attributs sont lus à la demande dans les colonnes du conteneur, sans copie ; afficher()
+    et __str__ sont ceux de ResultatEpargne.
+    """
+
+    __slots__ = ("_colonnes", "_indice")
+
+    def __init__(self, colonnes: Dict[str, np.ndarray], indice: int):
+        self._colonnes = colonnes
+        self._indice = indice
+
+    def _valeur(self, colonne: str):
+        valeur = self._colonnes[colonne][self._indice]
+        return valeur.item() if isinstance(valeur, np.generic) else valeur
+
+    @property
+    def nom_produit_epargne(self) -> str:
+        return self._valeur("nom_produit_epargne")
+
+    @property
+    def effort_mensuel(self) -> float:
+        return self._valeur("effort_mensuel")
+
+    @property
+    def total_versement(self) -> float:
+        return self._valeur("total_versement")
+
+    @property
+    def versement_max_epargne(self) -> Optional[float]:
+        # Un plafond absent est stocké en NaN dans la colonne
+        versement_max = self._valeur("versement_max_epargne")
+        return None if np.isnan(versement_max) else versement_max
+
+    @property
+    def montant_net_final(self) -> float:
+        return self._valeur("montant_net_final")
+
+    @property
+    def objectif_atteint(self) -> bool:
+        return self._valeur("objectif_atteint")
+
+    @property
+    def interet_brut(self) -> float:
+        return self._valeur("interet_brut")
+
+    @property
+    def interet_net(self) -> float:
+        return self._valeur("interet_net")
+
+
+class ResultatsEpargne:
+    """
+    Conteneur en colonnes de résultats d'épargne : un tableau NumPy typé par attribut de
+    ResultatEpargne, plus éventuellement indice_personne et indice_epargne.
+
+    L'accès par entier renvoie une VueResultatEpargne, l'accès par tranche, masque ou tableau
+    d'indices renvoie un nouveau ResultatsEpargne, et l'accès par nom renvoie la colonne.
+    """
+
+    COLONNES = {
+        "nom_produit_epargne": object,
+        "effort_mensuel": np.float64,
+        "total_versement": np.float64,
+        "versement_max_epargne": np.float64,
+        "montant_net_final": np.float64,
+        "objectif_atteint": np.bool_,
+        "interet_brut": np.float64,
+        "interet_net": np.float64,
+    }
+
+    def __init__(self, colonnes: Dict[str, np.ndarray]):
+        colonnes_manquantes = [col for col in self.COLONNES if col not in colonnes]
+        if colonnes_manquantes:
+            raise ValueError(f"Colonnes manquantes pour ResultatsEpargne: {colonnes_manquantes}")
+        self.colonnes = {col: np.asarray(valeurs, dtype=self.COLONNES.get(col)) for col, valeurs in colonnes.items()}
+
+    @classmethod
+    def depuis_liste(cls, resultats: Sequence[ResultatEpargne]) -> "ResultatsEpargne":
+        """
+        Construit le conteneur à partir d'une liste de ResultatEpargne.
+
+        Args:
+            resultats (Sequence[ResultatEpargne]): Résultats à convertir
+
+        Returns:
+            ResultatsEpargne: Les mêmes résultats en colonnes
+        """
+        colonnes = {col: [getattr(r, col) for r in resultats] for col in cls.COLONNES}
+        colonnes["versement_max_epargne"] = [np.nan if v is None else v for v in colonnes["versement_max_epargne"]]
+        return cls(colonnes)
+
+    @classmethod
+    def concatener(cls, resultats: Sequence["ResultatsEpargne"]) -> "ResultatsEpargne":
+        """
+        Met bout à bout plusieurs conteneurs, dans l'ordre donné.
+
+        Args:
+            resultats (Sequence[ResultatsEpargne]): Conteneurs ayant les mêmes colonnes
+
+        Returns:
+            ResultatsEpargne: Un conteneur unique, vide si la séquence l'est
+        """
+        if not resultats:
+            return cls({col: np.empty(0, dtype=dtype) for col, dtype in cls.COLONNES.items()})
+        return cls({col: np.concatenate([r.colonnes[col] for r in resultats]) for col in resultats[0].colonnes})
+
+    def __len__(self) -> int:
+        return len(self.colonnes["montant_net_final"])
+
+    def __iter__(self) -> Iterator[VueResultatEpargne]:
+        for indice in range(len(self)):
+            yield VueResultatEpargne(self.colonnes, indice)
+
+    def __getitem__(self, cle: Union[int, str, slice, np.ndarray]):
+        if isinstance(cle, str):
+            return self.colonnes[cle]
+        if isinstance(cle, (int, np.integer)):
+            if cle < 0:
+                cle += len(self)
+            if not 0 <= cle < len(self):
+                raise IndexError(f"Indice {cle} hors limites pour {len(self)} résultats")
+            return VueResultatEpargne(self.colonnes, int(cle))
+        return ResultatsEpargne({col: valeurs[cle] for col, valeurs in self.colonnes.items()})
+
+    def __repr__(self):
+        return f"ResultatsEpargne({len(self)} résultats)"
+
+    def filtrer_objectif_atteint(self) -> "ResultatsEpargne":
+        """
+        Returns:
+            ResultatsEpargne: Les seuls résultats dont l'objectif est atteint
+        """
+        return self[self.colonnes["objectif_atteint"]]
+
+    def trier_par(self, colonne: str = "montant_net_final", decroissant: bool = True) -> "ResultatsEpargne":
+        """
+        Trie les résultats selon une colonne, en conservant l'ordre d'origine des ex aequo
+        (comme sorted(..., reverse=decroissant)).
+
+        Args:
+            colonne (str): Colonne de tri
+            decroissant (bool): Tri décroissant si True
+
+        Returns:
+            ResultatsEpargne: Les résultats triés
+        """
+        valeurs = self.colonnes[colonne]
+        ordre = np.argsort(-valeurs if decroissant else valeurs, kind="stable")
+        return self[ordre]
+
+    def grouper_par_personne(self, nb_personnes: int) -> List["ResultatsEpargne"]:
+        """
+        Découpe les résultats par personne selon la colonne indice_personne, en conservant
+        l'ordre des résultats au sein de chaque personne.
+
+        Args:
+            nb_personnes (int): Nombre de personnes évaluées
+
+        Returns:
+            List[ResultatsEpargne]: Un conteneur par personne, éventuellement vide
+        """
+        if "indice_personne" not in self.colonnes:
+            raise ValueError("La colonne indice_personne est nécessaire pour grouper par personne")
+        resultats = self
+        indices = resultats.colonnes["indice_personne"]
+        if np.any(indices[1:] < indices[:-1]):
+            resultats = resultats[np.argsort(indices, kind="stable")]
+            indices = resultats.colonnes["indice_personne"]
+        bornes = np.searchsorted(indices, np.arange(nb_personnes + 1))
+        return [resultats[bornes[i]:bornes[i + 1]] for i in range(nb_personnes)]
+
+    # Même mise en page que ResultatEpargne.afficher, appliquée à un tuple de valeurs
+    GABARIT_LIGNE = "%-40s %15.2f %% %15.2f € %15.2f € %15.2f €%15.2f €%15s"
+
+    def lignes_texte(self) -> List[str]:
+        """
+        Formate tous les résultats d'un coup, colonne par colonne, avec la mise en page de
+        ResultatEpargne.afficher.
+
+        Returns:
+            List[str]: Une ligne par résultat, sans saut de ligne final
+        """
+        colonnes = self.colonnes
+        plafonds = ["Aucun" if not v or v != v else f"{v:.2f} €"
+                    for v in colonnes["versement_max_epargne"].tolist()]
+        return [self.GABARIT_LIGNE % valeurs for valeurs in zip(
+            colonnes["nom_produit_epargne"].tolist(),
+            colonnes["effort_mensuel"].tolist(),
+            colonnes["montant_net_final"].tolist(),
+            colonnes["interet_brut"].tolist(),
+            colonnes["interet_net"].tolist(),
+            colonnes["total_versement"].tolist(),
+            plafonds,
+        )]
+
+    def afficher(self):
+        if len(self):
+            print("\n".join(self.lignes_texte()))
+
+    def to_dataframe(self, personnes: Optional[Sequence[Personne]] = None) -> "pd.DataFrame":
+        """
+        Exporte tous les résultats dans un seul DataFrame, colonne par colonne.
+
+        Les montants sont en float64, objectif_atteint en bool et nom_produit_epargne en
+        catégorie. Les colonnes indice_personne et indice_epargne sont reprises si présentes.
+
+        Args:
+            personnes (Sequence[Personne], optional): Personnes évaluées, dans l'ordre de
+                indice_personne ; ajoute la colonne nom_personne
+
+        Returns:
+            pd.DataFrame: Une ligne par résultat
+
+        Raises:
+            ValueError: Si personnes est fourni sans colonne indice_personne
+        """
+        import pandas as pd
+        donnees = {}
+        if "indice_personne" in self.colonnes:
+            donnees["indice_personne"] = self.colonnes["indice_personne"]
+        if personnes is not None:
+            if "indice_personne" not in self.colonnes:
+                raise ValueError("La colonne indice_personne est nécessaire pour rattacher les personnes")
+            noms_personnes = np.array([p.nom for p in personnes], dtype=object)
+            donnees["nom_personne"] = noms_personnes[self.colonnes["indice_personne"]]
+        for col in self.COLONNES:
+            donnees[col] = self.colonnes[col]
+        donnees["nom_produit_epargne"] = pd.Categorical(self.colonnes["nom_produit_epargne"])
+        if "indice_epargne" in self.colonnes:
+            donnees["indice_epargne"] = self.colonnes["indice_epargne"]
+        return pd.DataFrame(donnees, copy=False)
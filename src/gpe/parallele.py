@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
+
+from src.gpe.core import suggestion_epargne_batch
+from src.gpe.models.epargne import Epargne
+from src.gpe.models.personne import Personne, PersonneTable
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.profilage import chronometre
+
+# Catalogue des produits d'épargne, transmis une seule fois à chaque processus
+_epargnes_processus: List[Epargne] = []
+
+
+def _initialiser_processus(epargnes: List[Epargne]) -> None:
+    global _epargnes_processus
+    _epargnes_processus = epargnes
+
+
+def _evaluer_bloc(debut: int, personnes: Union[List[Personne], PersonneTable], epargnes: Optional[List[Epargne]] = None,
+                  top_k: Optional[int] = None) -> ResultatsEpargne:
+    resultats = suggestion_epargne_batch(personnes, _epargnes_processus if epargnes is None else epargnes, top_k=top_k)
+    # Ramener indice_personne à la position dans la liste complète
+    resultats.colonnes["indice_personne"] += debut
+    return resultats
+
+
+@chronometre("suggestion_parallele")
+def suggestion_epargne_parallele(personnes: Union[List[Personne], PersonneTable], epargnes: List[Epargne],
+                                 nb_processus: Optional[int] = None, taille_bloc: int = 10_000,
+                                 top_k: Optional[int] = None) -> ResultatsEpargne:
+    """
+    Calcule suggestion_epargne_batch sur plusieurs cœurs, en découpant les personnes en blocs
+    traités par un ProcessPoolExecutor.
+
+    Le catalogue des produits est envoyé une seule fois à chaque processus. Les résultats sont
+    réassemblés dans l'ordre des personnes : ils sont identiques à ceux de
+    suggestion_epargne_batch(personnes, epargnes).
+
+    Args:
+        personnes (List[Personne] | PersonneTable): Personnes à évaluer ; une PersonneTable
+            est découpée en tables, moins coûteuses à transmettre aux processus
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        nb_processus (int, optional): Nombre de processus, par défaut le nombre de cœurs ;
+            avec 1, le calcul se fait dans le processus courant
+        taille_bloc (int): Nombre de personnes par bloc envoyé à un processus
+        top_k (int, optional): Nombre de meilleurs résultats gardés par personne, voir
+            suggestion_epargne_batch
+
+    Returns:
+        ResultatsEpargne: Résultats en colonnes, indice_personne renvoyant à la liste complète
+
+    Raises:
+        ValueError: Si nb_processus ou taille_bloc n'est pas positif
+    """
+    if nb_processus is None:
+        nb_processus = os.cpu_count() or 1
+    if nb_processus <= 0:
+        raise ValueError(f"Le nombre de processus doit être positif: {nb_processus}")
+    if taille_bloc <= 0:
+        raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+
+    debuts = range(0, len(personnes), taille_bloc)
+    blocs = [personnes[debut:debut + taille_bloc] for debut in debuts]
+
+    if not blocs:
+        return suggestion_epargne_batch(personnes, epargnes, top_k=top_k)
+    if nb_processus == 1 or len(blocs) == 1:
+        return ResultatsEpargne.concatener([_evaluer_bloc(debut, bloc, epargnes, top_k) for debut, bloc in zip(debuts, blocs)])
+
+    # map rend les résultats dans l'ordre de soumission, quel que soit l'ordre de fin des processus
+    with ProcessPoolExecutor(max_workers=min(nb_processus, len(blocs)),
+                             initializer=_initialiser_processus, initargs=(epargnes,)) as executeur:
+        return ResultatsEpargne.concatener(list(executeur.map(_evaluer_bloc, debuts, blocs, [None] * len(blocs), [top_k] * len(blocs))))
@@ -0,0 +1,152 @@
+import functools
+import time
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Optional
+
+# Instrumentation désactivée par défaut : etape(), chronometre() et compter() se réduisent alors
+# à un test de ce booléen
+_actif = False
+_debut_activation = 0.0
+_temps: Dict[str, float] = {}
+_appels: Dict[str, int] = {}
+_compteurs: Dict[str, int] = {}
+# Chemins des étapes en cours, de la plus englobante à la plus intérieure
+_pile: List[str] = []
+
+_INACTIF = nullcontext()
+
+
+class _Chrono:
+    __slots__ = ("nom", "chemin", "debut")
+
+    def __init__(self, nom: str):
+        self.nom = nom
+
+    def __enter__(self) -> "_Chrono":
+        englobante = _pile[-1] if _pile else None
+        if englobante is not None and (englobante == self.nom or englobante.endswith("." + self.nom)):
+            # Une étape rouverte dans elle-même (appel récursif) n'est comptée qu'une fois
+            self.chemin = None
+            return self
+        self.chemin = f"{englobante}.{self.nom}" if englobante is not None else self.nom
+        _pile.append(self.chemin)
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.chemin is None:
+            return
+        duree = time.perf_counter() - self.debut
+        _pile.pop()
+        _temps[self.chemin] = _temps.get(self.chemin, 0.0) + duree
+        _appels[self.chemin] = _appels.get(self.chemin, 0) + 1
+
+
+def activer() -> None:
+    """
+    Active la mesure des étapes et des compteurs, remis à zéro.
+    """
+    global _actif, _debut_activation
+    reinitialiser()
+    _debut_activation = time.perf_counter()
+    _actif = True
+
+
+def desactiver() -> None:
+    global _actif
+    _actif = False
+
+
+def est_actif() -> bool:
+    return _actif
+
+
+def reinitialiser() -> None:
+    _temps.clear()
+    _appels.clear()
+    _compteurs.clear()
+
+
+def etape(nom: str) -> ContextManager:
+    """
+    Chronomètre le bloc with d'une étape. Les temps d'une même étape s'additionnent d'un appel à
+    l'autre. Une étape ouverte dans une autre est mesurée comme sous-étape, sous le nom pointé de
+    l'englobante ('import_personnes.lecture' pour 'lecture' dans 'import_personnes') : son temps
+    est compris dans celui de l'englobante, et non ajouté à côté.
+
+    Args:
+        nom (str): Nom de l'étape, sans le préfixe de l'étape englobante
+
+    Returns:
+        ContextManager: Un chronomètre, ou un contexte vide partagé si l'instrumentation est désactivée
+    """
+    if not _actif:
+        return _INACTIF
+    return _Chrono(nom)
+
+
+def chronometre(nom: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Décorateur chronométrant chaque appel d'une fonction comme une étape.
+
+    Args:
+        nom (str, optional): Nom de l'étape, par défaut celui de la fonction
+    """
+    def decorer(fonction: Callable) -> Callable:
+        nom_etape = nom or fonction.__name__
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            with _Chrono(nom_etape):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorer
+
+
+def compter(nom: str, nombre: int = 1) -> None:
+    """
+    Ajoute nombre au compteur nom (lignes importées, rejetées, résultats produits...).
+    """
+    if _actif:
+        _compteurs[nom] = _compteurs.get(nom, 0) + int(nombre)
+
+
+def mesures() -> dict:
+    """
+    Returns:
+        dict: {'etapes': {nom: {'temps_s', 'appels'}}, 'compteurs': {nom: valeur}, 'total_s'},
+        les sous-étapes ayant un nom pointé et le total étant le temps écoulé depuis activer()
+    """
+    return {
+        "etapes": {nom: {"temps_s": temps, "appels": _appels[nom]} for nom, temps in _temps.items()},
+        "compteurs": dict(_compteurs),
+        "total_s": time.perf_counter() - _debut_activation if _actif else None,
+    }
+
+
+def rapport_etapes() -> str:
+    """
+    Formate le temps passé dans chaque étape, chaque sous-étape indentée sous son étape, puis les
+    compteurs. Les parts sont rapportées au temps total : celles des étapes de premier niveau
+    s'additionnent à au plus 100 %, celles des sous-étapes sont comprises dans leur étape.
+
+    Returns:
+        str: Le tableau des étapes et des compteurs
+    """
+    donnees = mesures()
+    total = donnees["total_s"]
+    lignes = [f"{'Étape':<32} {'Appels':>8} {'Temps (s)':>12} {'Part':>7}"]
+    # L'ordre des chemins découpés place chaque sous-étape juste après son étape
+    for nom in sorted(donnees["etapes"], key=lambda chemin: chemin.split(".")):
+        mesure = donnees["etapes"][nom]
+        part = f"{100 * mesure['temps_s'] / total:>6.1f}%" if total else ""
+        libelle = "  " * nom.count(".") + nom.rsplit(".", 1)[-1]
+        lignes.append(f"{libelle:<32} {mesure['appels']:>8} {mesure['temps_s']:>12.4f} {part:>7}")
+    if total is not None:
+        lignes.append(f"{'total':<32} {'':>8} {total:>12.4f}")
+    if donnees["compteurs"]:
+        lignes.append("")
+        lignes.extend(f"{nom:<32} {valeur:>12}" for nom, valeur in sorted(donnees["compteurs"].items()))
+    return "\n".join(lignes)
@@ -0,0 +1,248 @@
+import gzip
+import io
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence, TextIO, Union
+
+import numpy as np
+
+from src.gpe.models.personne import Personne, PersonneTable
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.profilage import chronometre, compter
+
+logger = logging.getLogger(__name__)
+
+FORMATS_RAPPORT = {'.txt': 'texte', '.csv': 'csv', '.jsonl': 'jsonl'}
+
+TAILLE_TAMPON = 1 << 20
+
+TAILLE_BLOC_PERSONNES = 10_000
+
+LARGEUR = 120
+
+EN_TETE_TABLEAU = (f"{'Produit':<45} {'Effort mensuel':>15} {'Capital final':>15} {'Intérêts bruts':>15} "
+                   f"{'Intérêts nets':>15} {'Versement total':>15} {'Versement max épargne':>15}")
+
+
+def _format_depuis_chemin(chemin: Path) -> str:
+    suffixes = [s.lower() for s in chemin.suffixes]
+    if suffixes and suffixes[-1] == '.gz':
+        suffixes = suffixes[:-1]
+    if not suffixes or suffixes[-1] not in FORMATS_RAPPORT:
+        raise ValueError(f"Format de rapport non pris en charge: {chemin.name}. "
+                         f"Utilisez l'une des extensions {list(FORMATS_RAPPORT)}, éventuellement suivie de .gz")
+    return FORMATS_RAPPORT[suffixes[-1]]
+
+
+def _ouvrir(chemin: Path, compression: bool, taille_tampon: int) -> TextIO:
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    if compression:
+        brut = gzip.GzipFile(chemin, 'wb')
+        return io.TextIOWrapper(io.BufferedWriter(brut, buffer_size=taille_tampon), encoding='utf-8', newline='')
+    return open(chemin, 'w', encoding='utf-8', buffering=taille_tampon, newline='')
+
+
+def _nom_fichier_personne(indice: int, nom: str) -> str:
+    nom = re.sub(r'[^\w-]+', '_', str(nom)).strip('_') or 'personne'
+    return f"{indice:06d}_{nom}"
+
+
+def _selection_rapport(resultats: ResultatsEpargne) -> ResultatsEpargne:
+    # Objectifs atteints, par personne puis par capital final décroissant (ex aequo dans l'ordre d'origine)
+    retenus = resultats.filtrer_objectif_atteint()
+    ordre = np.lexsort((-retenus["montant_net_final"], retenus["indice_personne"]))
+    return retenus[ordre]
+
+
+class EcrivainRapport:
+    """
+    Écrit le rapport des suggestions d'épargne en masse, à travers un flux fortement tamponné.
+
+    Trois formats sont proposés : 'texte' (la mise en page à largeur fixe du rapport affiché par
+    main.py), 'csv' et 'jsonl' (une ligne JSON par résultat). Seuls les résultats qui atteignent
+    l'objectif sont écrits, par personne puis par capital final décroissant. Les lignes de
+    résultats sont formatées colonne par colonne, pour tout un bloc à la fois.
+
+    ecrire() peut être appelé plusieurs fois, par exemple bloc par bloc avec
+    suggestion_epargne_flux : les personnes sont alors numérotées à la suite, et l'en-tête CSV
+    n'est écrit qu'une fois.
+
+    Attributes:
+        destination (str | TextIO): Fichier, dossier (par_personne) ou flux texte déjà ouvert
+        format (str): 'texte', 'csv' ou 'jsonl'
+        compression (bool): Compression gzip des fichiers écrits
+        par_personne (bool): Un fichier par personne dans le dossier destination
+        nb_personnes (int): Nombre de personnes déjà écrites
+    """
+
+    def __init__(self, destination: Union[str, Path, TextIO] = None, format: Optional[str] = None,
+                 compression: Optional[bool] = None, par_personne: bool = False,
+                 taille_tampon: int = TAILLE_TAMPON):
+        if destination is None:
+            destination = sys.stdout
+        if taille_tampon <= 0:
+            raise ValueError(f"La taille du tampon doit être positive: {taille_tampon}")
+        est_flux = hasattr(destination, 'write')
+        if est_flux and par_personne:
+            raise ValueError("L'écriture par personne nécessite un dossier de destination")
+        if not est_flux and not par_personne:
+            chemin = Path(destination)
+            if format is None:
+                format = _format_depuis_chemin(chemin)
+            if compression is None:
+                compression = chemin.suffix.lower() == '.gz'
+        format = format or 'texte'
+        if format not in FORMATS_RAPPORT.values():
+            raise ValueError(f"Format de rapport inconnu: {format}. Formats possibles: {list(FORMATS_RAPPORT.values())}")
+
+        self.destination = destination
+        self.format = format
+        self.compression = bool(compression)
+        self.par_personne = par_personne
+        self.taille_tampon = taille_tampon
+        self.nb_personnes = 0
+        self._flux: Optional[TextIO] = destination if est_flux else None
+        self._ferme_flux = False
+        self._en_tete_ecrit = False
+
+    def __enter__(self) -> "EcrivainRapport":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    def _flux_principal(self) -> TextIO:
+        if self._flux is None:
+            self._flux = _ouvrir(Path(self.destination), self.compression, self.taille_tampon)
+            self._ferme_flux = True
+        return self._flux
+
+    def fermer(self) -> None:
+        """
+        Vide le tampon et ferme le fichier ouvert par l'écrivain ; un flux fourni est seulement vidé.
+        """
+        if self._flux is None:
+            return
+        if self._ferme_flux:
+            self._flux.close()
+            self._flux = None
+        else:
+            self._flux.flush()
+
+    @chronometre("rapport")
+    def ecrire(self, personnes: Union[Sequence[Personne], PersonneTable], resultats: ResultatsEpargne) -> None:
+        """
+        Écrit le rapport d'un bloc de personnes.
+
+        Le rapport texte signale par « Aucune suggestion d'épargne disponible » les personnes sans
+        aucune ligne dans resultats. Avec des résultats restreints par top_k, qui ne gardent que
+        les lignes atteignant l'objectif, c'est aussi le cas des personnes dont aucun scénario
+        n'atteint l'objectif ; sans top_k, elles ont un tableau vide.
+
+        Args:
+            personnes (Sequence[Personne] | PersonneTable): Personnes évaluées, dans l'ordre de
+                indice_personne
+            resultats (ResultatsEpargne): Leurs résultats, avec la colonne indice_personne
+
+        Raises:
+            ValueError: Si resultats n'a pas de colonne indice_personne
+        """
+        if "indice_personne" not in resultats.colonnes:
+            raise ValueError("La colonne indice_personne est nécessaire pour écrire le rapport")
+        nb = len(personnes)
+        # Une personne sans aucun résultat, même non atteint, est signalée dans le rapport texte
+        nb_resultats = np.bincount(resultats["indice_personne"], minlength=nb)
+        selection = _selection_rapport(resultats)
+        compter("resultats_filtres", len(resultats) - len(selection))
+        compter("resultats_ecrits", len(selection))
+        bornes = np.searchsorted(selection["indice_personne"], np.arange(nb + 1))
+
+        if self.par_personne:
+            dossier = Path(self.destination)
+            extension = {'texte': '.txt', 'csv': '.csv', 'jsonl': '.jsonl'}[self.format]
+            extension += '.gz' if self.compression else ''
+            for i, personne in enumerate(personnes):
+                chemin = dossier / (_nom_fichier_personne(self.nb_personnes + i, personne.nom) + extension)
+                sous_selection = selection[bornes[i]:bornes[i + 1]]
+                sous_selection.colonnes["indice_personne"] = sous_selection["indice_personne"] - i
+                with _ouvrir(chemin, self.compression, self.taille_tampon) as flux:
+                    self._ecrire_bloc(flux, [personne], nb_resultats[i:i + 1], sous_selection,
+                                      [0, len(sous_selection)], decalage=self.nb_personnes + i, en_tete=True)
+        else:
+            # Formatage par sous-blocs de personnes, pour borner la mémoire des lignes formatées
+            flux = self._flux_principal()
+            for debut in range(0, max(nb, 1), TAILLE_BLOC_PERSONNES):
+                fin = min(debut + TAILLE_BLOC_PERSONNES, nb)
+                sous_selection = selection[bornes[debut]:bornes[fin]]
+                sous_selection.colonnes["indice_personne"] = sous_selection["indice_personne"] - debut
+                self._ecrire_bloc(flux, personnes[debut:fin], nb_resultats[debut:fin], sous_selection,
+                                  bornes[debut:fin + 1] - bornes[debut], decalage=self.nb_personnes + debut,
+                                  en_tete=not self._en_tete_ecrit)
+                self._en_tete_ecrit = True
+        self.nb_personnes += nb
+
+    def _ecrire_bloc(self, flux: TextIO, personnes, nb_resultats: np.ndarray, selection: ResultatsEpargne,
+                     bornes, decalage: int, en_tete: bool) -> None:
+        if self.format == 'texte':
+            flux.write(self._formater_texte(personnes, nb_resultats, selection, bornes))
+            return
+
+        df = selection.to_dataframe(personnes)
+        df["indice_personne"] += decalage
+        if self.format == 'csv':
+            df.to_csv(flux, index=False, header=en_tete, lineterminator='\n')
+        elif len(df):
+            flux.write(df.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+
+    @staticmethod
+    def _formater_texte(personnes, nb_resultats: np.ndarray, selection: ResultatsEpargne, bornes) -> str:
+        lignes = selection.lignes_texte()
+        morceaux: List[str] = []
+        for i, personne in enumerate(personnes):
+            morceaux.append(
+                "\n" + "=" * LARGEUR + "\n"
+                f"Suggestions d'épargne pour {personne.nom}:\n"
+                f"Âge: {personne.age} ans\n"
+                f"Revenu annuel: {personne.revenu_annuel:.2f} €\n"
+                f"Capacité d'épargne mensuelle: {personne._calcul_capacite_epargne():.2f} €\n"
+                f"Objectif: {personne.objectif:.2f} €\n"
+                f"Durée d'épargne: {personne.duree_epargne} ans\n"
+                + "-" * LARGEUR + "\n"
+            )
+            if not nb_resultats[i]:
+                morceaux.append("Aucune suggestion d'épargne disponible pour cette personne.\n")
+                continue
+            morceaux.append(EN_TETE_TABLEAU + "\n" + "-" * LARGEUR + "\n")
+            debut, fin = bornes[i], bornes[i + 1]
+            if fin > debut:
+                morceaux.append("\n".join(lignes[debut:fin]) + "\n")
+        return "".join(morceaux)
+
+
+def ecrire_rapport(personnes: Union[Sequence[Personne], PersonneTable], resultats: ResultatsEpargne,
+                   destination: Union[str, Path, TextIO] = None, format: Optional[str] = None,
+                   compression: Optional[bool] = None, par_personne: bool = False,
+                   taille_tampon: int = TAILLE_TAMPON) -> None:
+    """
+    Écrit en une fois le rapport des suggestions d'épargne, voir EcrivainRapport.
+
+    Args:
+        personnes (Sequence[Personne] | PersonneTable): Personnes évaluées
+        resultats (ResultatsEpargne): Leurs résultats, avec la colonne indice_personne
+        destination (str | TextIO, optional): Fichier (.txt, .csv ou .jsonl, éventuellement
+            suivi de .gz), dossier si par_personne, ou flux texte ; la sortie standard par défaut
+        format (str, optional): 'texte', 'csv' ou 'jsonl', déduit de l'extension par défaut
+        compression (bool, optional): Compression gzip, déduite de l'extension .gz par défaut
+        par_personne (bool): Écrire un fichier par personne dans le dossier destination
+        taille_tampon (int): Taille du tampon d'écriture des fichiers, en octets
+
+    Raises:
+        ValueError: Si le format n'est pas pris en charge
+    """
+    with EcrivainRapport(destination, format=format, compression=compression, par_personne=par_personne,
+                         taille_tampon=taille_tampon) as ecrivain:
+        ecrivain.ecrire(personnes, resultats)
+    if not hasattr(ecrivain.destination, 'write'):
+        logger.info(f"Rapport écrit: {len(personnes)} personnes dans {ecrivain.destination}")
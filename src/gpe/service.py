@@ -0,0 +1,400 @@
+"""
+Service HTTP asyncio des suggestions d'épargne.
+
+Usage: python -m src.gpe.service [--hote 127.0.0.1] [--port 8080] [--epargnes epargnes.csv]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.gpe.core import import_epargnes, suggestion_epargne_batch
+from src.gpe.models.epargne import Epargne
+from src.gpe.models.personne import Personne
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.utils import TableFacteursCroissance
+
+logger = logging.getLogger(__name__)
+
+CHAMPS_NUMERIQUES = ('age', 'revenu_annuel', 'loyer', 'depenses_mensuelles', 'objectif', 'duree_epargne')
+
+# Durées, en années, dont les facteurs de croissance sont calculés dès le démarrage
+DUREES_PRECHAUFFEES = 60
+
+# Durée d'épargne maximale acceptée, en années
+DUREE_MAX = 100
+
+TAILLE_MAX_CORPS = 1 << 20
+
+RAISONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequeteInvalide(ValueError):
+    pass
+
+
+def _refuser_constante(nom: str):
+    raise RequeteInvalide(f"Valeur non finie refusée: {nom}")
+
+
+def _lire_json(corps: bytes):
+    """
+    Décode le corps JSON d'une requête, en refusant NaN, Infinity et -Infinity.
+
+    Raises:
+        RequeteInvalide: Si le corps contient une valeur non finie
+    """
+    return json.loads(corps or b"null", parse_constant=_refuser_constante)
+
+
+def personne_depuis_json(donnees: dict) -> Personne:
+    """
+    Construit une Personne à partir du JSON d'une requête. La durée peut s'appeler duree_epargne,
+    duree ou durée, comme dans les fichiers importés.
+
+    Raises:
+        RequeteInvalide: Si un champ manque, n'est pas un nombre fini, ou si la durée n'est pas un
+            nombre entier d'années entre 1 et DUREE_MAX
+    """
+    if not isinstance(donnees, dict):
+        raise RequeteInvalide("Le corps de la requête doit être un objet JSON")
+    donnees = dict(donnees)
+    for alias in ('duree', 'durée'):
+        if alias in donnees and 'duree_epargne' not in donnees:
+            donnees['duree_epargne'] = donnees.pop(alias)
+
+    manquants = [champ for champ in ('nom',) + CHAMPS_NUMERIQUES if donnees.get(champ) is None]
+    if manquants:
+        raise RequeteInvalide(f"Champs manquants: {manquants}")
+    valeurs = {}
+    for champ in CHAMPS_NUMERIQUES + ('versement_mensuel_utilisateur',):
+        valeur = donnees.get(champ, 0) if champ == 'versement_mensuel_utilisateur' else donnees[champ]
+        if valeur is None:
+            valeur = 0
+        if isinstance(valeur, bool) or not isinstance(valeur, (int, float)):
+            raise RequeteInvalide(f"Le champ '{champ}' doit être un nombre: {valeur!r}")
+        try:
+            fini = math.isfinite(float(valeur))
+        except OverflowError:
+            fini = False
+        if not fini:
+            raise RequeteInvalide(f"Le champ '{champ}' doit être un nombre fini")
+        valeurs[champ] = valeur
+    duree = valeurs['duree_epargne']
+    if duree != int(duree) or not 1 <= duree <= DUREE_MAX:
+        raise RequeteInvalide(f"La durée d'épargne doit être un nombre entier d'années entre 1 et {DUREE_MAX}: {duree!r}")
+    return Personne(nom=str(donnees['nom']), **valeurs)
+
+
+def resultats_en_json(resultats: ResultatsEpargne) -> List[dict]:
+    """
+    Convertit les résultats d'une personne en dictionnaires, colonne par colonne ; un plafond
+    absent, ou toute autre valeur non finie, devient null.
+    """
+    colonnes = {}
+    for col in ResultatsEpargne.COLONNES:
+        valeurs = resultats[col]
+        if valeurs.dtype.kind == 'f' and not np.isfinite(valeurs).all():
+            colonnes[col] = [v if math.isfinite(v) else None for v in valeurs.tolist()]
+        else:
+            colonnes[col] = valeurs.tolist()
+    return [dict(zip(colonnes, valeurs)) for valeurs in zip(*colonnes.values())]
+
+
+class MetriquesLatence:
+    """
+    Latences des dernières requêtes et tailles des lots évalués.
+
+    Attributes:
+        requetes (int): Nombre de requêtes de suggestion traitées
+        lots (int): Nombre d'évaluations vectorisées
+        erreurs (int): Nombre de requêtes en erreur
+    """
+
+    def __init__(self, taille_fenetre: int = 10_000):
+        self.latences: Deque[float] = deque(maxlen=taille_fenetre)
+        self.requetes = 0
+        self.lots = 0
+        self.erreurs = 0
+        self.taille_lot_max = 0
+
+    def enregistrer_requete(self, latence: float) -> None:
+        self.requetes += 1
+        self.latences.append(latence)
+
+    def enregistrer_lot(self, taille: int) -> None:
+        self.lots += 1
+        self.taille_lot_max = max(self.taille_lot_max, taille)
+
+    def resume(self) -> dict:
+        """
+        Returns:
+            dict: Compteurs, taille moyenne des lots et percentiles de latence en millisecondes
+        """
+        resume = {
+            "requetes": self.requetes,
+            "erreurs": self.erreurs,
+            "lots": self.lots,
+            "taille_lot_moyenne": self.requetes / self.lots if self.lots else 0.0,
+            "taille_lot_max": self.taille_lot_max,
+        }
+        if self.latences:
+            p50, p95, p99 = np.percentile(np.fromiter(self.latences, dtype=float), [50, 95, 99]) * 1000
+            resume.update(latence_p50_ms=p50, latence_p95_ms=p95, latence_p99_ms=p99,
+                          latence_max_ms=max(self.latences) * 1000)
+        return resume
+
+
+class ServiceSuggestions:
+    """
+    Service longue durée des suggestions d'épargne.
+
+    Le catalogue est chargé une fois et les facteurs de croissance sont calculés au démarrage
+    pour toutes les durées courantes. Les requêtes concurrentes sont regroupées en micro-lots :
+    le premier arrivé attend au plus delai_lot secondes que d'autres le rejoignent, puis tout le
+    lot est évalué par un seul appel à suggestion_epargne_batch. Les résultats de chaque personne
+    sont ceux de suggestion_epargne(personne, epargnes, personne.objectif, personne.duree_epargne).
+
+    Routes : POST /suggestions (une Personne en JSON), GET /metriques, GET /sante.
+
+    Attributes:
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        facteurs (TableFacteursCroissance): Facteurs de croissance propres au service
+        metriques (MetriquesLatence): Latences et tailles de lots
+    """
+
+    def __init__(self, epargnes: List[Epargne], delai_lot: float = 0.002, taille_lot_max: int = 1024):
+        if delai_lot < 0:
+            raise ValueError(f"Le délai de regroupement doit être positif: {delai_lot}")
+        if taille_lot_max <= 0:
+            raise ValueError(f"La taille maximale de lot doit être positive: {taille_lot_max}")
+        self.epargnes = list(epargnes)
+        self.delai_lot = delai_lot
+        self.taille_lot_max = taille_lot_max
+        self.facteurs = TableFacteursCroissance()
+        self.facteurs.facteurs(np.array([e.taux_interet for e in self.epargnes], dtype=float),
+                               np.arange(DUREES_PRECHAUFFEES + 1, dtype=float))
+        self.metriques = MetriquesLatence()
+        self._file: Optional[asyncio.Queue] = None
+        self._regroupeur: Optional[asyncio.Task] = None
+        self._serveur: Optional[asyncio.AbstractServer] = None
+
+    # Micro-lots
+
+    def _demarrer_regroupeur(self) -> None:
+        if self._regroupeur is None or self._regroupeur.done():
+            self._file = asyncio.Queue()
+            self._regroupeur = asyncio.get_running_loop().create_task(self._regrouper())
+
+    async def _regrouper(self) -> None:
+        boucle = asyncio.get_running_loop()
+        while True:
+            lot = [await self._file.get()]
+            echeance = boucle.time() + self.delai_lot
+            while len(lot) < self.taille_lot_max:
+                attente = echeance - boucle.time()
+                if attente <= 0:
+                    # Prendre ce qui est déjà en file sans attendre davantage
+                    while len(lot) < self.taille_lot_max and not self._file.empty():
+                        lot.append(self._file.get_nowait())
+                    break
+                try:
+                    lot.append(await asyncio.wait_for(self._file.get(), attente))
+                except asyncio.TimeoutError:
+                    break
+            self._evaluer_lot(lot)
+
+    def _evaluer_lot(self, lot: List[Tuple[Personne, asyncio.Future]]) -> None:
+        personnes = [personne for personne, _ in lot]
+        try:
+            resultats = suggestion_epargne_batch(personnes, self.epargnes, facteurs=self.facteurs)
+            par_personne = resultats.grouper_par_personne(len(personnes))
+        except Exception as e:
+            if len(lot) > 1:
+                # Réévaluer personne par personne, pour que seule la requête fautive échoue
+                logger.warning(f"Échec de l'évaluation d'un lot de {len(lot)} requêtes, réévaluation une à une")
+                for element in lot:
+                    self._evaluer_lot([element])
+                return
+            futur = lot[0][1]
+            if not futur.done():
+                futur.set_exception(e)
+            return
+        self.metriques.enregistrer_lot(len(lot))
+        for (_, futur), resultats_personne in zip(lot, par_personne):
+            if not futur.done():
+                futur.set_result(resultats_personne)
+
+    async def suggerer(self, personne: Personne) -> ResultatsEpargne:
+        """
+        Évalue une personne, regroupée avec les requêtes concurrentes.
+
+        Returns:
+            ResultatsEpargne: Les résultats de la personne, dans l'ordre de suggestion_epargne
+        """
+        self._demarrer_regroupeur()
+        futur = asyncio.get_running_loop().create_future()
+        await self._file.put((personne, futur))
+        return await futur
+
+    # Routes
+
+    async def traiter(self, methode: str, chemin: str, corps: bytes = b"") -> Tuple[int, dict]:
+        """
+        Traite une requête sans passer par le réseau, comme le ferait le serveur HTTP.
+
+        Returns:
+            Tuple[int, dict]: Le statut HTTP et le corps JSON de la réponse
+        """
+        chemin = chemin.split('?', 1)[0]
+        if chemin == '/suggestions':
+            if methode != 'POST':
+                return 405, {"erreur": "Utilisez POST"}
+            return await self._suggestions(corps)
+        if chemin in ('/metriques', '/sante'):
+            if methode != 'GET':
+                return 405, {"erreur": "Utilisez GET"}
+            if chemin == '/metriques':
+                return 200, self.metriques.resume()
+            return 200, {"statut": "ok", "produits": len(self.epargnes)}
+        return 404, {"erreur": f"Route inconnue: {chemin}"}
+
+    async def _suggestions(self, corps: bytes) -> Tuple[int, dict]:
+        debut = time.perf_counter()
+        try:
+            personne = personne_depuis_json(_lire_json(corps))
+        except (json.JSONDecodeError, UnicodeDecodeError, RequeteInvalide) as e:
+            self.metriques.erreurs += 1
+            return 400, {"erreur": str(e)}
+        try:
+            resultats = await self.suggerer(personne)
+        except Exception as e:
+            self.metriques.erreurs += 1
+            logger.exception("Erreur lors du calcul des suggestions")
+            return 500, {"erreur": str(e)}
+        reponse = {"personne": personne.nom, "suggestions": resultats_en_json(resultats)}
+        self.metriques.enregistrer_requete(time.perf_counter() - debut)
+        return 200, reponse
+
+    # Transport HTTP/1.1
+
+    async def _connexion(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne.strip():
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    await self._repondre(ecrivain, 400, {"erreur": "Ligne de requête invalide"}, garder=False)
+                    break
+                entetes: Dict[str, str] = {}
+                while True:
+                    ligne = await lecteur.readline()
+                    if ligne in (b'\r\n', b'\n', b''):
+                        break
+                    nom, _, valeur = ligne.decode('latin-1').partition(':')
+                    entetes[nom.strip().lower()] = valeur.strip()
+                try:
+                    longueur = int(entetes.get('content-length', 0) or 0)
+                except ValueError:
+                    longueur = -1
+                if longueur < 0:
+                    await self._repondre(ecrivain, 400, {"erreur": "En-tête Content-Length invalide"}, garder=False)
+                    break
+                if longueur > TAILLE_MAX_CORPS:
+                    await self._repondre(ecrivain, 413, {"erreur": "Corps de requête trop volumineux"}, garder=False)
+                    break
+                corps = await lecteur.readexactly(longueur) if longueur else b""
+                garder = (entetes.get('connection', '').lower() != 'close') and version == 'HTTP/1.1'
+                statut, reponse = await self.traiter(methode, cible, corps)
+                await self._repondre(ecrivain, statut, reponse, garder)
+                if not garder:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            ecrivain.close()
+
+    @staticmethod
+    async def _repondre(ecrivain: asyncio.StreamWriter, statut: int, reponse: dict, garder: bool) -> None:
+        corps = json.dumps(reponse, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        entete = (f"HTTP/1.1 {statut} {RAISONS.get(statut, '')}\r\n"
+                  f"Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(corps)}\r\n"
+                  f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n")
+        ecrivain.write(entete.encode('latin-1') + corps)
+        await ecrivain.drain()
+
+    async def demarrer(self, hote: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        """
+        Démarre le serveur HTTP ; port 0 choisit un port libre.
+
+        Returns:
+            asyncio.AbstractServer: Le serveur, dont sockets[0].getsockname() donne l'adresse
+        """
+        self._demarrer_regroupeur()
+        self._serveur = await asyncio.start_server(self._connexion, hote, port)
+        logger.info(f"Service de suggestions à l'écoute sur {self._serveur.sockets[0].getsockname()}")
+        return self._serveur
+
+    async def arreter(self) -> None:
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+            self._serveur = None
+        if self._regroupeur is not None:
+            self._regroupeur.cancel()
+            try:
+                await self._regroupeur
+            except asyncio.CancelledError:
+                pass
+            self._regroupeur = None
+
+
+class ClientTest:
+    """
+    Client en processus pour tester le service sans ouvrir de port.
+    """
+
+    def __init__(self, service: ServiceSuggestions):
+        self.service = service
+
+    async def get(self, chemin: str) -> Tuple[int, dict]:
+        return await self.service.traiter('GET', chemin)
+
+    async def post(self, chemin: str, donnees) -> Tuple[int, dict]:
+        return await self.service.traiter('POST', chemin, json.dumps(donnees).encode('utf-8'))
+
+
+async def servir(epargnes_fichier: str, hote: str, port: int) -> None:
+    service = ServiceSuggestions(import_epargnes(epargnes_fichier))
+    serveur = await service.demarrer(hote, port)
+    try:
+        async with serveur:
+            await serveur.serve_forever()
+    finally:
+        await service.arreter()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP des suggestions d'épargne.")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--epargnes", default=str(Path(__file__).parent / "data" / "epargnes.csv"),
+                        help="Fichier du catalogue des produits d'épargne")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(servir(args.epargnes, args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
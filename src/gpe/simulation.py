@@ -0,0 +1,353 @@
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.gpe.core import suggestion_epargne_batch
+from src.gpe.models.epargne import Epargne
+from src.gpe.models.personne import Personne, PersonneTable
+from src.gpe.models.resultat import ResultatsEpargne
+from src.gpe.profilage import chronometre, etape
+from src.gpe.utils import TableFacteursCroissance, calcul_interets_composes
+
+CAPITALISATIONS = ("mensuelle", "annuelle")
+
+# Intérêts d'une année de versements mensuels en début de mois, au prorata du temps restant :
+# somme des (12 - k) / 12 pour k = 0..11, en nombre de versements mensuels
+PRORATA_ANNEE = 6.5
+
+# Trajectoires de taux tirées à la fois pour un produit : borne la mémoire des taux tirés
+TAILLE_BLOC_TRAJECTOIRES = 1000
+
+# Personnes évaluées à la fois par ProjectionMonteCarlo.evaluer
+TAILLE_BLOC_PERSONNES = 100_000
+
+
+def _croissance(taux: np.ndarray, periodes: np.ndarray) -> np.ndarray:
+    # ((1 + taux)^periodes - 1) / taux, ou periodes pour un taux nul ; expm1/log1p gardent la
+    # précision pour les petits taux
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(taux == 0, periodes, np.expm1(periodes * np.log1p(taux)) / taux)
+
+
+def _solde_mensuel(versement: np.ndarray, taux_annuel: np.ndarray, mois: np.ndarray) -> np.ndarray:
+    # Versement en début de mois, intérêts composés chaque mois au taux proportionnel
+    taux = taux_annuel / 12
+    return versement * (1 + taux) * _croissance(taux, mois)
+
+
+def _solde_annuel(versement: np.ndarray, taux_annuel: np.ndarray, mois: np.ndarray) -> np.ndarray:
+    # Intérêts simples au prorata dans l'année, capitalisés au 31 décembre (comme un livret) :
+    # le capital de fin d'année n est une rente de versement_annuel = versement * (12 + 6.5 * taux),
+    # puis, k mois après, les intérêts courus sont ajoutés comme si le placement était clos
+    annees, reste = np.divmod(mois, 12)
+    capital = versement * (12 + PRORATA_ANNEE * taux_annuel) * _croissance(taux_annuel, annees)
+    return capital * (1 + taux_annuel * reste / 12) + versement * (reste + taux_annuel * reste * (reste + 1) / 24)
+
+
+def simuler_trajectoires(versement_mensuel: Union[float, np.ndarray], taux_annuel: Union[float, np.ndarray],
+                         duree_mois: Union[int, np.ndarray], capitalisation: str = "mensuelle",
+                         fiscalite: Union[float, np.ndarray] = 0.0, valeurs_finales: bool = False,
+                         horizon: Union[int, None] = None) -> np.ndarray:
+    """
+    Simule mois par mois la valeur d'un plan d'épargne à versements mensuels, pour de nombreux
+    couples personne × produit à la fois.
+
+    Chaque versement est fait en début de mois. La valeur au mois m est celle obtenue en clôturant
+    le plan à la fin du mois m : versements effectués plus intérêts acquis, nets de la fiscalité
+    appliquée aux intérêts. Les soldes sont calculés par formule fermée, sans boucle sur les mois.
+
+    Args:
+        versement_mensuel (float | np.ndarray): Versement de chaque mois, par couple
+        taux_annuel (float | np.ndarray): Taux d'intérêt annuel (ex: 0.03 pour 3%)
+        duree_mois (int | np.ndarray): Durée du plan en mois (une durée négative compte pour 0)
+        capitalisation (str): 'mensuelle' (intérêts composés chaque mois au taux annuel / 12) ou
+            'annuelle' (intérêts au prorata capitalisés en fin d'année, comme un livret)
+        fiscalite (float | np.ndarray): Taux d'imposition des intérêts
+        valeurs_finales (bool): Ne calculer que la valeur en fin de plan, sans tableau par mois
+        horizon (int, optional): Nombre de mois simulés, par défaut la plus longue durée ;
+            après la fin de son plan, la valeur d'un couple reste celle de fin de plan
+
+    Returns:
+        np.ndarray: De forme (couples,) si valeurs_finales, sinon (couples, horizon + 1), la
+        colonne m donnant la valeur à la fin du mois m (la colonne 0 vaut 0)
+
+    Raises:
+        ValueError: Si la capitalisation est inconnue ou si horizon est négatif
+    """
+    if capitalisation not in CAPITALISATIONS:
+        raise ValueError(f"Capitalisation inconnue: {capitalisation}. Valeurs possibles: {list(CAPITALISATIONS)}")
+    versement, taux, duree, impot = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(versement_mensuel, dtype=float)),
+        np.atleast_1d(np.asarray(taux_annuel, dtype=float)),
+        np.maximum(np.atleast_1d(np.asarray(duree_mois)), 0).astype(np.int64),
+        np.atleast_1d(np.asarray(fiscalite, dtype=float)),
+    )
+    solde = _solde_mensuel if capitalisation == "mensuelle" else _solde_annuel
+
+    if valeurs_finales:
+        mois = duree
+    else:
+        if horizon is None:
+            horizon = int(duree.max()) if duree.size else 0
+        if horizon < 0:
+            raise ValueError(f"L'horizon doit être positif: {horizon}")
+        # Mois écoulés dans le plan : la valeur est figée une fois le plan terminé
+        mois = np.minimum(np.arange(horizon + 1), duree[:, None])
+        versement, taux, impot = versement[:, None], taux[:, None], impot[:, None]
+
+    valeur = solde(versement, taux, mois)
+    if np.any(impot):
+        valeur -= impot * (valeur - versement * mois)
+    return valeur
+
+
+def simuler_resultats(resultats: ResultatsEpargne, personnes: Union[Sequence[Personne], PersonneTable],
+                      epargnes: List[Epargne], capitalisation: str = "mensuelle", nettes: bool = True,
+                      valeurs_finales: bool = False) -> np.ndarray:
+    """
+    Simule mois par mois chaque ligne d'un ResultatsEpargne, par exemple celui de
+    suggestion_epargne_batch, en étalant son total_versement en versements mensuels sur la durée
+    d'épargne de la personne.
+
+    Args:
+        resultats (ResultatsEpargne): Résultats avec les colonnes indice_personne et indice_epargne
+        personnes (Sequence[Personne] | PersonneTable): Personnes évaluées
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        capitalisation (str): 'mensuelle' ou 'annuelle', voir simuler_trajectoires
+        nettes (bool): Appliquer la fiscalité du produit aux intérêts
+        valeurs_finales (bool): Ne calculer que la valeur en fin de plan
+
+    Returns:
+        np.ndarray: Une ligne par résultat, voir simuler_trajectoires
+
+    Raises:
+        ValueError: Si les colonnes indice_personne ou indice_epargne manquent
+    """
+    if "indice_personne" not in resultats.colonnes or "indice_epargne" not in resultats.colonnes:
+        raise ValueError("Les colonnes indice_personne et indice_epargne sont nécessaires pour simuler les résultats")
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+
+    duree_mois = np.maximum(personnes["duree_epargne"][resultats["indice_personne"]], 0) * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        versement = np.where(duree_mois > 0, resultats["total_versement"] / duree_mois, 0.0)
+    taux = np.array([e.taux_interet for e in epargnes], dtype=float)
+    fiscalite = np.array([e.fiscalite for e in epargnes], dtype=float) if nettes else np.zeros(len(epargnes))
+
+    return simuler_trajectoires(versement, taux[resultats["indice_epargne"]], duree_mois.astype(np.int64),
+                                capitalisation=capitalisation, fiscalite=fiscalite[resultats["indice_epargne"]],
+                                valeurs_finales=valeurs_finales)
+
+
+class ProjectionMonteCarlo:
+    """
+    Projections Monte-Carlo des plans de suggestion_epargne avec des taux incertains.
+
+    Chaque année, le taux d'un produit est tiré selon une loi normale de moyenne taux_interet et
+    d'écart type volatilite, indépendamment des autres années, et borné à -100 %. Sur une
+    trajectoire de taux r_1..r_n, les versements annuels suivent la récurrence de
+    calcul_interets_composes, montant(k) = (montant(k - 1) + v) * (1 + r_k) : le capital brut vaut
+    v * F_n, où le facteur F_n ne dépend que de la trajectoire.
+
+    Les facteurs sont tirés une seule fois par produit et par durée, puis triés. Le capital net
+    d'une personne et d'un scénario étant affine en F_n, ses percentiles et la probabilité
+    d'atteindre l'objectif se lisent dans les facteurs triés, sans jamais former de tableau
+    personnes × trajectoires : la mémoire ne dépend que de produits × durées × trajectoires.
+
+    Attributes:
+        epargnes (List[Epargne]): Catalogue des produits d'épargne
+        duree_max (int): Durée la plus longue simulée, en années
+        nb_trajectoires (int): Nombre de trajectoires de taux par produit
+        facteurs (np.ndarray): Facteurs de croissance triés, de forme
+            (produits, duree_max + 1, nb_trajectoires)
+    """
+
+    def __init__(self, epargnes: List[Epargne], duree_max: int, nb_trajectoires: int = 10_000,
+                 graine: Optional[int] = None, taille_bloc: int = TAILLE_BLOC_TRAJECTOIRES):
+        """
+        Tire les trajectoires de taux de chaque produit.
+
+        Args:
+            epargnes (List[Epargne]): Catalogue des produits d'épargne
+            duree_max (int): Durée la plus longue à simuler, en années
+            nb_trajectoires (int): Nombre de trajectoires de taux par produit
+            graine (int, optional): Graine du générateur, pour des tirages reproductibles ; les
+                tirages ne dépendent pas de taille_bloc
+            taille_bloc (int): Nombre de trajectoires tirées à la fois
+
+        Raises:
+            ValueError: Si duree_max est négative, ou si nb_trajectoires ou taille_bloc n'est pas positif
+        """
+        if duree_max < 0:
+            raise ValueError(f"La durée maximale doit être positive: {duree_max}")
+        if nb_trajectoires <= 0:
+            raise ValueError(f"Le nombre de trajectoires doit être positif: {nb_trajectoires}")
+        if taille_bloc <= 0:
+            raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+        self.epargnes = list(epargnes)
+        self.duree_max = int(duree_max)
+        self.nb_trajectoires = nb_trajectoires
+        self.facteurs = np.empty((len(self.epargnes), self.duree_max + 1, nb_trajectoires))
+
+        # Un générateur indépendant par produit
+        sequences = np.random.SeedSequence(graine).spawn(len(self.epargnes))
+        with etape("tirage_trajectoires"):
+            for facteurs, epargne, sequence in zip(self.facteurs, self.epargnes, sequences):
+                if not epargne.volatilite:
+                    # Taux fixe : les facteurs déterministes, identiques à ceux de suggestion_epargne_batch
+                    facteurs[:] = calcul_interets_composes(1.0, epargne.taux_interet,
+                                                           np.arange(self.duree_max + 1))[:, None]
+                    continue
+                generateur = np.random.default_rng(sequence)
+                for debut in range(0, nb_trajectoires, taille_bloc):
+                    fin = min(debut + taille_bloc, nb_trajectoires)
+                    taux = epargne.taux_interet + epargne.volatilite * generateur.standard_normal((fin - debut, self.duree_max))
+                    croissance = 1 + np.maximum(taux, -1.0)
+                    montant = np.zeros(fin - debut)
+                    facteurs[0, debut:fin] = 0.0
+                    for annee in range(self.duree_max):
+                        montant = (montant + 1) * croissance[:, annee]
+                        facteurs[annee + 1, debut:fin] = montant
+                facteurs.sort(axis=1)
+
+    def evaluer(self, personnes: Union[Sequence[Personne], PersonneTable], percentiles: Sequence[float] = (5, 50, 95),
+                top_k: Optional[int] = None, facteurs: Optional[TableFacteursCroissance] = None,
+                taille_bloc: int = TAILLE_BLOC_PERSONNES) -> ResultatsEpargne:
+        """
+        Projette les résultats de suggestion_epargne_batch sur les trajectoires de taux tirées.
+
+        Args:
+            personnes (Sequence[Personne] | PersonneTable): Personnes à évaluer, de durées
+                d'épargne entières et au plus duree_max
+            percentiles (Sequence[float]): Percentiles du capital net final à calculer, entre 0 et 100
+            top_k (int, optional): Ne projeter que les top_k meilleurs résultats déterministes de
+                chaque personne, voir suggestion_epargne_batch
+            facteurs (TableFacteursCroissance, optional): Cache des facteurs de croissance des
+                résultats déterministes
+            taille_bloc (int): Nombre de personnes évaluées à la fois
+
+        Returns:
+            ResultatsEpargne: Les lignes de suggestion_epargne_batch, avec en plus une colonne
+            montant_net_p<q> par percentile q et probabilite_objectif, la part des trajectoires
+            dont le capital net atteint l'objectif
+
+        Raises:
+            ValueError: Si une durée d'épargne n'est pas un entier au plus duree_max, ou si un
+                percentile sort de [0, 100]
+        """
+        if not isinstance(personnes, PersonneTable):
+            personnes = PersonneTable.depuis_personnes(personnes)
+        blocs = list(self.evaluer_par_blocs(personnes, percentiles, top_k, facteurs, taille_bloc))
+        if len(blocs) == 1:
+            return blocs[0]
+        return ResultatsEpargne.concatener(blocs)
+
+    def evaluer_par_blocs(self, personnes: Union[Sequence[Personne], PersonneTable],
+                          percentiles: Sequence[float] = (5, 50, 95), top_k: Optional[int] = None,
+                          facteurs: Optional[TableFacteursCroissance] = None,
+                          taille_bloc: int = TAILLE_BLOC_PERSONNES) -> Iterator[ResultatsEpargne]:
+        """
+        Comme evaluer, mais rend les résultats bloc de personnes par bloc, pour ne jamais garder
+        en mémoire ceux de toutes les personnes.
+
+        Yields:
+            ResultatsEpargne: Les résultats de chaque bloc, dont indice_personne renvoie à la
+            position dans personnes
+        """
+        if not isinstance(personnes, PersonneTable):
+            personnes = PersonneTable.depuis_personnes(personnes)
+        durees = np.maximum(personnes["duree_epargne"], 0)
+        if not np.all((durees <= self.duree_max) & (durees == np.floor(durees))):
+            raise ValueError(f"Les durées d'épargne doivent être des nombres entiers d'années au plus {self.duree_max}")
+        percentiles = np.asarray(percentiles, dtype=float)
+        if np.any((percentiles < 0) | (percentiles > 100)):
+            raise ValueError(f"Les percentiles doivent être entre 0 et 100: {percentiles.tolist()}")
+        if taille_bloc <= 0:
+            raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+
+        # Percentiles des facteurs, et percentiles symétriques pour les capitaux décroissants en
+        # le facteur (versement négatif)
+        hauts = np.percentile(self.facteurs, percentiles, axis=2)
+        bas = np.percentile(self.facteurs, 100 - percentiles, axis=2)
+
+        for debut in range(0, max(len(personnes), 1), taille_bloc):
+            resultats = self._evaluer_bloc(personnes[debut:debut + taille_bloc], percentiles, hauts, bas,
+                                           top_k, facteurs)
+            resultats.colonnes["indice_personne"] += debut
+            yield resultats
+
+    @chronometre("monte_carlo")
+    def _evaluer_bloc(self, personnes: PersonneTable, percentiles: np.ndarray, hauts: np.ndarray, bas: np.ndarray,
+                      top_k: Optional[int], facteurs: Optional[TableFacteursCroissance]) -> ResultatsEpargne:
+        resultats = suggestion_epargne_batch(personnes, self.epargnes, facteurs=facteurs, top_k=top_k)
+        indice_personne, indice_epargne = resultats["indice_personne"], resultats["indice_epargne"]
+
+        # Versement annuel de chaque ligne, calculé comme dans suggestion_epargne_batch
+        effort = resultats["effort_mensuel"]
+        capacite = personnes._calcul_capacite_epargne()[indice_personne]
+        versement_mensuel = np.where(effort == 0, personnes["versement_mensuel_utilisateur"][indice_personne],
+                                     effort / 100 * capacite)
+        versement_annuel = versement_mensuel * 12
+        versement_total = resultats["total_versement"]
+        fiscalite = np.array([e.fiscalite for e in self.epargnes], dtype=float)[indice_epargne]
+        duree = np.maximum(personnes["duree_epargne"][indice_personne], 0).astype(np.intp)
+        objectif = personnes["objectif"][indice_personne]
+
+        # Capital net = pente * facteur + versement_total * fiscalite
+        pente = versement_annuel * (1 - fiscalite)
+        colonnes = dict(resultats.colonnes)
+        for q, haut, bas_q in zip(percentiles.tolist(), hauts, bas):
+            facteur = np.where(pente >= 0, haut[indice_epargne, duree], bas_q[indice_epargne, duree])
+            interet_brut = versement_annuel * facteur - versement_total
+            colonnes[f"montant_net_p{q:g}"] = interet_brut * (1 - fiscalite) + versement_total
+
+        colonnes["probabilite_objectif"] = self._probabilite_objectif(
+            indice_epargne, duree, pente, objectif - versement_total * fiscalite)
+        return ResultatsEpargne(colonnes)
+
+    def _probabilite_objectif(self, indice_epargne: np.ndarray, duree: np.ndarray, pente: np.ndarray,
+                              reste: np.ndarray) -> np.ndarray:
+        # Part des facteurs F tels que pente * F >= reste, lue par bissection dans les facteurs
+        # triés de chaque couple (produit, durée)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seuil = reste / pente
+        nb_atteints = np.where(reste <= 0, self.nb_trajectoires, 0)
+
+        cle = indice_epargne * (self.duree_max + 1) + duree
+        ordre = np.argsort(cle, kind='stable')
+        cles, debuts = np.unique(cle[ordre], return_index=True)
+        fins = np.append(debuts[1:], len(ordre))
+        for c, debut, fin in zip(cles.tolist(), debuts.tolist(), fins.tolist()):
+            lignes = ordre[debut:fin]
+            facteurs = self.facteurs[c // (self.duree_max + 1), c % (self.duree_max + 1)]
+            croissant = pente[lignes] > 0
+            decroissant = pente[lignes] < 0
+            nb_atteints[lignes[croissant]] = self.nb_trajectoires - np.searchsorted(facteurs, seuil[lignes[croissant]], 'left')
+            nb_atteints[lignes[decroissant]] = np.searchsorted(facteurs, seuil[lignes[decroissant]], 'right')
+        return nb_atteints / self.nb_trajectoires
+
+
+def projection_monte_carlo(personnes: Union[Sequence[Personne], PersonneTable], epargnes: List[Epargne],
+                           nb_trajectoires: int = 10_000, graine: Optional[int] = None,
+                           percentiles: Sequence[float] = (5, 50, 95), top_k: Optional[int] = None) -> ResultatsEpargne:
+    """
+    Tire les trajectoires de taux jusqu'à la plus longue durée d'épargne des personnes et projette
+    leurs résultats, voir ProjectionMonteCarlo.
+
+    Args:
+        personnes (Sequence[Personne] | PersonneTable): Personnes à évaluer
+        epargnes (List[Epargne]): Catalogue des produits d'épargne, avec leur volatilité
+        nb_trajectoires (int): Nombre de trajectoires de taux par produit
+        graine (int, optional): Graine du générateur, pour des tirages reproductibles
+        percentiles (Sequence[float]): Percentiles du capital net final à calculer
+        top_k (int, optional): Ne projeter que les top_k meilleurs résultats déterministes de
+            chaque personne
+
+    Returns:
+        ResultatsEpargne: Voir ProjectionMonteCarlo.evaluer
+    """
+    if not isinstance(personnes, PersonneTable):
+        personnes = PersonneTable.depuis_personnes(personnes)
+    duree_max = int(np.nanmax(personnes["duree_epargne"], initial=0))
+    projection = ProjectionMonteCarlo(epargnes, max(duree_max, 0), nb_trajectoires=nb_trajectoires, graine=graine)
+    return projection.evaluer(personnes, percentiles=percentiles, top_k=top_k)
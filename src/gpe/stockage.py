@@ -0,0 +1,251 @@
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Extensions des formats binaires : les données y sont enregistrées déjà nettoyées et typées
+EXTENSION_PARQUET = '.parquet'
+EXTENSION_COLONNES = '.colonnes'
+EXTENSIONS_BINAIRES = (EXTENSION_PARQUET, EXTENSION_COLONNES)
+
+FICHIER_SCHEMA = 'schema.json'
+
+
+def est_format_binaire(fichier: str) -> bool:
+    return Path(fichier).suffix.lower() in EXTENSIONS_BINAIRES
+
+
+def ecrire_colonnes(df: "pd.DataFrame", dossier: str) -> None:
+    """
+    Écrit un DataFrame dans un dossier de colonnes .npy, sans dépendance autre que NumPy.
+
+    Chaque colonne est un fichier <colonne>.npy lisible en mémoire partagée (mmap) ; les colonnes
+    avec valeurs manquantes ont en plus un masque <colonne>.na.npy. Le fichier schema.json
+    conserve l'ordre et le type pandas de chaque colonne.
+
+    Args:
+        df: Le DataFrame à écrire
+        dossier: Chemin du dossier de destination, créé si besoin
+    """
+    import pandas as pd
+    chemin = Path(dossier)
+    chemin.mkdir(parents=True, exist_ok=True)
+    schema = {"lignes": len(df), "colonnes": []}
+
+    for position, col in enumerate(df.columns):
+        serie = df[col]
+        manquantes = serie.isna().to_numpy()
+        if isinstance(serie.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(serie.dtype):
+            # Texte en chaînes de largeur fixe, lisibles sans pickle
+            valeurs = np.array(serie.astype(object).where(~manquantes, "").tolist(), dtype=str)
+        elif pd.api.types.is_extension_array_dtype(serie.dtype):
+            # Entiers nullables (Int64) : valeurs brutes + masque
+            valeurs = serie.to_numpy(dtype=serie.dtype.numpy_dtype, na_value=0)
+        else:
+            valeurs = serie.to_numpy()
+
+        fichier = f"{position}.npy"
+        np.save(chemin / fichier, valeurs, allow_pickle=False)
+        description = {"nom": str(col), "fichier": fichier, "type": str(serie.dtype)}
+        if manquantes.any() and valeurs.dtype.kind in "iuU":
+            np.save(chemin / f"{position}.na.npy", manquantes, allow_pickle=False)
+            description["masque"] = f"{position}.na.npy"
+        schema["colonnes"].append(description)
+
+    with open(chemin / FICHIER_SCHEMA, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+class EcrivainColonnes:
+    """
+    Écrit un dossier de colonnes bloc par bloc, sans garder les données en mémoire. Le nombre de
+    lignes étant connu d'avance, chaque colonne est un fichier .npy projeté en mémoire et rempli
+    au fil des blocs ; le dossier obtenu se lit comme celui d'ecrire_colonnes.
+
+    Les colonnes entières et texte acceptent des valeurs manquantes par un masque ; une colonne
+    entière qui en contient est relue en Int64.
+
+    Args:
+        dossier: Chemin du dossier de destination, créé si besoin
+        nb_lignes: Nombre total de lignes
+        types: Type NumPy de chaque colonne, dans l'ordre (ex: '<U20', 'int64', 'float64')
+    """
+
+    def __init__(self, dossier: str, nb_lignes: int, types: Dict[str, str]):
+        from numpy.lib.format import open_memmap
+        self.chemin = Path(dossier)
+        self.chemin.mkdir(parents=True, exist_ok=True)
+        self.nb_lignes = nb_lignes
+        self.position = 0
+        self._colonnes = []
+        for position, (nom, type_numpy) in enumerate(types.items()):
+            valeurs = open_memmap(self.chemin / f"{position}.npy", mode='w+', dtype=np.dtype(type_numpy), shape=(nb_lignes,))
+            masque = None
+            if valeurs.dtype.kind in "iuU":
+                masque = open_memmap(self.chemin / f"{position}.na.npy", mode='w+', dtype=bool, shape=(nb_lignes,))
+            self._colonnes.append((nom, position, valeurs, masque))
+
+    def __enter__(self) -> "EcrivainColonnes":
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> None:
+        if type_exception is None:
+            self.fermer()
+
+    def ecrire(self, bloc: Dict[str, np.ndarray], manquantes: Optional[Dict[str, np.ndarray]] = None) -> None:
+        """
+        Ajoute un bloc de lignes.
+
+        Args:
+            bloc: Valeurs de chaque colonne, toutes de même longueur
+            manquantes: Masque des valeurs manquantes des colonnes entières ou texte qui en ont ;
+                dans les colonnes décimales, une valeur manquante est un NaN
+
+        Raises:
+            ValueError: Si le bloc dépasse le nombre de lignes annoncé
+        """
+        manquantes = manquantes or {}
+        taille = len(next(iter(bloc.values())))
+        if self.position + taille > self.nb_lignes:
+            raise ValueError(f"Trop de lignes: {self.position + taille} pour {self.nb_lignes} annoncées")
+        fin = self.position + taille
+        for nom, _, valeurs, masque in self._colonnes:
+            valeurs[self.position:fin] = bloc[nom]
+            if masque is not None:
+                masque[self.position:fin] = manquantes.get(nom, False)
+        self.position = fin
+
+    def fermer(self) -> None:
+        """
+        Écrit le schéma ; les masques sans valeur manquante sont supprimés.
+
+        Raises:
+            ValueError: Si toutes les lignes annoncées n'ont pas été écrites
+        """
+        if self.position != self.nb_lignes:
+            raise ValueError(f"Lignes écrites: {self.position} sur {self.nb_lignes} annoncées")
+        schema = {"lignes": self.nb_lignes, "colonnes": []}
+        masques_vides = []
+        for nom, position, valeurs, masque in self._colonnes:
+            type_pandas = "object" if valeurs.dtype.kind == "U" else str(valeurs.dtype)
+            description = {"nom": nom, "fichier": f"{position}.npy", "type": type_pandas}
+            valeurs.flush()
+            if masque is not None and masque.any():
+                masque.flush()
+                description["masque"] = f"{position}.na.npy"
+                if valeurs.dtype.kind in "iu":
+                    description["type"] = "Int64"
+            elif masque is not None:
+                masques_vides.append(self.chemin / f"{position}.na.npy")
+            schema["colonnes"].append(description)
+
+        # Fermer les projections avant de supprimer les masques inutiles
+        valeurs = masque = None
+        self._colonnes = []
+        for fichier in masques_vides:
+            fichier.unlink()
+
+        with open(self.chemin / FICHIER_SCHEMA, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+def lire_colonnes(dossier: str, mmap: bool = True) -> "pd.DataFrame":
+    """
+    Lit un dossier de colonnes écrit par ecrire_colonnes.
+
+    Args:
+        dossier: Chemin du dossier
+        mmap: Projeter les colonnes numériques en mémoire au lieu de les lire
+
+    Returns:
+        pd.DataFrame: Le DataFrame, avec les types d'origine
+
+    Raises:
+        FileNotFoundError: Si le dossier ou son schéma n'existe pas
+    """
+    import pandas as pd
+    chemin = Path(dossier)
+    with open(chemin / FICHIER_SCHEMA, encoding='utf-8') as f:
+        schema = json.load(f)
+
+    donnees = {}
+    for description in schema["colonnes"]:
+        valeurs = np.load(chemin / description["fichier"], mmap_mode='r' if mmap else None, allow_pickle=False)
+        masque = None
+        if "masque" in description:
+            masque = np.load(chemin / description["masque"], allow_pickle=False)
+
+        type_pandas = description["type"]
+        if valeurs.dtype.kind == 'U':
+            serie = pd.Series(valeurs.astype(object))
+            if masque is not None:
+                serie = serie.mask(masque)
+            serie = serie.astype(type_pandas if type_pandas != 'object' else object)
+        elif masque is not None:
+            serie = pd.Series(pd.arrays.IntegerArray(np.asarray(valeurs), masque))
+        else:
+            # asarray garde la projection en mémoire mais rend un ndarray simple
+            serie = pd.Series(np.asarray(valeurs), copy=False)
+        donnees[description["nom"]] = serie
+
+    return pd.DataFrame(donnees, copy=False)
+
+
+def ecrire_dataframe_binaire(df: "pd.DataFrame", fichier: str) -> str:
+    """
+    Écrit un DataFrame au format Parquet (.parquet) ou en dossier de colonnes (.colonnes).
+
+    Si pyarrow n'est pas installé, un fichier .parquet est remplacé par un dossier .colonnes
+    de même nom.
+
+    Args:
+        df: Le DataFrame à écrire
+        fichier: Chemin de destination
+
+    Returns:
+        str: Le chemin effectivement écrit
+
+    Raises:
+        ValueError: Si le format n'est pas un format binaire supporté
+    """
+    extension = Path(fichier).suffix.lower()
+    if extension == EXTENSION_COLONNES:
+        ecrire_colonnes(df, fichier)
+        return fichier
+    if extension != EXTENSION_PARQUET:
+        raise ValueError(f"Format binaire non supporté: {extension}. Utilisez PARQUET ou COLONNES.")
+
+    try:
+        df.to_parquet(fichier, index=False)
+        return fichier
+    except ImportError as e:
+        logger.error(f"Impossible de sauvegarder au format Parquet: {str(e)}")
+        logger.info("Installation du package pyarrow requise pour le format Parquet. Utilisation du format COLONNES par défaut.")
+        # Sauvegarder en dossier de colonnes à la place
+        dossier = str(Path(fichier).with_suffix(EXTENSION_COLONNES))
+        ecrire_colonnes(df, dossier)
+        logger.info(f"Sauvegardé en COLONNES à la place: {dossier}")
+        return dossier
+
+
+def lire_dataframe_binaire(fichier: str) -> "pd.DataFrame":
+    """
+    Lit un fichier Parquet ou un dossier de colonnes.
+
+    Raises:
+        ValueError: Si le format n'est pas un format binaire supporté
+    """
+    import pandas as pd
+    extension = Path(fichier).suffix.lower()
+    if extension == EXTENSION_COLONNES:
+        return lire_colonnes(fichier)
+    if extension == EXTENSION_PARQUET:
+        return pd.read_parquet(fichier)
+    raise ValueError(f"Format binaire non supporté: {extension}. Utilisez PARQUET ou COLONNES.")
@@ -0,0 +1,437 @@
+"""
+Génère des fichiers synthétiques de personnes et de produits d'épargne, dans tous les formats lus
+par import_personnes et import_epargnes, pour les tests de performance et de charge.
+
+Usage: python -m src.gpe.synth DOSSIER [--personnes N] [--epargnes N] [--formats csv txt xlsx parquet colonnes]
+                                       [--part-sales 0.01] [--part-invalides 0] [--graine 0] [--charger]
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.gpe.stockage import EXTENSION_COLONNES, EXTENSION_PARQUET, EcrivainColonnes, est_format_binaire
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('.csv', '.txt', '.xlsx', EXTENSION_PARQUET, EXTENSION_COLONNES)
+
+# Lignes générées et écrites à la fois : la mémoire dépend de ce bloc, pas du nombre de lignes
+TAILLE_BLOC = 100_000
+
+# Lignes de données d'une feuille Excel, en-tête non compris
+LIGNES_MAX_XLSX = 1_048_575
+
+# Valeurs manquantes telles qu'on les trouve dans les fichiers clients, reconnues par nettoyer_colonne
+VALEURS_MANQUANTES = np.array(["None", ""], dtype=object)
+
+# Nombres illisibles : convertir_colonne_en_float les refuse et l'import du fichier échoue
+VALEURS_INVALIDES = np.array(["abc", "12,5", "1.2.3"], dtype=object)
+
+# Nombres mal formés que float() accepte encore : espaces, signe +, notation scientifique
+FORMES_MAL_FORMEES = (" {} ", "+{}", "{:e}")
+
+# Colonnes converties en nombre par le nettoyage, les seules à recevoir des nombres mal formés
+COLONNES_CONVERTIES_PERSONNES = ('age', 'revenu_annuel', 'loyer', 'depenses_mensuelles', 'versement_mensuel_utilisateur')
+COLONNES_SALES_PERSONNES = COLONNES_CONVERTIES_PERSONNES + ('objectif', 'duree_epargne')
+COLONNES_CONVERTIES_EPARGNES = ('taux_interet', 'fiscalite', 'duree_min', 'volatilite')
+COLONNES_SALES_EPARGNES = COLONNES_CONVERTIES_EPARGNES
+
+# Nom de la colonne durée selon le format, comme dans les fichiers de src/gpe/data
+NOM_DUREE = {'.csv': 'duree', '.txt': 'durée', '.xlsx': 'duree'}
+
+# Familles de produits (nom, taux, fiscalité, durée minimale, plafond, volatilité), d'après le
+# catalogue de src/gpe/data/epargnes.csv ; un plafond NaN signifie sans plafond
+FAMILLES_EPARGNE = (
+    ("Livret", 0.024, 0.0, 0, 22950.0, 0.005),
+    ("Livret fiscalisé", 0.03, 0.30, 0, np.nan, 0.005),
+    ("PEL", 0.0175, 0.30, 4, 61200.0, 0.0),
+    ("Assurance Vie euros", 0.025, 0.172, 8, 150000.0, 0.005),
+    ("Assurance Vie UC", 0.045, 0.172, 8, 200000.0, 0.08),
+    ("PEA", 0.06, 0.172, 5, 150000.0, 0.12),
+    ("SCPI", 0.08, 0.30, 5, np.nan, 0.06),
+)
+
+
+def _generateur(graine: int, indice_bloc: int) -> np.random.Generator:
+    # Un générateur par bloc : les fichiers ne dépendent que de la graine et de la taille des blocs
+    return np.random.default_rng([graine, indice_bloc])
+
+
+def _noms(prefixes: np.ndarray, debut: int, taille: int) -> np.ndarray:
+    return np.char.add(np.char.add(prefixes.astype(str), " "), np.arange(debut, debut + taille).astype(str))
+
+
+def blocs_personnes(nb_lignes: int, graine: int = 0, taille_bloc: int = TAILLE_BLOC) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Génère des personnes par blocs, avec des distributions réalistes : revenus log-normaux,
+    loyer nul pour les propriétaires, dépenses proportionnelles au revenu, durée d'épargne
+    bornée par l'âge de la retraite et objectifs log-normaux.
+
+    Yields:
+        Dict[str, np.ndarray]: Les colonnes de chaque bloc, sans valeur sale, dans l'ordre des
+        fichiers de src/gpe/data
+    """
+    for indice_bloc, debut in enumerate(range(0, nb_lignes, taille_bloc)):
+        taille = min(taille_bloc, nb_lignes - debut)
+        rng = _generateur(graine, indice_bloc)
+
+        age = np.clip(np.rint(rng.normal(45, 15, taille)), 18, 85).astype(np.int64)
+        revenu_annuel = np.maximum(np.round(rng.lognormal(np.log(30000), 0.5, taille), -2), 6000.0)
+        revenu_mensuel = revenu_annuel / 12
+        # Environ 40 % de propriétaires sans loyer
+        loyer = np.where(rng.random(taille) < 0.4, 0.0, np.round(revenu_mensuel * rng.uniform(0.15, 0.40, taille), -1))
+        depenses = np.round(revenu_mensuel * rng.uniform(0.25, 0.60, taille), -1)
+        capacite = np.maximum(revenu_mensuel - loyer - depenses, 0)
+        # Environ 40 % des personnes sans versement saisi, les autres au multiple de 5 € près
+        versement = np.where(rng.random(taille) < 0.4, 0.0, np.round(capacite * rng.uniform(0.1, 0.9, taille) / 5) * 5)
+        objectif = np.maximum(np.round(rng.lognormal(np.log(30000), 0.9, taille), -2), 500.0)
+        duree = rng.integers(1, np.clip(67 - age, 1, 40) + 1)
+
+        yield {
+            "nom": _noms(np.array("Client"), debut, taille),
+            "age": age,
+            "revenu_annuel": revenu_annuel,
+            "loyer": loyer,
+            "depenses_mensuelles": depenses,
+            "versement_mensuel_utilisateur": versement,
+            "objectif": objectif,
+            "duree_epargne": duree.astype(np.int64),
+        }
+
+
+def blocs_epargnes(nb_lignes: int, graine: int = 0, taille_bloc: int = TAILLE_BLOC) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Génère des produits d'épargne par blocs, en variant les familles de FAMILLES_EPARGNE.
+
+    Yields:
+        Dict[str, np.ndarray]: Les colonnes de chaque bloc, sans valeur sale
+    """
+    familles = list(zip(*FAMILLES_EPARGNE))
+    noms_familles = np.array(familles[0])
+    taux, fiscalite, duree_min, plafond, volatilite = (np.array(colonne, dtype=float) for colonne in familles[1:])
+    for indice_bloc, debut in enumerate(range(0, nb_lignes, taille_bloc)):
+        taille = min(taille_bloc, nb_lignes - debut)
+        rng = _generateur(graine, indice_bloc)
+        famille = rng.integers(0, len(FAMILLES_EPARGNE), taille)
+        yield {
+            "nom": _noms(noms_familles[famille], debut, taille),
+            "taux_interet": np.round(np.maximum(taux[famille] * rng.normal(1, 0.15, taille), 0), 4),
+            "fiscalite": fiscalite[famille],
+            "duree_min": duree_min[famille].astype(np.int64),
+            "versement_max": plafond[famille],
+            "volatilite": np.round(volatilite[famille] * rng.uniform(0.8, 1.2, taille), 4),
+        }
+
+
+def _salir(bloc: Dict[str, np.ndarray], colonnes_sales: Tuple[str, ...], colonnes_converties: Tuple[str, ...],
+           part_sales: float, part_invalides: float, rng: np.random.Generator) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Remplace une part des cellules par des valeurs sales.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]: Les colonnes en texte (en objets là où
+        il y a des valeurs sales) et, par colonne, le masque des cellules devenues manquantes ou
+        illisibles
+    """
+    sales = dict(bloc)
+    manquantes = {}
+    for col in colonnes_sales:
+        taille = len(bloc[col])
+        tirage = rng.random(taille)
+        convertie = col in colonnes_converties
+        # Parmi les cellules sales d'une colonne convertie, une sur deux est un nombre mal formé
+        sale = tirage < part_sales
+        mal_forme = sale & (rng.random(taille) < 0.5) if convertie else np.zeros(taille, dtype=bool)
+        manquante = sale & ~mal_forme
+        invalide = (rng.random(taille) < part_invalides) & ~sale if convertie else np.zeros(taille, dtype=bool)
+        if not (sale.any() or invalide.any()):
+            continue
+
+        valeurs = bloc[col].astype(object)
+        valeurs[manquante] = rng.choice(VALEURS_MANQUANTES, manquante.sum())
+        valeurs[invalide] = rng.choice(VALEURS_INVALIDES, invalide.sum())
+        formes = rng.integers(0, len(FORMES_MAL_FORMEES), mal_forme.sum()).tolist()
+        for indice, forme in zip(np.flatnonzero(mal_forme).tolist(), formes):
+            valeurs[indice] = FORMES_MAL_FORMEES[forme].format(bloc[col][indice])
+        sales[col] = valeurs
+        manquantes[col] = manquante | invalide
+    return sales, manquantes
+
+
+class _EcrivainTexte:
+    # CSV ou TXT tabulé, écrit bloc par bloc
+    def __init__(self, fichier: str, separateur: str):
+        self.flux = open(fichier, 'w', encoding='utf-8', newline='', buffering=1 << 20)
+        self.separateur = separateur
+        self.en_tete = True
+
+    def ecrire(self, colonnes: Dict[str, np.ndarray], manquantes: Dict[str, np.ndarray]) -> None:
+        import pandas as pd
+        pd.DataFrame(colonnes, copy=False).to_csv(self.flux, sep=self.separateur, index=False,
+                                                  header=self.en_tete, na_rep='None')
+        self.en_tete = False
+
+    def fermer(self) -> None:
+        self.flux.close()
+
+
+class _EcrivainXlsx:
+    # Classeur Excel en mode écriture seule d'openpyxl, qui ne garde pas les lignes en mémoire
+    def __init__(self, fichier: str):
+        from openpyxl import Workbook
+        self.fichier = fichier
+        self.classeur = Workbook(write_only=True)
+        self.feuille = self.classeur.create_sheet()
+        self.en_tete = True
+
+    def ecrire(self, colonnes: Dict[str, np.ndarray], manquantes: Dict[str, np.ndarray]) -> None:
+        if self.en_tete:
+            self.feuille.append(list(colonnes))
+            self.en_tete = False
+        listes = [valeurs.tolist() for valeurs in colonnes.values()]
+        for ligne in zip(*listes):
+            self.feuille.append([None if isinstance(v, float) and v != v else v for v in ligne])
+
+    def fermer(self) -> None:
+        self.classeur.save(self.fichier)
+
+
+class _EcrivainParquet:
+    # Un groupe de lignes Parquet par bloc
+    def __init__(self, fichier: str):
+        import pyarrow.parquet as pq
+        self.fichier = fichier
+        self._pq = pq
+        self.ecrivain = None
+
+    def ecrire(self, colonnes: Dict[str, np.ndarray], manquantes: Dict[str, np.ndarray]) -> None:
+        import pyarrow as pa
+        table = pa.table({col: pa.array(valeurs, mask=manquantes.get(col)) for col, valeurs in colonnes.items()})
+        if self.ecrivain is None:
+            self.ecrivain = self._pq.ParquetWriter(self.fichier, table.schema)
+        self.ecrivain.write_table(table)
+
+    def fermer(self) -> None:
+        if self.ecrivain is not None:
+            self.ecrivain.close()
+
+
+def _chemin_de_repli(fichier: str, extension: str) -> str:
+    repli = Path(fichier).with_suffix(extension)
+    if repli.exists():
+        raise FileExistsError(f"Le fichier de repli {repli} existe déjà et ne sera pas écrasé : "
+                              f"installez la dépendance du format {Path(fichier).suffix} ou supprimez-le")
+    return str(repli)
+
+
+def _ouvrir_ecrivain(fichier: str, nb_lignes: int, types: Dict[str, str]):
+    """
+    Ouvre l'écrivain du format donné par l'extension. Sans openpyxl, un fichier .xlsx est
+    remplacé par un CSV de même nom ; sans pyarrow, un fichier .parquet l'est par un dossier
+    .colonnes, comme dans save_personnes.
+
+    Returns:
+        Tuple: L'écrivain et le chemin effectivement écrit
+
+    Raises:
+        FileExistsError: Si le fichier de repli existe déjà, pour ne pas écraser par exemple le CSV
+            demandé dans la même génération
+    """
+    extension = Path(fichier).suffix.lower()
+    if extension == '.xlsx':
+        try:
+            return _EcrivainXlsx(fichier), fichier
+        except ImportError as e:
+            logger.error(f"Impossible d'écrire au format Excel: {str(e)}")
+            fichier = _chemin_de_repli(fichier, '.csv')
+            logger.info(f"Installation du package openpyxl requise pour le format Excel. Écriture en CSV à la place: {fichier}")
+            extension = '.csv'
+    if extension == EXTENSION_PARQUET:
+        try:
+            return _EcrivainParquet(fichier), fichier
+        except ImportError as e:
+            logger.error(f"Impossible d'écrire au format Parquet: {str(e)}")
+            fichier = _chemin_de_repli(fichier, EXTENSION_COLONNES)
+            logger.info(f"Installation du package pyarrow requise pour le format Parquet. Écriture en COLONNES à la place: {fichier}")
+            extension = EXTENSION_COLONNES
+    if extension == EXTENSION_COLONNES:
+        return EcrivainColonnes(fichier, nb_lignes, types), fichier
+    if extension in ('.csv', '.txt'):
+        return _EcrivainTexte(fichier, ',' if extension == '.csv' else '\t'), fichier
+    raise ValueError(f"Format de fichier non supporté: {extension}. Utilisez CSV, TXT, XLSX, PARQUET ou COLONNES.")
+
+
+def _generer(fichier: str, nb_lignes: int, blocs: Iterator[Dict[str, np.ndarray]], colonnes_sales: Tuple[str, ...],
+             colonnes_converties: Tuple[str, ...], largeur_nom: int, part_sales: float, part_invalides: float,
+             graine: int) -> str:
+    if not 0 <= part_sales <= 1 or not 0 <= part_invalides <= 1:
+        raise ValueError(f"Les parts de valeurs sales doivent être entre 0 et 1: {part_sales}, {part_invalides}")
+    extension = Path(fichier).suffix.lower()
+    if extension == '.xlsx' and nb_lignes > LIGNES_MAX_XLSX:
+        raise ValueError(f"Une feuille Excel contient au plus {LIGNES_MAX_XLSX} lignes: {nb_lignes} demandées")
+
+    premier = next(blocs, None)
+    if premier is None:
+        raise ValueError(f"Le nombre de lignes doit être positif: {nb_lignes}")
+    types = {col: f"<U{largeur_nom}" if col == "nom" else valeurs.dtype.str for col, valeurs in premier.items()}
+    ecrivain, fichier = _ouvrir_ecrivain(fichier, nb_lignes, types)
+    binaire = est_format_binaire(fichier)
+    nom_duree = NOM_DUREE.get(Path(fichier).suffix.lower(), 'duree_epargne')
+    for indice_bloc, bloc in enumerate(_enchainer(premier, blocs)):
+        # Les valeurs sales ont leurs propres tirages, pour que les valeurs propres n'en dépendent pas
+        rng_sale = np.random.default_rng([graine, indice_bloc, 1])
+        colonnes, manquantes = _salir(bloc, colonnes_sales, colonnes_converties, part_sales, part_invalides, rng_sale)
+        if binaire:
+            # Les formats binaires contiennent des données déjà nettoyées : une valeur sale y est manquante
+            colonnes = {col: np.where(manquantes[col], np.nan, valeurs)
+                        if col in manquantes and valeurs.dtype.kind == 'f' else valeurs
+                        for col, valeurs in bloc.items()}
+        if "duree_epargne" in colonnes and nom_duree != "duree_epargne":
+            colonnes = {nom_duree if col == "duree_epargne" else col: valeurs for col, valeurs in colonnes.items()}
+            if "duree_epargne" in manquantes:
+                manquantes[nom_duree] = manquantes.pop("duree_epargne")
+        ecrivain.ecrire(colonnes, manquantes)
+    ecrivain.fermer()
+    logger.info(f"{nb_lignes} lignes synthétiques écrites dans {fichier}")
+    return fichier
+
+
+def _enchainer(premier: Dict[str, np.ndarray], suite: Iterator[Dict[str, np.ndarray]]) -> Iterator[Dict[str, np.ndarray]]:
+    yield premier
+    yield from suite
+
+
+def generer_personnes(fichier: str, nb_lignes: int, part_sales: float = 0.01, part_invalides: float = 0.0,
+                      graine: int = 0, taille_bloc: int = TAILLE_BLOC) -> str:
+    """
+    Écrit un fichier de personnes synthétiques, bloc par bloc, au format donné par l'extension.
+
+    Dans les formats texte et XLSX, une part des cellules est remplacée par 'None', une cellule
+    vide ou un nombre mal formé que le nettoyage sait lire ; les lignes aux valeurs manquantes
+    sont rejetées à l'import. Les formats binaires ne repassant pas par le nettoyage, les
+    cellules sales y deviennent des valeurs manquantes.
+
+    Args:
+        fichier (str): Chemin de destination (formats supportés: CSV, TXT, XLSX, PARQUET, COLONNES)
+        nb_lignes (int): Nombre de personnes
+        part_sales (float): Part des cellules sales, par colonne
+        part_invalides (float): Part des cellules remplacées par un nombre illisible, qui fait
+            échouer l'import : à réserver aux tests de gestion d'erreur
+        graine (int): Graine des tirages ; le fichier dépend de la graine et de taille_bloc
+        taille_bloc (int): Nombre de lignes générées et écrites à la fois
+
+    Returns:
+        str: Le chemin effectivement écrit, qui diffère de fichier si un format de repli est utilisé
+
+    Raises:
+        ValueError: Si le format n'est pas supporté, si nb_lignes n'est pas positif, si une part
+            sort de [0, 1] ou si une feuille Excel ne peut pas contenir nb_lignes lignes
+        FileExistsError: Si le format de repli d'un format indisponible désigne un fichier existant
+    """
+    if taille_bloc <= 0:
+        raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+    largeur_nom = len(f"Client {max(nb_lignes - 1, 0)}")
+    return _generer(fichier, nb_lignes, blocs_personnes(nb_lignes, graine, taille_bloc), COLONNES_SALES_PERSONNES,
+                    COLONNES_CONVERTIES_PERSONNES, largeur_nom, part_sales, part_invalides, graine)
+
+
+def generer_epargnes(fichier: str, nb_lignes: int, part_sales: float = 0.01, part_invalides: float = 0.0,
+                     graine: int = 0, taille_bloc: int = TAILLE_BLOC) -> str:
+    """
+    Écrit un fichier de produits d'épargne synthétiques, voir generer_personnes. Un produit sans
+    plafond a un versement_max 'None', comme dans src/gpe/data/epargnes.csv.
+
+    Returns:
+        str: Le chemin effectivement écrit
+    """
+    if taille_bloc <= 0:
+        raise ValueError(f"La taille de bloc doit être positive: {taille_bloc}")
+    largeur_nom = max(len(famille[0]) for famille in FAMILLES_EPARGNE) + 1 + len(str(max(nb_lignes - 1, 0)))
+    return _generer(fichier, nb_lignes, blocs_epargnes(nb_lignes, graine, taille_bloc), COLONNES_SALES_EPARGNES,
+                    COLONNES_CONVERTIES_EPARGNES, largeur_nom, part_sales, part_invalides, graine)
+
+
+def tester_charge(personnes_fichier: str, epargnes_fichier: str, taille_bloc: int = TAILLE_BLOC) -> dict:
+    """
+    Importe en flux un fichier de personnes et évalue les suggestions de chaque bloc, comme
+    main.py --taille-bloc, en mesurant les étapes.
+
+    Returns:
+        dict: Nombre de personnes, de lignes rejetées et de résultats, durée totale, mesures de
+        profilage.mesures() et tableau de profilage.rapport_etapes()
+    """
+    from src.gpe import profilage
+    from src.gpe.core import import_epargnes, iter_personnes, suggestion_epargne_flux
+
+    profilage.reinitialiser()
+    profilage.activer()
+    try:
+        debut = time.perf_counter()
+        rejets = []
+        epargnes = import_epargnes(epargnes_fichier, rejets)
+        nb_personnes = nb_resultats = 0
+        for personnes, resultats in suggestion_epargne_flux(iter_personnes(personnes_fichier, taille_bloc, rejets), epargnes):
+            nb_personnes += len(personnes)
+            nb_resultats += len(resultats)
+        duree = time.perf_counter() - debut
+        return {"personnes": nb_personnes, "epargnes": len(epargnes), "lignes_rejetees": len(rejets),
+                "resultats": nb_resultats, "duree_s": duree, "mesures": profilage.mesures(),
+                "rapport": profilage.rapport_etapes()}
+    finally:
+        profilage.desactiver()
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Génère des fichiers synthétiques de personnes et de produits d'épargne.")
+    parser.add_argument("dossier", help="Dossier de destination, créé si besoin")
+    parser.add_argument("--personnes", type=int, default=100_000, metavar="N", help="Nombre de personnes")
+    parser.add_argument("--epargnes", type=int, default=12, metavar="N", help="Nombre de produits d'épargne")
+    parser.add_argument("--formats", nargs="+", default=["csv"], choices=[f.lstrip('.') for f in FORMATS],
+                        help="Formats des fichiers générés")
+    parser.add_argument("--part-sales", type=float, default=0.01, metavar="PART",
+                        help="Part des cellules manquantes ou mal formées, par colonne")
+    parser.add_argument("--part-invalides", type=float, default=0.0, metavar="PART",
+                        help="Part des cellules illisibles, qui font échouer l'import")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC, metavar="N",
+                        help="Lignes générées et écrites à la fois")
+    parser.add_argument("--charger", action="store_true",
+                        help="Importe ensuite chaque fichier de personnes en flux et affiche les mesures")
+    args = parser.parse_args(arguments)
+    for option, valeur in (("--personnes", args.personnes), ("--epargnes", args.epargnes),
+                           ("--taille-bloc", args.taille_bloc)):
+        if valeur <= 0:
+            parser.error(f"{option} doit être positif: {valeur}")
+    for option, valeur in (("--part-sales", args.part_sales), ("--part-invalides", args.part_invalides)):
+        if not 0 <= valeur <= 1:
+            parser.error(f"{option} doit être entre 0 et 1: {valeur}")
+
+    dossier = Path(args.dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    options = dict(part_sales=args.part_sales, part_invalides=args.part_invalides, graine=args.graine,
+                   taille_bloc=args.taille_bloc)
+    for format_fichier in args.formats:
+        debut = time.perf_counter()
+        try:
+            personnes = generer_personnes(str(dossier / f"personnes.{format_fichier}"), args.personnes, **options)
+            epargnes = generer_epargnes(str(dossier / f"epargnes.{format_fichier}"), args.epargnes, **options)
+        except FileExistsError as e:
+            parser.error(str(e))
+        print(f"{personnes}\n{epargnes}\n  générés en {time.perf_counter() - debut:.2f} s")
+        if args.charger:
+            charge = tester_charge(personnes, epargnes, args.taille_bloc)
+            print(f"  {charge['personnes']} personnes, {charge['lignes_rejetees']} lignes rejetées, "
+                  f"{charge['resultats']} résultats en {charge['duree_s']:.2f} s "
+                  f"({charge['personnes'] / charge['duree_s']:.0f} personnes/s)")
+            print(charge["rapport"])
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -1,27 +1,145 @@
-import pandas as pd
-from typing import Union, List, Dict, Any
+import numpy as np
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Union, List, Dict, Any, Tuple
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def calcul_interets_composes(versement_annuel: float, taux_annuel: float, duree_annees: int) -> float:
+
+def calcul_interets_composes(versement_annuel: Union[float, np.ndarray], taux_annuel: Union[float, np.ndarray],
+                             duree_annees: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
     """
     Calcule le montant accumulé par un placement à intérêts composés.
 
-    La formule utilisée est: montant(n+1) = (montant(n) + versement_annuel) * (1 + taux_annuel)
+    La récurrence montant(n+1) = (montant(n) + versement_annuel) * (1 + taux_annuel) est évaluée
+    directement par la formule fermée d'une rente à terme échu avancé :
+    montant(n) = versement_annuel * (1 + taux_annuel) * ((1 + taux_annuel)^n - 1) / taux_annuel,
+    qui se réduit à versement_annuel * n pour un taux nul.
+
+    Les trois arguments acceptent des scalaires ou des tableaux NumPy, combinés par broadcasting.
 
     Args:
-        versement_annuel (float): Montant versé chaque année
-        taux_annuel (float): Taux d'intérêt annuel (ex: 0.03 pour 3%)
-        duree_annees (int): Durée du placement en années
+        versement_annuel (float | np.ndarray): Montant versé chaque année
+        taux_annuel (float | np.ndarray): Taux d'intérêt annuel (ex: 0.03 pour 3%)
+        duree_annees (int | np.ndarray): Durée du placement en années (une durée négative compte pour 0)
 
     Returns:
-        float: Montant total accumulé après la durée spécifiée
+        float | np.ndarray: Montant total accumulé après la durée spécifiée, scalaire si tous les
+        arguments sont scalaires
     """
-    montant = 0
+    versement = np.asarray(versement_annuel, dtype=float)
+    taux = np.asarray(taux_annuel, dtype=float)
+    duree = np.maximum(np.asarray(duree_annees, dtype=float), 0)
+
+    # expm1/log1p gardent la précision pour les petits taux
+    with np.errstate(divide='ignore', invalid='ignore'):
+        croissance = np.expm1(duree * np.log1p(taux)) / taux
+        # Le facteur est calculé à part pour que versement * facteur(taux, duree) donne le même résultat
+        facteur = np.where(taux == 0, duree, (1 + taux) * croissance)
+        montant = versement * facteur
+
+    if montant.ndim == 0:
+        return float(montant)
+    return montant
 
-    for _ in range(duree_annees):
-        montant = (montant + versement_annuel) * (1 + taux_annuel)
 
-    return montant
+class TableFacteursCroissance:
+    """
+    Cache LRU des facteurs de croissance calcul_interets_composes(1, taux, duree).
+
+    Le capital étant linéaire en le versement annuel, calcul_interets_composes(v, taux, duree)
+    vaut exactement v * facteur(taux, duree) : un facteur par couple (taux, durée) suffit pour
+    toutes les personnes et tous les scénarios d'effort.
+
+    Attributes:
+        taille_max (int): Nombre maximal de facteurs conservés
+        succes (int): Nombre de facteurs trouvés dans le cache
+        echecs (int): Nombre de facteurs qu'il a fallu calculer
+    """
+
+    def __init__(self, taille_max: int = 65536):
+        if taille_max <= 0:
+            raise ValueError(f"La taille maximale doit être positive: {taille_max}")
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+        self._facteurs: "OrderedDict[Tuple[float, float], float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._facteurs)
+
+    def __repr__(self):
+        return (f"TableFacteursCroissance(taille={len(self)}/{self.taille_max}, "
+                f"succes={self.succes}, echecs={self.echecs})")
+
+    def facteur(self, taux: float, duree: float) -> float:
+        """
+        Renvoie le facteur d'un seul couple, directement depuis le dictionnaire : suggestion_epargne
+        l'appelle pour chaque produit de chaque personne.
+
+        Returns:
+            float: Le facteur de croissance pour ce taux et cette durée
+        """
+        cle = (float(taux), float(duree))
+        facteur = self._facteurs.get(cle)
+        if facteur is not None:
+            self._facteurs.move_to_end(cle)
+            self.succes += 1
+            return facteur
+        self.echecs += 1
+        facteur = float(calcul_interets_composes(1.0, cle[0], cle[1]))
+        self._facteurs[cle] = facteur
+        if len(self._facteurs) > self.taille_max:
+            self._facteurs.popitem(last=False)
+        return facteur
+
+    def facteurs(self, taux: np.ndarray, durees: np.ndarray) -> np.ndarray:
+        """
+        Renvoie la grille des facteurs pour chaque taux et chaque durée ; seuls les couples absents
+        du cache sont calculés, en une évaluation vectorisée. Les taux et durées répétés ne sont
+        cherchés, et comptés dans succes ou echecs, qu'une fois.
+
+        Args:
+            taux (np.ndarray): Taux d'intérêt annuels, de taille T
+            durees (np.ndarray): Durées en années, de taille D
+
+        Returns:
+            np.ndarray: Facteurs de forme (T, D)
+        """
+        taux, inverse_taux = np.unique(np.asarray(taux, dtype=float).ravel(), return_inverse=True)
+        durees, inverse_durees = np.unique(np.asarray(durees, dtype=float).ravel(), return_inverse=True)
+        grille = np.empty((len(taux), len(durees)))
+        manquants = []
+
+        for i, t in enumerate(taux.tolist()):
+            for j, d in enumerate(durees.tolist()):
+                facteur = self._facteurs.get((t, d))
+                if facteur is None:
+                    manquants.append((i, j))
+                else:
+                    self._facteurs.move_to_end((t, d))
+                    grille[i, j] = facteur
+        self.succes += len(taux) * len(durees) - len(manquants)
+
+        if manquants:
+            self.echecs += len(manquants)
+            lignes, colonnes = np.array(manquants).T
+            calcules = calcul_interets_composes(1.0, taux[lignes], durees[colonnes])
+            grille[lignes, colonnes] = calcules
+            for t, d, facteur in zip(taux[lignes].tolist(), durees[colonnes].tolist(), calcules.tolist()):
+                self._facteurs[(t, d)] = facteur
+            while len(self._facteurs) > self.taille_max:
+                self._facteurs.popitem(last=False)
+
+        return grille[np.ix_(inverse_taux, inverse_durees)]
+
+    def vider(self) -> None:
+        """
+        Vide le cache et remet les compteurs à zéro.
+        """
+        self._facteurs.clear()
+        self.succes = 0
+        self.echecs = 0
 
 
 def nettoyer_valeur_manquante(valeur: Any) -> Any:
@@ -34,6 +152,7 @@ def nettoyer_valeur_manquante(valeur: Any) -> Any:
     Returns:
         La valeur nettoyée ou None si c'est une valeur manquante
     """
+    import pandas as pd
     if pd.isna(valeur) or valeur == "None" or valeur == "" or valeur is None:
         return None
     return valeur
@@ -87,7 +206,91 @@ def convertir_en_int(valeur: Any) -> Union[int, None]:
         raise ValueError(f"Impossible de convertir '{valeur}' en int: {str(e)}")
 
 
-def nettoyer_dataframe_epargne(df: pd.DataFrame) -> pd.DataFrame:
+def nettoyer_colonne(serie: "pd.Series") -> "pd.Series":
+    """
+    Version vectorisée de nettoyer_valeur_manquante appliquée à toute une colonne :
+    les chaînes "None" et "" deviennent des valeurs manquantes.
+
+    Args:
+        serie: La colonne à nettoyer
+
+    Returns:
+        pd.Series: La colonne nettoyée
+    """
+    import pandas as pd
+    # Seules les colonnes texte ou objet peuvent contenir "None" ou ""
+    if pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        return serie
+    manquantes = serie.isin(["None", ""])
+    if manquantes.any():
+        serie = serie.mask(manquantes)
+    # Comme apply, laisser pandas déduire le type d'une colonne objet
+    return serie.infer_objects() if serie.dtype == object else serie
+
+
+def convertir_colonne_en_float(serie: "pd.Series", colonne: str) -> "pd.Series":
+    """
+    Version vectorisée de convertir_en_float appliquée à toute une colonne.
+
+    Args:
+        serie: La colonne à convertir (déjà nettoyée des valeurs manquantes)
+        colonne: Nom de la colonne, repris dans le message d'erreur
+
+    Returns:
+        pd.Series: La colonne en float64, les valeurs manquantes valant NaN
+
+    Raises:
+        ValueError: Si une valeur ne peut pas être convertie en float
+    """
+    import pandas as pd
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        return serie.astype(float)
+
+    valeurs = pd.to_numeric(serie, errors='coerce').astype(float)
+
+    # Les valeurs rejetées par to_numeric repassent par float(), seul juge comme auparavant
+    rejetees = valeurs.isna() & serie.notna()
+    for indice in serie.index[rejetees.to_numpy()]:
+        valeur = serie.at[indice]
+        try:
+            valeurs.at[indice] = float(valeur)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Impossible de convertir '{valeur}' en float dans la colonne '{colonne}': {str(e)}")
+
+    return valeurs
+
+
+def convertir_colonne_en_int(serie: "pd.Series", colonne: str) -> "pd.Series":
+    """
+    Version vectorisée de convertir_en_int appliquée à toute une colonne (troncature vers zéro).
+
+    Args:
+        serie: La colonne à convertir (déjà nettoyée des valeurs manquantes)
+        colonne: Nom de la colonne, repris dans le message d'erreur
+
+    Returns:
+        pd.Series: La colonne en int, ou en Int64 si elle contient des valeurs manquantes
+
+    Raises:
+        ValueError: Si une valeur ne peut pas être convertie en int
+    """
+    import pandas as pd
+    if pd.api.types.is_integer_dtype(serie.dtype) and not serie.isna().any():
+        return serie.astype(int)
+
+    try:
+        valeurs = np.trunc(convertir_colonne_en_float(serie, colonne))
+    except ValueError as e:
+        raise ValueError(str(e).replace("en float", "en int", 1))
+
+    if valeurs.isna().any():
+        # Si la colonne contient des None, utiliser le type Int64 de pandas
+        return valeurs.astype('Int64')
+    # Sinon, utiliser le type int standard
+    return valeurs.astype(int)
+
+
+def nettoyer_dataframe_epargne(df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Nettoie un DataFrame contenant des données d'épargne.
 
@@ -98,7 +301,8 @@ def nettoyer_dataframe_epargne(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: Le DataFrame nettoyé
 
     Raises:
-        ValueError: Si le DataFrame ne contient pas les colonnes attendues
+        ValueError: Si le DataFrame ne contient pas les colonnes attendues ou si une valeur
+            ne peut pas être convertie
     """
     # Vérifier que les colonnes requises sont présentes
     colonnes_requises = ['taux_interet', 'fiscalite', 'duree_min', 'versement_max']
@@ -111,26 +315,20 @@ def nettoyer_dataframe_epargne(df: pd.DataFrame) -> pd.DataFrame:
 
     # Nettoyer les valeurs manquantes
     for col in df_clean.columns:
-        df_clean[col] = df_clean[col].apply(nettoyer_valeur_manquante)
+        df_clean[col] = nettoyer_colonne(df_clean[col])
 
-    # Convertir les colonnes en float
-    for col in ['taux_interet', 'fiscalite', 'versement_max']:
-        df_clean[col] = df_clean[col].apply(lambda x: convertir_en_float(x))
+    # Convertir les colonnes en float ; la volatilité est facultative
+    for col in ['taux_interet', 'fiscalite', 'versement_max', 'volatilite']:
+        if col in df_clean.columns:
+            df_clean[col] = convertir_colonne_en_float(df_clean[col], col)
 
-    # Convertir les colonnes en int
-    # Utiliser pd.Int64Dtype() pour gérer les valeurs None dans les colonnes entières
-    df_clean['duree_min'] = df_clean['duree_min'].apply(lambda x: convertir_en_int(x))
-    if df_clean['duree_min'].isna().any():
-        # Si la colonne contient des None, utiliser le type Int64 de pandas
-        df_clean['duree_min'] = df_clean['duree_min'].astype('Int64')
-    else:
-        # Sinon, utiliser le type int standard
-        df_clean['duree_min'] = df_clean['duree_min'].astype(int)
+    # Convertir les colonnes en int (Int64 si la colonne contient des None)
+    df_clean['duree_min'] = convertir_colonne_en_int(df_clean['duree_min'], 'duree_min')
 
     return df_clean
 
 
-def nettoyer_dataframe_personne(df: pd.DataFrame) -> pd.DataFrame:
+def nettoyer_dataframe_personne(df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Nettoie un DataFrame contenant des données de personnes.
 
@@ -141,7 +339,8 @@ def nettoyer_dataframe_personne(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: Le DataFrame nettoyé
 
     Raises:
-        ValueError: Si le DataFrame ne contient pas les colonnes attendues
+        ValueError: Si le DataFrame ne contient pas les colonnes attendues ou si une valeur
+            ne peut pas être convertie
     """
     # Vérifier que les colonnes requises sont présentes
     colonnes_requises = ['age', 'revenu_annuel', 'loyer', 'depenses_mensuelles']
@@ -154,20 +353,14 @@ def nettoyer_dataframe_personne(df: pd.DataFrame) -> pd.DataFrame:
 
     # Nettoyer les valeurs manquantes
     for col in df_clean.columns:
-        df_clean[col] = df_clean[col].apply(nettoyer_valeur_manquante)
+        df_clean[col] = nettoyer_colonne(df_clean[col])
 
     # Convertir les colonnes en float
     for col in ['revenu_annuel', 'loyer', 'depenses_mensuelles', 'versement_mensuel_utilisateur']:
         if col in df_clean.columns:
-            df_clean[col] = df_clean[col].apply(lambda x: convertir_en_float(x))
+            df_clean[col] = convertir_colonne_en_float(df_clean[col], col)
 
-    # Convertir les colonnes en int
-    df_clean['age'] = df_clean['age'].apply(lambda x: convertir_en_int(x))
-    if df_clean['age'].isna().any():
-        # Si la colonne contient des None, utiliser le type Int64 de pandas
-        df_clean['age'] = df_clean['age'].astype('Int64')
-    else:
-        # Sinon, utiliser le type int standard
-        df_clean['age'] = df_clean['age'].astype(int)
+    # Convertir les colonnes en int (Int64 si la colonne contient des None)
+    df_clean['age'] = convertir_colonne_en_int(df_clean['age'], 'age')
 
     return df_clean
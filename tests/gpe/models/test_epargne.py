@@ -1,4 +1,7 @@
-from src.gpe.models.epargne import Epargne
+import random
+import unittest
+
+from src.gpe.models.epargne import Epargne, EpargneIndex
 
 epargne_sans_versement_max = Epargne(
     nom="Livret A",
@@ -18,4 +21,35 @@ epargne_avec_versement_max = Epargne(
 # todo:
 #  - Tester le constructeur
 #  - Tester la sortie __str__
-#  - Tester la sortie __repr__
\ No newline at end of file
+#  - Tester la sortie __repr__
+
+
+class TestEpargneIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.catalogue = [
+            Epargne(nom=f"Produit {i}", taux_interet=0.02, fiscalite=0.3, duree_min=rng.choice([None, 0, 2, 4, 8, 8, 15]),
+                    versement_max=rng.choice([None, 7700.0, 12000.0, 22950.0, 61200.0, 150000.0]))
+            for i in range(60)
+        ]
+        self.index = EpargneIndex(self.catalogue)
+
+    def test_eligibles_comme_un_parcours_complet(self):
+        for duree in [0, 1, 4, 7.5, 8, 30]:
+            for versement_total in [None, -100.0, 0.0, 7700.0, 20000.0, 1e6]:
+                attendus = [
+                    e for e in self.catalogue
+                    if not (e.duree_min is not None and duree < e.duree_min)
+                    and (versement_total is None or e.versement_max is None or versement_total <= e.versement_max)
+                ]
+                self.assertEqual(self.index.eligibles(duree, versement_total), attendus)
+
+    def test_se_parcourt_comme_le_catalogue(self):
+        self.assertEqual(len(self.index), len(self.catalogue))
+        self.assertEqual(list(self.index), self.catalogue)
+        self.assertIs(self.index[3], self.catalogue[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from src.gpe.models.personne import Personne, PersonneTable
+
+personnes = [
+    Personne(nom="Jacques", age=25, revenu_annuel=26000.0, loyer=600.0, depenses_mensuelles=300.0, objectif=1000.0,
+             duree_epargne=10, versement_mensuel_utilisateur=500.0),
+    Personne(nom="Alice", age=22, revenu_annuel=21000.0, loyer=400.0, depenses_mensuelles=300.0, objectif=186000.0,
+             duree_epargne=36, versement_mensuel_utilisateur=0.0),
+]
+
+
+class TestPersonne(unittest.TestCase):
+
+    def test_slots(self):
+        self.assertFalse(hasattr(personnes[0], "__dict__"))
+        with self.assertRaises(AttributeError):
+            personnes[0].attribut_inconnu = 1
+
+
+class TestPersonneTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = PersonneTable.depuis_personnes(personnes)
+
+    def test_personne_a_la_demande(self):
+        self.assertEqual(len(self.table), 2)
+        for personne, vue in zip(personnes, self.table):
+            self.assertEqual(repr(vue), repr(personne))
+            self.assertEqual(str(vue), str(personne))
+        self.assertEqual(repr(self.table[-1]), repr(personnes[-1]))
+
+    def test_colonnes(self):
+        self.assertEqual(self.table["revenu_annuel"].dtype, np.float64)
+        np.testing.assert_array_equal(self.table._calcul_capacite_epargne(),
+                                      [p._calcul_capacite_epargne() for p in personnes])
+        self.assertEqual(len(self.table[1:]), 1)
+
+    def test_tailles_differentes(self):
+        with self.assertRaises(ValueError):
+            PersonneTable(["A"], [1, 2], [1.0], [1.0], [1.0], [1.0], [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
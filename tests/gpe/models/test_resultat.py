@@ -0,0 +1,77 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from src.gpe.models.personne import Personne
+from src.gpe.models.resultat import ResultatEpargne, ResultatsEpargne, VueResultatEpargne
+
+resultats_liste = [
+    ResultatEpargne("Livret A", 25, 9000.0, 22950.0, 9500.0, False, 600.0, 500.0),
+    ResultatEpargne("PEA", 50, 18000.0, None, 21000.0, True, 3500.0, 3000.0),
+    ResultatEpargne("LDDS", 100, 36000.0, 12000.0, 38000.0, True, 2000.0, 2000.0),
+    ResultatEpargne("Livret A", 100, 36000.0, 22950.0, 21000.0, True, 2500.0, 2500.0),
+]
+
+
+def sortie(fonction):
+    tampon = io.StringIO()
+    with redirect_stdout(tampon):
+        fonction()
+    return tampon.getvalue()
+
+
+class TestResultatsEpargne(unittest.TestCase):
+
+    def setUp(self):
+        self.resultats = ResultatsEpargne.depuis_liste(resultats_liste)
+
+    def test_vue_identique_au_resultat(self):
+        self.assertEqual(len(self.resultats), len(resultats_liste))
+        for vue, resultat in zip(self.resultats, resultats_liste):
+            self.assertIsInstance(vue, VueResultatEpargne)
+            self.assertEqual(sortie(vue.afficher), sortie(resultat.afficher))
+            self.assertEqual(vue.versement_max_epargne, resultat.versement_max_epargne)
+        self.assertEqual(str(self.resultats[0]), str(resultats_liste[0]))
+        self.assertEqual(str(self.resultats[-1]), str(resultats_liste[-1]))
+
+    def test_filtrer_et_trier(self):
+        attendus = sorted([r for r in resultats_liste if r.objectif_atteint], key=lambda r: r.montant_net_final, reverse=True)
+        obtenus = self.resultats.filtrer_objectif_atteint().trier_par("montant_net_final", decroissant=True)
+        self.assertEqual([r.nom_produit_epargne for r in obtenus], [r.nom_produit_epargne for r in attendus])
+
+    def test_grouper_par_personne(self):
+        self.resultats.colonnes["indice_personne"] = [2, 0, 2, 0]
+        self.resultats = ResultatsEpargne(self.resultats.colonnes)
+        groupes = self.resultats.grouper_par_personne(3)
+        self.assertEqual([len(g) for g in groupes], [2, 0, 2])
+        self.assertEqual(list(groupes[0]["nom_produit_epargne"]), ["PEA", "Livret A"])
+
+    def test_to_dataframe(self):
+        df = self.resultats.to_dataframe()
+        self.assertEqual(len(df), len(resultats_liste))
+        self.assertEqual(df["nom_produit_epargne"].dtype, "category")
+        self.assertEqual(df["objectif_atteint"].dtype, bool)
+        self.assertEqual(df["montant_net_final"].dtype, "float64")
+        self.assertTrue(df["versement_max_epargne"].isna().iloc[1])
+
+    def test_to_dataframe_avec_personnes(self):
+        self.resultats.colonnes["indice_personne"] = np.array([1, 1, 0, 0])
+        df = self.resultats.to_dataframe(personnes=[Personne("Alice", 22, 21000, 400, 300, 1000, 10), Personne("Bob", 35, 32000, 800, 500, 1000, 10)])
+        self.assertEqual(list(df["nom_personne"]), ["Bob", "Bob", "Alice", "Alice"])
+        with self.assertRaises(ValueError):
+            ResultatsEpargne.depuis_liste(resultats_liste).to_dataframe(personnes=[])
+
+    def test_to_dataframe_unitaire(self):
+        df = resultats_liste[0].to_dataframe()
+        self.assertEqual(len(df), 1)
+        self.assertEqual(df["montant_net_final"].iloc[0], 9500.0)
+
+    def test_colonnes_manquantes(self):
+        with self.assertRaises(ValueError):
+            ResultatsEpargne({"montant_net_final": [1.0]})
+
+
+if __name__ == '__main__':
+    unittest.main()
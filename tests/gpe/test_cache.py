@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.gpe.cache import CacheImports
+from src.gpe.core import import_personnes
+
+CSV_PERSONNES = (
+    "nom,age,revenu_annuel,loyer,depenses_mensuelles,objectif,duree\n"
+    "Alice,22,21000,400,300,186000.0,36\n"
+)
+
+
+class TestCacheImports(unittest.TestCase):
+
+    def setUp(self):
+        self.temporaire = tempfile.TemporaryDirectory()
+        self.dossier = Path(self.temporaire.name)
+        self.fichier = self.dossier / "personnes.csv"
+        self.fichier.write_text(CSV_PERSONNES)
+        self.cache = CacheImports(str(self.dossier / "cache"))
+
+    def tearDown(self):
+        self.temporaire.cleanup()
+
+    def test_succes_puis_invalidation(self):
+        premier = import_personnes(str(self.fichier), cache=self.cache)
+        second = import_personnes(str(self.fichier), cache=self.cache)
+        self.assertEqual((self.cache.succes, self.cache.echecs), (1, 1))
+        self.assertEqual([repr(p) for p in premier], [repr(p) for p in second])
+
+        self.fichier.write_text(CSV_PERSONNES + "Bob,35,32000,800,500,104000.0,6\n")
+        personnes = import_personnes(str(self.fichier), cache=self.cache)
+        self.assertEqual(len(personnes), 2)
+        self.assertEqual(self.cache.echecs, 2)
+
+    def test_date_modifiee_sans_changement_de_contenu(self):
+        import_personnes(str(self.fichier), cache=self.cache)
+        os.utime(self.fichier, (1, 1))
+        import_personnes(str(self.fichier), cache=self.cache)
+        self.assertEqual((self.cache.succes, self.cache.echecs), (1, 1))
+
+    def test_meme_contenu_autre_extension(self):
+        # Le même contenu lu en .txt (séparé par des tabulations) ne doit pas reprendre l'entrée du .csv
+        texte = self.dossier / "personnes.txt"
+        texte.write_text(CSV_PERSONNES)
+        self.cache.charger(str(self.fichier), "a", lambda f: pd.DataFrame({"x": [1.0]}))
+        df = self.cache.charger(str(texte), "a", lambda f: pd.DataFrame({"x": [2.0]}))
+        self.assertEqual(df["x"].tolist(), [2.0])
+        self.assertEqual((self.cache.succes, self.cache.echecs), (0, 2))
+
+    def test_eviction_lru(self):
+        charger = lambda f: pd.DataFrame({"a": [1.0, 2.0]})
+        mesure = CacheImports(str(self.dossier / "mesure"))
+        mesure.charger(str(self.fichier), "a", charger)
+        taille_entree = sum(f.stat().st_size for p in (self.dossier / "mesure").iterdir() if p.is_dir() for f in p.iterdir())
+
+        cache = CacheImports(str(self.dossier / "lru"), taille_max=2 * taille_entree)
+        cache.charger(str(self.fichier), "a", charger)
+        cache.charger(str(self.fichier), "b", charger)
+        cache.charger(str(self.fichier), "a", charger)
+        cache.charger(str(self.fichier), "c", charger)
+        entrees = sorted(p.name.split("-")[0] for p in (self.dossier / "lru").iterdir() if p.is_dir())
+        self.assertEqual(entrees, ["a", "c"])
+        self.assertEqual((cache.succes, cache.echecs), (1, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,299 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.gpe.core import (import_personnes, import_epargnes, iter_personnes, suggestion_epargne, suggestion_epargne_batch,
+                          suggestion_epargne_flux, effort_minimal_batch, allocation_optimale_batch, LigneRejetee)
+from src.gpe.models.epargne import Epargne, EpargneIndex
+from src.gpe.models.personne import PersonneTable
+from src.gpe.utils import calcul_interets_composes
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+class TestSuggestionEpargneBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        cls.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+
+    def test_identique_a_suggestion_epargne(self):
+        attendus = [
+            (i, r)
+            for i, personne in enumerate(self.personnes)
+            for r in suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne)
+        ]
+        batch = suggestion_epargne_batch(self.personnes, self.epargnes)
+
+        self.assertEqual(len(batch["montant_net_final"]), len(attendus))
+        for ligne, (indice, resultat) in enumerate(attendus):
+            self.assertEqual(batch["indice_personne"][ligne], indice)
+            self.assertEqual(batch["nom_produit_epargne"][ligne], resultat.nom_produit_epargne)
+            self.assertEqual(batch["effort_mensuel"][ligne], resultat.effort_mensuel)
+            self.assertEqual(batch["total_versement"][ligne], resultat.total_versement)
+            self.assertEqual(batch["montant_net_final"][ligne], resultat.montant_net_final)
+            self.assertEqual(batch["objectif_atteint"][ligne], resultat.objectif_atteint)
+            self.assertEqual(batch["interet_brut"][ligne], resultat.interet_brut)
+            self.assertEqual(batch["interet_net"][ligne], resultat.interet_net)
+            if resultat.versement_max_epargne is None:
+                self.assertTrue(np.isnan(batch["versement_max_epargne"][ligne]))
+            else:
+                self.assertEqual(batch["versement_max_epargne"][ligne], resultat.versement_max_epargne)
+
+    def test_catalogue_indexe(self):
+        index = EpargneIndex(self.epargnes)
+        for personne in self.personnes:
+            attendus = suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne)
+            obtenus = suggestion_epargne(personne, index, personne.objectif, personne.duree_epargne)
+            self.assertEqual([str(r.__dict__) for r in obtenus], [str(r.__dict__) for r in attendus])
+        np.testing.assert_array_equal(suggestion_epargne_batch(self.personnes, index)["montant_net_final"],
+                                      suggestion_epargne_batch(self.personnes, self.epargnes)["montant_net_final"])
+
+    def test_catalogue_indexe_ecarte_les_produits_inaccessibles(self):
+        # Un produit hors d'atteinte de toutes les durées, en tête de catalogue, décale tous les indices
+        epargnes = [Epargne("Long terme", 0.05, 0.3, 100, None)] + self.epargnes
+        index = EpargneIndex(epargnes)
+        self.assertNotIn(0, index.indices_eligibles(max(p.duree_epargne for p in self.personnes)))
+        for top_k in (None, 2):
+            attendu = suggestion_epargne_batch(self.personnes, epargnes, top_k=top_k)
+            obtenu = suggestion_epargne_batch(self.personnes, index, top_k=top_k)
+            for col, valeurs in attendu.colonnes.items():
+                np.testing.assert_array_equal(obtenu[col], valeurs, err_msg=col)
+
+        blocs = [self.personnes[:10], self.personnes[10:]]
+        for (_, obtenu), bloc in zip(suggestion_epargne_flux(blocs, epargnes), blocs):
+            np.testing.assert_array_equal(obtenu["indice_epargne"],
+                                          suggestion_epargne_batch(bloc, epargnes)["indice_epargne"])
+
+    def test_personne_table(self):
+        attendu = suggestion_epargne_batch(self.personnes, self.epargnes)
+        resultats = suggestion_epargne_batch(PersonneTable.depuis_personnes(self.personnes), self.epargnes)
+        for col, valeurs in attendu.colonnes.items():
+            np.testing.assert_array_equal(resultats[col], valeurs)
+
+    def test_top_k(self):
+        for k in (1, 3, 1000):
+            batch = suggestion_epargne_batch(self.personnes, self.epargnes, top_k=k)
+            lignes = batch.grouper_par_personne(len(self.personnes))
+            for personne, obtenus in zip(self.personnes, lignes):
+                tous = suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne)
+                attendus = sorted((r for r in tous if r.objectif_atteint),
+                                  key=lambda r: r.montant_net_final, reverse=True)[:k]
+                scalaires = suggestion_epargne(personne, self.epargnes, personne.objectif,
+                                               personne.duree_epargne, top_k=k)
+                self.assertEqual([str(r.__dict__) for r in scalaires], [str(r.__dict__) for r in attendus])
+                self.assertEqual([(r.nom_produit_epargne, r.effort_mensuel, r.montant_net_final) for r in obtenus],
+                                 [(r.nom_produit_epargne, r.effort_mensuel, r.montant_net_final) for r in attendus])
+
+    def test_top_k_invalide(self):
+        with self.assertRaises(ValueError):
+            suggestion_epargne_batch(self.personnes, self.epargnes, top_k=0)
+        personne = self.personnes[0]
+        with self.assertRaises(ValueError):
+            suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne, top_k=-1)
+
+    def test_listes_vides(self):
+        batch = suggestion_epargne_batch([], self.epargnes)
+        self.assertEqual(len(batch["montant_net_final"]), 0)
+        batch = suggestion_epargne_batch(self.personnes, [])
+        self.assertEqual(len(batch["montant_net_final"]), 0)
+
+    def test_listes_vides_top_k(self):
+        self.assertEqual(len(suggestion_epargne_batch([], self.epargnes, top_k=3)), 0)
+        self.assertEqual(len(suggestion_epargne_batch(self.personnes, [], top_k=3)), 0)
+        blocs = list(suggestion_epargne_flux([[], self.personnes[:2]], self.epargnes, top_k=2))
+        self.assertEqual(len(blocs[0][1]), 0)
+        self.assertLessEqual(len(blocs[1][1]), 4)
+
+
+class TestEffortMinimalBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        cls.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        cls.efforts = effort_minimal_batch(cls.personnes, cls.epargnes)
+
+    def capital_net(self, versement_mensuel, epargne, duree):
+        versement_annuel = versement_mensuel * 12
+        total = versement_annuel * duree
+        capital_brut = calcul_interets_composes(versement_annuel, epargne.taux_interet, duree)
+        return (capital_brut - total) * (1 - epargne.fiscalite) + total
+
+    def test_versement_minimal(self):
+        self.assertGreater(len(self.efforts), 0)
+        for ligne in self.efforts.itertuples():
+            personne = self.personnes[ligne.indice_personne]
+            epargne = self.epargnes[ligne.indice_epargne]
+            self.assertGreaterEqual(ligne.montant_net_final, personne.objectif)
+            self.assertEqual(ligne.montant_net_final, self.capital_net(ligne.versement_mensuel_min, epargne, personne.duree_epargne))
+            self.assertLess(self.capital_net(ligne.versement_mensuel_min * (1 - 1e-9), epargne, personne.duree_epargne), personne.objectif)
+            self.assertGreaterEqual(personne.duree_epargne, epargne.duree_min)
+            if epargne.versement_max is not None:
+                self.assertLessEqual(ligne.total_versement, epargne.versement_max)
+
+    def test_coherent_avec_les_scenarios(self):
+        minimaux = {(l.indice_personne, l.indice_epargne): l.versement_mensuel_min for l in self.efforts.itertuples()}
+        noms = [e.nom for e in self.epargnes]
+        for i, personne in enumerate(self.personnes):
+            for resultat in suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne):
+                if resultat.objectif_atteint:
+                    cle = (i, noms.index(resultat.nom_produit_epargne))
+                    self.assertIn(cle, minimaux)
+                    self.assertGreaterEqual(resultat.total_versement / (12 * personne.duree_epargne), minimaux[cle] * (1 - 1e-12))
+
+
+class TestAllocationOptimaleBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        # Sans la SCPI, sans plafond et la plus rentable, les plafonds des livrets sont atteints
+        cls.epargnes = [e for e in import_epargnes(str(DATA_DIR / "epargnes.csv")) if e.versement_max is not None]
+
+    def rendements(self, personne):
+        n = personne.duree_epargne
+        return [n + (calcul_interets_composes(1.0, e.taux_interet, n) - n) * (1 - e.fiscalite) for e in self.epargnes]
+
+    def test_identique_au_remplissage_produit_par_produit(self):
+        allocation = allocation_optimale_batch(self.personnes, self.epargnes)
+        self.assertGreater(allocation.groupby("indice_personne").size().max(), 1)
+        for i, personne in enumerate(self.personnes):
+            reste = max(personne._calcul_capacite_epargne(), 0) * 12
+            attendu = []
+            rendements = self.rendements(personne)
+            for j in sorted(range(len(self.epargnes)), key=lambda j: -rendements[j]):
+                epargne = self.epargnes[j]
+                if personne.duree_epargne < (epargne.duree_min or 0) or reste <= 0:
+                    continue
+                part = min(reste, epargne.versement_max / personne.duree_epargne)
+                attendu.append((j, part / 12))
+                reste -= part
+            lignes = allocation[allocation["indice_personne"] == i]
+            self.assertAlmostEqual(lignes["non_place_mensuel"].iloc[0], max(reste, 0) / 12, delta=1e-6)
+            lignes = lignes[lignes["indice_epargne"] >= 0]
+            self.assertEqual(lignes["indice_epargne"].tolist(), [j for j, _ in attendu])
+            np.testing.assert_allclose(lignes["versement_mensuel"], [v for _, v in attendu], rtol=1e-12)
+
+    def test_meilleure_que_toute_repartition_realisable(self):
+        allocation = allocation_optimale_batch(self.personnes, self.epargnes)
+        totaux = allocation.groupby("indice_personne")["capital_net_total"].first()
+        rng = np.random.default_rng(0)
+        for i, personne in enumerate(self.personnes):
+            rendements = np.array(self.rendements(personne))
+            plafonds = np.array([e.versement_max / personne.duree_epargne
+                                 if personne.duree_epargne >= (e.duree_min or 0) else 0.0 for e in self.epargnes])
+            capacite = max(personne._calcul_capacite_epargne(), 0) * 12
+            for _ in range(50):
+                parts = rng.dirichlet(np.ones(len(self.epargnes))) * capacite
+                parts = np.minimum(parts, plafonds)
+                self.assertLessEqual(parts @ rendements, totaux[i] * (1 + 1e-12))
+
+    def test_une_ligne_par_personne_sans_allocation(self):
+        versements = np.full(len(self.personnes), 100.0)
+        versements[[1, 4]] = 0.0
+        allocation = allocation_optimale_batch(self.personnes, self.epargnes, versement_mensuel=versements)
+        self.assertEqual(sorted(set(allocation["indice_personne"])), list(range(len(self.personnes))))
+        self.assertTrue(allocation["indice_personne"].is_monotonic_increasing)
+        sans_produit = allocation[allocation["indice_epargne"] == -1]
+        self.assertEqual(sans_produit["indice_personne"].tolist(), [1, 4])
+        self.assertTrue(sans_produit["nom_produit_epargne"].isna().all())
+        self.assertFalse(sans_produit["objectif_atteint"].any())
+        self.assertTrue((sans_produit[["versement_mensuel", "montant_net_final", "capital_net_total"]] == 0).all().all())
+
+        # Sans aucun produit, tout le versement reste à placer
+        allocation = allocation_optimale_batch(self.personnes, [], versement_mensuel=versements)
+        self.assertEqual(allocation["indice_personne"].tolist(), list(range(len(self.personnes))))
+        np.testing.assert_array_equal(allocation["non_place_mensuel"], versements)
+
+    def test_un_seul_produit_comme_suggestion_epargne(self):
+        epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        allocation = allocation_optimale_batch(self.personnes, epargnes)
+        batch = suggestion_epargne_batch(self.personnes, epargnes)
+        plein = (batch["effort_mensuel"] == 100) & (batch["indice_epargne"] == len(epargnes) - 1)
+        attendus = dict(zip(batch["indice_personne"][plein], batch["montant_net_final"][plein]))
+        self.assertTrue(allocation["indice_epargne"].isin([len(epargnes) - 1, -1]).all())
+        for _, ligne in allocation[allocation["indice_epargne"] >= 0].iterrows():
+            if ligne["indice_personne"] in attendus:
+                self.assertEqual(ligne["montant_net_final"], attendus[ligne["indice_personne"]])
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_personnes_rejets(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            fichier = Path(dossier) / "personnes.csv"
+            fichier.write_text(
+                "nom,age,revenu_annuel,loyer,depenses_mensuelles,objectif,duree\n"
+                "Alice,22,21000,400,300,186000.0,36\n"
+                "Bob,,32000,800,None,104000.0,6\n"
+                "Claire,28,28000,750,700,139000.0,6\n"
+                "Denis,,30000,700,600,50000.0,10\n"
+            )
+            rejets = []
+            personnes = import_personnes(str(fichier), rejets)
+
+        # L'âge n'intervient pas dans le calcul : une personne sans âge est gardée
+        self.assertEqual([p.nom for p in personnes], ["Alice", "Claire", "Denis"])
+        self.assertEqual(personnes[0].versement_mensuel_utilisateur, 0)
+        self.assertEqual(rejets, [LigneRejetee(ligne=3, motif="Valeurs manquantes: ['depenses_mensuelles']")])
+
+    def test_import_epargnes_versement_max_absent(self):
+        epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        self.assertTrue(any(e.versement_max is None for e in epargnes))
+        self.assertTrue(all(e.versement_max is None or e.versement_max > 0 for e in epargnes))
+
+    def test_import_epargnes_volatilite_facultative(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            fichier = Path(dossier) / "epargnes.csv"
+            fichier.write_text("nom,taux_interet,fiscalite,duree_min,versement_max\nLivret A,0.024,0.0,0,22950\n")
+            sans_volatilite = import_epargnes(str(fichier))
+            fichier.write_text("nom,taux_interet,fiscalite,duree_min,versement_max,volatilite\n"
+                               "Livret A,0.024,0.0,0,22950,0.005\nLDDS,0.024,0.0,0,12000,None\n")
+            avec_volatilite = import_epargnes(str(fichier))
+
+        self.assertEqual(sans_volatilite[0].volatilite, 0.0)
+        self.assertEqual([e.volatilite for e in avec_volatilite], [0.005, 0.0])
+
+
+class TestImportEnFlux(unittest.TestCase):
+
+    def test_blocs_identiques_a_import_personnes(self):
+        for fichier in ("personnes.csv", "personnes.txt"):
+            personnes = import_personnes(str(DATA_DIR / fichier))
+            blocs = list(iter_personnes(str(DATA_DIR / fichier), taille_bloc=7))
+            self.assertTrue(all(len(bloc) <= 7 for bloc in blocs))
+            self.assertEqual([repr(p) for bloc in blocs for p in bloc], [repr(p) for p in personnes])
+
+    def test_numeros_de_ligne_des_rejets(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            fichier = Path(dossier) / "personnes.csv"
+            lignes = ["nom,age,revenu_annuel,loyer,depenses_mensuelles,objectif,duree"]
+            lignes += [f"P{i},30,30000,500,500,10000,{'' if i == 4 else 10}" for i in range(6)]
+            fichier.write_text("\n".join(lignes) + "\n")
+            rejets = []
+            blocs = list(iter_personnes(str(fichier), taille_bloc=2, rejets=rejets))
+
+        self.assertEqual([len(bloc) for bloc in blocs], [2, 2, 1])
+        self.assertEqual([r.ligne for r in rejets], [6])
+
+    def test_suggestion_epargne_flux(self):
+        epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        complet = suggestion_epargne_batch(personnes, epargnes)
+        montants = [
+            resultats["montant_net_final"]
+            for _, resultats in suggestion_epargne_flux(iter_personnes(str(DATA_DIR / "personnes.csv"), 10), epargnes)
+        ]
+        np.testing.assert_array_equal(np.concatenate(montants), complet["montant_net_final"])
+
+    def test_taille_bloc_invalide(self):
+        with self.assertRaises(ValueError):
+            next(iter_personnes(str(DATA_DIR / "personnes.csv"), taille_bloc=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
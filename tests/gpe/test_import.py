@@ -0,0 +1,63 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parents[2]
+
+# Temps d'import cumulé maximal de src.gpe.core, très au-dessus de la mesure habituelle
+# (numpy seul) pour ne signaler que les régressions grossières
+BUDGET_IMPORT_CORE_US = 2_000_000
+
+
+def temps_import(instructions: str) -> dict:
+    """
+    Exécute instructions dans un nouvel interpréteur avec -X importtime.
+
+    Returns:
+        dict: Temps d'import cumulé en microsecondes de chaque module importé
+    """
+    sortie = subprocess.run([sys.executable, "-X", "importtime", "-c", instructions], cwd=RACINE,
+                            capture_output=True, text=True, check=True)
+    temps = {}
+    for ligne in sortie.stderr.splitlines():
+        if not ligne.startswith("import time:") or "cumulative" in ligne:
+            continue
+        _, cumule, module = ligne[len("import time:"):].split("|")
+        temps[module.strip()] = int(cumule)
+    return temps
+
+
+class TestImportSansPandas(unittest.TestCase):
+
+    def test_modeles_et_calcul_sans_pandas(self):
+        temps = temps_import(
+            "import src.gpe.models.personne, src.gpe.models.epargne, src.gpe.models.resultat\n"
+            "from src.gpe.utils import calcul_interets_composes\n"
+            "calcul_interets_composes(1200.0, 0.03, 10)"
+        )
+        self.assertIn("src.gpe.models.resultat", temps)
+        self.assertNotIn("pandas", temps)
+
+    def test_core_sans_pandas_ni_logging_configure(self):
+        temps = temps_import(
+            "import logging, sys\n"
+            "import src.gpe.core, src.gpe.rapport, src.gpe.parallele\n"
+            "assert not logging.getLogger().handlers, 'logging configuré à l import'\n"
+        )
+        self.assertNotIn("pandas", temps)
+        self.assertLess(temps["src.gpe.core"], BUDGET_IMPORT_CORE_US)
+
+    def test_pandas_charge_a_la_lecture(self):
+        sortie = subprocess.run(
+            [sys.executable, "-c",
+             "import sys\n"
+             "from src.gpe.core import import_epargnes\n"
+             "import_epargnes('src/gpe/data/epargnes.csv')\n"
+             "print('pandas' in sys.modules)"],
+            cwd=RACINE, capture_output=True, text=True, check=True)
+        self.assertEqual(sortie.stdout.strip(), "True")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne_batch
+from src.gpe import incremental
+from src.gpe.incremental import suggestion_epargne_incrementale, SEGMENTS_MAX
+from src.gpe.stockage import lire_colonnes
+from src.gpe.models.epargne import Epargne
+from src.gpe.models.personne import Personne
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+class TestSuggestionEpargneIncrementale(unittest.TestCase):
+
+    def setUp(self):
+        self.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        self.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        self.temporaire = tempfile.TemporaryDirectory()
+        self.dossier = self.temporaire.name
+
+    def tearDown(self):
+        self.temporaire.cleanup()
+
+    def verifier_identique(self, personnes, epargnes):
+        resultats = suggestion_epargne_incrementale(personnes, epargnes, self.dossier)
+        attendu = suggestion_epargne_batch(personnes, epargnes)
+        self.assertEqual(len(resultats), len(attendu))
+        for col, valeurs in attendu.colonnes.items():
+            np.testing.assert_array_equal(resultats[col], valeurs, err_msg=col)
+
+    def test_modifications_successives(self):
+        self.verifier_identique(self.personnes, self.epargnes)
+
+        # Sans changement, tout est repris
+        self.verifier_identique(self.personnes, self.epargnes)
+
+        # Une personne modifiée, une supprimée, une ajoutée
+        personnes = list(self.personnes)
+        p = personnes[3]
+        personnes[3] = Personne(p.nom, p.age, p.revenu_annuel + 6000, p.loyer, p.depenses_mensuelles, p.objectif,
+                                p.duree_epargne, p.versement_mensuel_utilisateur)
+        del personnes[7]
+        personnes.insert(0, Personne("Yann", 30, 40000.0, 700.0, 600.0, 50000.0, 8, 200.0))
+        self.verifier_identique(personnes, self.epargnes)
+
+        # Révision du taux d'un produit et retrait d'un autre
+        epargnes = list(self.epargnes)
+        e = epargnes[0]
+        epargnes[0] = Epargne(e.nom, e.taux_interet + 0.005, e.fiscalite, e.duree_min, e.versement_max)
+        del epargnes[5]
+        self.verifier_identique(personnes, epargnes)
+
+    def modifier(self, personnes, i, revenu_en_plus):
+        p = personnes[i]
+        personnes = list(personnes)
+        personnes[i] = Personne(p.nom, p.age, p.revenu_annuel + revenu_en_plus, p.loyer, p.depenses_mensuelles,
+                                p.objectif, p.duree_epargne, p.versement_mensuel_utilisateur)
+        return personnes
+
+    def index(self) -> dict:
+        with open(Path(self.dossier) / incremental.FICHIER_INDEX, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_seuls_les_resultats_recalcules_sont_ecrits(self):
+        self.verifier_identique(self.personnes, self.epargnes)
+        self.verifier_identique(self.personnes, self.epargnes)
+        self.assertEqual(len(self.index()["segments"]), 1)
+
+        personnes = self.modifier(self.personnes, 3, 6000)
+        self.verifier_identique(personnes, self.epargnes)
+        segment = self.index()["segments"][-1]
+        self.assertEqual(segment["personnes"], [personnes[3].nom])
+        ecrits = lire_colonnes(str(Path(self.dossier) / segment["dossier"]))
+        self.assertEqual(set(ecrits["nom_personne"]), {personnes[3].nom})
+
+        # Au-delà de SEGMENTS_MAX segments, tout est fusionné et les anciens dossiers supprimés
+        for i in range(SEGMENTS_MAX):
+            personnes = self.modifier(personnes, i, 100)
+            self.verifier_identique(personnes, self.epargnes)
+        index = self.index()
+        self.assertLessEqual(len(index["segments"]), SEGMENTS_MAX)
+        dossiers = {index["personnes"], index["epargnes"]} | {s["dossier"] for s in index["segments"] if s["dossier"]}
+        presents = {f"{d.parent.name}/{d.name}" if d.parent.name == incremental.DOSSIER_RESULTATS else d.name
+                    for d in Path(self.dossier).glob("**/*.colonnes")}
+        self.assertEqual(presents, dossiers)
+
+    def test_passage_interrompu(self):
+        self.verifier_identique(self.personnes, self.epargnes)
+        personnes = self.modifier(self.personnes, 2, 5000)
+        with mock.patch.object(incremental, "_valider", side_effect=OSError("disque plein")):
+            with self.assertRaises(OSError):
+                suggestion_epargne_incrementale(personnes, self.epargnes, self.dossier)
+        # Le passage précédent est intact : le retour aux données d'origine est bien recalculé
+        self.verifier_identique(self.personnes, self.epargnes)
+        self.verifier_identique(personnes, self.epargnes)
+
+    def test_noms_en_double(self):
+        with self.assertRaises(ValueError):
+            suggestion_epargne_incrementale(self.personnes + self.personnes[:1], self.epargnes, self.dossier)
+
+
+if __name__ == '__main__':
+    unittest.main()
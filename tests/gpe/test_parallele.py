@@ -0,0 +1,42 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne_batch
+from src.gpe.parallele import suggestion_epargne_parallele
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+class TestSuggestionEpargneParallele(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        cls.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        cls.attendu = suggestion_epargne_batch(cls.personnes, cls.epargnes)
+
+    def verifier_identique(self, resultats):
+        self.assertEqual(resultats.colonnes.keys(), self.attendu.colonnes.keys())
+        for col, valeurs in self.attendu.colonnes.items():
+            np.testing.assert_array_equal(resultats[col], valeurs, err_msg=col)
+
+    def test_plusieurs_processus(self):
+        self.verifier_identique(suggestion_epargne_parallele(self.personnes, self.epargnes, nb_processus=2, taille_bloc=7))
+
+    def test_un_seul_processus(self):
+        self.verifier_identique(suggestion_epargne_parallele(self.personnes, self.epargnes, nb_processus=1, taille_bloc=4))
+
+    def test_sans_personne(self):
+        self.assertEqual(len(suggestion_epargne_parallele([], self.epargnes, nb_processus=2)), 0)
+
+    def test_parametres_invalides(self):
+        with self.assertRaises(ValueError):
+            suggestion_epargne_parallele(self.personnes, self.epargnes, nb_processus=0)
+        with self.assertRaises(ValueError):
+            suggestion_epargne_parallele(self.personnes, self.epargnes, taille_bloc=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from pathlib import Path
+
+from src.gpe import profilage
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne_batch
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+class TestProfilage(unittest.TestCase):
+
+    def tearDown(self):
+        profilage.desactiver()
+        profilage.reinitialiser()
+
+    def test_inactif_par_defaut(self):
+        self.assertFalse(profilage.est_actif())
+        import_personnes(str(DATA_DIR / "personnes.csv"))
+        with profilage.etape("essai"):
+            pass
+        profilage.compter("essai")
+        self.assertEqual(profilage.mesures()["etapes"], {})
+        self.assertEqual(profilage.mesures()["compteurs"], {})
+
+    def test_etapes_et_compteurs(self):
+        profilage.activer()
+        personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        resultats = suggestion_epargne_batch(personnes, epargnes)
+
+        mesures = profilage.mesures()
+        for nom in ("import_personnes", "import_personnes.lecture", "import_personnes.nettoyage",
+                    "import_personnes.construction", "import_epargnes", "import_epargnes.lecture", "suggestion"):
+            self.assertIn(nom, mesures["etapes"])
+        self.assertEqual(mesures["etapes"]["import_personnes.lecture"]["appels"], 1)
+        self.assertNotIn("lecture", mesures["etapes"])
+        self.assertEqual(mesures["compteurs"]["personnes_importees"], len(personnes))
+        self.assertEqual(mesures["compteurs"]["epargnes_importees"], len(epargnes))
+        self.assertEqual(mesures["compteurs"]["resultats_produits"], len(resultats))
+        self.assertIn("suggestion", profilage.rapport_etapes())
+
+    def test_sous_etapes_non_doublees(self):
+        profilage.activer()
+        with profilage.etape("import"):
+            with profilage.etape("lecture"):
+                with profilage.etape("lecture"):
+                    pass
+        with profilage.etape("lecture"):
+            pass
+
+        etapes = profilage.mesures()["etapes"]
+        self.assertEqual(set(etapes), {"import", "import.lecture", "lecture"})
+        self.assertEqual(etapes["import.lecture"]["appels"], 1)
+        self.assertLessEqual(etapes["import.lecture"]["temps_s"], etapes["import"]["temps_s"])
+        premier_niveau = sum(m["temps_s"] for nom, m in etapes.items() if "." not in nom)
+        self.assertLessEqual(premier_niveau, profilage.mesures()["total_s"])
+        lignes = profilage.rapport_etapes().splitlines()
+        self.assertTrue(lignes[1].startswith("import "))
+        self.assertTrue(lignes[2].startswith("  lecture "))
+        self.assertTrue(lignes[3].startswith("lecture "))
+
+    def test_chronometre_rend_le_resultat(self):
+        @profilage.chronometre("double")
+        def double(x):
+            return 2 * x
+
+        self.assertEqual(double(2), 4)
+        profilage.activer()
+        self.assertEqual(double(3), 6)
+        self.assertEqual(profilage.mesures()["etapes"]["double"]["appels"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
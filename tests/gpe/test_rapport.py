@@ -0,0 +1,116 @@
+import contextlib
+import gzip
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from src.gpe import rapport
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne_batch
+from src.gpe.rapport import EcrivainRapport, ecrire_rapport
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+def rapport_ligne_par_ligne(personnes, resultats) -> str:
+    # Rapport d'origine : un print par ligne d'en-tête et par résultat
+    sortie = io.StringIO()
+    with contextlib.redirect_stdout(sortie):
+        resultats_par_personne = resultats.grouper_par_personne(len(personnes))
+        for personne, resultats_personne in zip(personnes, resultats_par_personne):
+            print("\n" + "=" * 120)
+            print(f"Suggestions d'épargne pour {personne.nom}:")
+            print(f"Âge: {personne.age} ans")
+            print(f"Revenu annuel: {personne.revenu_annuel:.2f} €")
+            print(f"Capacité d'épargne mensuelle: {personne._calcul_capacite_epargne():.2f} €")
+            print(f"Objectif: {personne.objectif:.2f} €")
+            print(f"Durée d'épargne: {personne.duree_epargne} ans")
+            print("-" * 120)
+            if not len(resultats_personne):
+                print("Aucune suggestion d'épargne disponible pour cette personne.")
+                continue
+            print(f"{'Produit':<45} {'Effort mensuel':>15} {'Capital final':>15} {'Intérêts bruts':>15} {'Intérêts nets':>15} {'Versement total':>15} {'Versement max épargne':>15}")
+            print("-" * 120)
+            atteints = [r for r in resultats_personne if r.objectif_atteint]
+            for resultat in sorted(atteints, key=lambda r: r.montant_net_final, reverse=True):
+                resultat.afficher()
+    return sortie.getvalue()
+
+
+class TestRapport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        cls.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        cls.resultats = suggestion_epargne_batch(cls.personnes, cls.epargnes)
+
+    def test_texte_identique_a_l_affichage(self):
+        sortie = io.StringIO()
+        ecrire_rapport(self.personnes, self.resultats, sortie)
+        self.assertEqual(sortie.getvalue(), rapport_ligne_par_ligne(self.personnes, self.resultats))
+
+    def test_par_blocs_et_gzip(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "rapport.txt.gz"
+            with EcrivainRapport(str(chemin)) as ecrivain:
+                for debut in range(0, len(self.personnes), 7):
+                    bloc = self.personnes[debut:debut + 7]
+                    ecrivain.ecrire(bloc, suggestion_epargne_batch(bloc, self.epargnes))
+            with gzip.open(chemin, "rt", encoding="utf-8") as f:
+                self.assertEqual(f.read(), rapport_ligne_par_ligne(self.personnes, self.resultats))
+
+    def test_csv_et_jsonl(self):
+        attendu = self.resultats.filtrer_objectif_atteint().trier_par("montant_net_final")
+        attendu = attendu.grouper_par_personne(len(self.personnes))
+        with tempfile.TemporaryDirectory() as dossier:
+            ecrire_rapport(self.personnes, self.resultats, str(Path(dossier) / "rapport.csv"))
+            ecrire_rapport(self.personnes, self.resultats, str(Path(dossier) / "rapport.jsonl"))
+            df = pd.read_csv(Path(dossier) / "rapport.csv")
+            with open(Path(dossier) / "rapport.jsonl", encoding="utf-8") as f:
+                lignes = [json.loads(ligne) for ligne in f]
+
+        noms = [p.nom for p, r in zip(self.personnes, attendu) for _ in range(len(r))]
+        produits = [produit for r in attendu for produit in r["nom_produit_epargne"]]
+        self.assertEqual(df["nom_personne"].tolist(), noms)
+        self.assertEqual(df["nom_produit_epargne"].tolist(), produits)
+        self.assertEqual([ligne["nom_personne"] for ligne in lignes], noms)
+        self.assertEqual([ligne["nom_produit_epargne"] for ligne in lignes], produits)
+        self.assertTrue(all(ligne["objectif_atteint"] for ligne in lignes))
+
+    def test_sous_blocs_identiques(self):
+        # Le formatage par sous-blocs de personnes ne change pas la sortie, quel que soit le découpage ;
+        # les 30 personnes tiennent en un seul sous-bloc avec la taille par défaut
+        for format in ("texte", "csv", "jsonl"):
+            attendu = io.StringIO()
+            ecrire_rapport(self.personnes, self.resultats, attendu, format=format)
+            for taille in (1, 4, 7):
+                with self.subTest(format=format, taille=taille):
+                    sortie = io.StringIO()
+                    with mock.patch.object(rapport, "TAILLE_BLOC_PERSONNES", taille):
+                        ecrire_rapport(self.personnes, self.resultats, sortie, format=format)
+                    self.assertEqual(sortie.getvalue(), attendu.getvalue())
+
+    def test_par_personne(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            ecrire_rapport(self.personnes, self.resultats, dossier, format="csv", par_personne=True)
+            fichiers = sorted(Path(dossier).iterdir())
+            self.assertEqual(len(fichiers), len(self.personnes))
+            self.assertEqual(fichiers[1].name, "000001_Bob.csv")
+            df = pd.read_csv(fichiers[1])
+            self.assertTrue((df["indice_personne"] == 1).all())
+            self.assertTrue(df["montant_net_final"].is_monotonic_decreasing)
+
+    def test_format_inconnu(self):
+        with self.assertRaises(ValueError):
+            EcrivainRapport("rapport.xlsx")
+        with self.assertRaises(ValueError):
+            EcrivainRapport(io.StringIO(), par_personne=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
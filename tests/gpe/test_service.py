@@ -0,0 +1,145 @@
+import asyncio
+import json
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne
+from src.gpe.models.personne import Personne
+from src.gpe.service import ClientTest, ServiceSuggestions, personne_depuis_json, RequeteInvalide
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+def personne_en_json(personne) -> dict:
+    return {champ: getattr(personne, champ) for champ in
+            ('nom', 'age', 'revenu_annuel', 'loyer', 'depenses_mensuelles', 'objectif', 'duree_epargne',
+             'versement_mensuel_utilisateur')}
+
+
+async def lire_reponse(lecteur: asyncio.StreamReader):
+    ligne_statut = await lecteur.readline()
+    entetes = {}
+    while (ligne := await lecteur.readline()) != b"\r\n":
+        nom, _, valeur = ligne.decode().partition(":")
+        entetes[nom.lower()] = valeur.strip()
+    return ligne_statut, json.loads(await lecteur.readexactly(int(entetes["content-length"])))
+
+
+class TestServiceSuggestions(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        self.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        self.service = ServiceSuggestions(self.epargnes, delai_lot=0.01)
+        self.client = ClientTest(self.service)
+
+    async def asyncTearDown(self):
+        await self.service.arreter()
+
+    async def test_requetes_concurrentes_regroupees(self):
+        reponses = await asyncio.gather(*(self.client.post('/suggestions', personne_en_json(p))
+                                          for p in self.personnes))
+        for personne, (statut, reponse) in zip(self.personnes, reponses):
+            self.assertEqual(statut, 200)
+            self.assertEqual(reponse["personne"], personne.nom)
+            attendus = suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne)
+            self.assertEqual([s["nom_produit_epargne"] for s in reponse["suggestions"]],
+                             [r.nom_produit_epargne for r in attendus])
+            np.testing.assert_array_equal([s["montant_net_final"] for s in reponse["suggestions"]],
+                                          [r.montant_net_final for r in attendus])
+
+        statut, metriques = await self.client.get('/metriques')
+        self.assertEqual(statut, 200)
+        self.assertEqual(metriques["requetes"], len(self.personnes))
+        self.assertLess(metriques["lots"], len(self.personnes))
+        self.assertGreater(metriques["taille_lot_max"], 1)
+        self.assertLessEqual(metriques["latence_p50_ms"], metriques["latence_p99_ms"])
+
+    async def test_taille_lot_max(self):
+        service = ServiceSuggestions(self.epargnes, delai_lot=0.01, taille_lot_max=2)
+        try:
+            await asyncio.gather(*(service.suggerer(p) for p in self.personnes))
+            self.assertEqual(service.metriques.taille_lot_max, 2)
+        finally:
+            await service.arreter()
+
+    async def test_erreurs(self):
+        statut, _ = await self.service.traiter('POST', '/suggestions', b"{pas du json")
+        self.assertEqual(statut, 400)
+        statut, reponse = await self.client.post('/suggestions', {"nom": "Alice", "age": 30})
+        self.assertEqual(statut, 400)
+        self.assertIn("objectif", reponse["erreur"])
+        self.assertEqual((await self.client.get('/suggestions'))[0], 405)
+        self.assertEqual((await self.client.get('/inconnue'))[0], 404)
+        self.assertEqual((await self.client.get('/metriques'))[1]["erreurs"], 2)
+
+    async def test_valeurs_non_finies_refusees(self):
+        valide = personne_en_json(self.personnes[0])
+        for corps in (json.dumps(dict(valide, objectif=float('nan'))).encode(),
+                      json.dumps(dict(valide, revenu_annuel=10 ** 400)).encode(),
+                      json.dumps(dict(valide, duree_epargne=1e6)).encode()):
+            statut, reponse = await self.service.traiter('POST', '/suggestions', corps)
+            self.assertEqual(statut, 400)
+            self.assertIn("erreur", reponse)
+
+    async def test_lot_en_echec_reevalue_une_a_une(self):
+        boucle = asyncio.get_running_loop()
+        fautive = Personne(nom="Fautive", age=30, revenu_annuel=10 ** 400, loyer=0, depenses_mensuelles=0,
+                           objectif=1000, duree_epargne=5)
+        lot = [(personne, boucle.create_future()) for personne in (self.personnes[0], fautive, self.personnes[1])]
+        with self.assertLogs('src.gpe.service', level='WARNING'):
+            self.service._evaluer_lot(lot)
+        self.assertIsInstance(lot[1][1].exception(), OverflowError)
+        for personne, futur in (lot[0], lot[2]):
+            attendus = suggestion_epargne(personne, self.epargnes, personne.objectif, personne.duree_epargne)
+            self.assertEqual(len(futur.result()), len(attendus))
+
+    async def test_serveur_http(self):
+        serveur = await self.service.demarrer('127.0.0.1', 0)
+        hote, port = serveur.sockets[0].getsockname()[:2]
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        try:
+            # Deux requêtes sur la même connexion, puis une longueur de corps invalide
+            attendus = ((json.dumps(personne_en_json(self.personnes[0])).encode(), b"200"), (b"[]", b"400"))
+            for corps, statut in attendus:
+                ecrivain.write(b"POST /suggestions HTTP/1.1\r\nHost: local\r\n"
+                               b"Content-Length: %d\r\n\r\n%s" % (len(corps), corps))
+                await ecrivain.drain()
+                ligne_statut, reponse = await lire_reponse(lecteur)
+                self.assertIn(statut, ligne_statut)
+            self.assertIn("erreur", reponse)
+
+            ecrivain.write(b"POST /suggestions HTTP/1.1\r\nHost: local\r\nContent-Length: abc\r\n\r\n")
+            await ecrivain.drain()
+            ligne_statut, reponse = await lire_reponse(lecteur)
+            self.assertIn(b"400", ligne_statut)
+            self.assertIn("Content-Length", reponse["erreur"])
+        finally:
+            ecrivain.close()
+            await ecrivain.wait_closed()
+
+
+class TestPersonneDepuisJson(unittest.TestCase):
+
+    def test_alias_de_duree(self):
+        personne = personne_depuis_json({"nom": "Bob", "age": 40, "revenu_annuel": 40000, "loyer": 800,
+                                         "depenses_mensuelles": 1200, "objectif": 10000, "duree": 5})
+        self.assertEqual(personne.duree_epargne, 5)
+        self.assertEqual(personne.versement_mensuel_utilisateur, 0)
+
+    def test_champ_non_numerique(self):
+        with self.assertRaises(RequeteInvalide):
+            personne_depuis_json({"nom": "Bob", "age": "40", "revenu_annuel": 40000, "loyer": 800,
+                                  "depenses_mensuelles": 1200, "objectif": 10000, "duree_epargne": 5})
+
+    def test_duree_hors_bornes(self):
+        for duree in (0, 2.5, 1e6):
+            with self.assertRaises(RequeteInvalide):
+                personne_depuis_json({"nom": "Bob", "age": 40, "revenu_annuel": 40000, "loyer": 800,
+                                      "depenses_mensuelles": 1200, "objectif": 10000, "duree_epargne": duree})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.gpe.core import import_personnes, import_epargnes, suggestion_epargne_batch
+from src.gpe.models.epargne import Epargne
+from src.gpe.simulation import simuler_trajectoires, simuler_resultats, ProjectionMonteCarlo, projection_monte_carlo
+from src.gpe.utils import calcul_interets_composes
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+
+def simuler_mois_par_mois(versement, taux, duree, capitalisation):
+    # Simulation de référence, un mois après l'autre
+    soldes, capital, courus = [0.0], 0.0, 0.0
+    for mois in range(1, duree + 1):
+        capital += versement
+        if capitalisation == "mensuelle":
+            capital *= 1 + taux / 12
+            soldes.append(capital)
+        else:
+            courus += capital * taux / 12
+            if mois % 12 == 0:
+                capital, courus = capital + courus, 0.0
+            soldes.append(capital + courus)
+    return np.array(soldes)
+
+
+class TestSimulerTrajectoires(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.versements = rng.uniform(10, 2000, 20)
+        self.taux = np.concatenate([[0.0, 1e-9], rng.uniform(0, 0.1, 18)])
+        self.durees = rng.integers(0, 200, 20)
+
+    def test_identique_a_la_simulation_mois_par_mois(self):
+        for capitalisation in ("mensuelle", "annuelle"):
+            trajectoires = simuler_trajectoires(self.versements, self.taux, self.durees, capitalisation)
+            self.assertEqual(trajectoires.shape, (20, self.durees.max() + 1))
+            for ligne, (v, t, n) in enumerate(zip(self.versements, self.taux, self.durees)):
+                attendu = simuler_mois_par_mois(v, t, n, capitalisation)
+                np.testing.assert_allclose(trajectoires[ligne, :n + 1], attendu, rtol=1e-9)
+                # Après la fin du plan, la valeur reste celle de fin de plan
+                np.testing.assert_array_equal(trajectoires[ligne, n:], trajectoires[ligne, n])
+
+    def test_valeurs_finales(self):
+        for capitalisation in ("mensuelle", "annuelle"):
+            trajectoires = simuler_trajectoires(self.versements, self.taux, self.durees, capitalisation, fiscalite=0.3)
+            finales = simuler_trajectoires(self.versements, self.taux, self.durees, capitalisation, fiscalite=0.3,
+                                           valeurs_finales=True)
+            np.testing.assert_allclose(finales, trajectoires[:, -1], rtol=1e-12)
+
+    def test_fiscalite_sur_les_interets(self):
+        brutes = simuler_trajectoires(100.0, 0.05, 120, valeurs_finales=True)
+        nettes = simuler_trajectoires(100.0, 0.05, 120, fiscalite=0.3, valeurs_finales=True)
+        np.testing.assert_allclose(nettes - 12_000, 0.7 * (brutes - 12_000))
+
+    def test_capitalisation_annuelle_sur_des_annees_entieres(self):
+        # Un an de versements mensuels au prorata : 12 v + 6.5 v t d'intérêts
+        self.assertAlmostEqual(simuler_trajectoires(100.0, 0.03, 12, "annuelle", valeurs_finales=True)[0],
+                               1200 + 6.5 * 100 * 0.03)
+
+    def test_arguments_invalides(self):
+        with self.assertRaises(ValueError):
+            simuler_trajectoires(100.0, 0.03, 12, capitalisation="trimestrielle")
+        with self.assertRaises(ValueError):
+            simuler_trajectoires(100.0, 0.03, 12, horizon=-1)
+
+
+class TestSimulerResultats(unittest.TestCase):
+
+    def test_resultats_de_suggestion(self):
+        personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        resultats = suggestion_epargne_batch(personnes, epargnes)
+
+        trajectoires = simuler_resultats(resultats, personnes, epargnes, nettes=False)
+        finales = simuler_resultats(resultats, personnes, epargnes, nettes=False, valeurs_finales=True)
+        self.assertEqual(trajectoires.shape[0], len(resultats))
+        np.testing.assert_allclose(trajectoires[:, -1], finales)
+
+        # Versés chaque mois plutôt qu'en début d'année, les versements rapportent moins
+        annuelles = simuler_resultats(resultats, personnes, epargnes, capitalisation="annuelle", nettes=False,
+                                      valeurs_finales=True)
+        brut_annuel = resultats["total_versement"] + resultats["interet_brut"]
+        positifs = resultats["total_versement"] > 0
+        self.assertTrue(np.all(annuelles[positifs] <= brut_annuel[positifs] * (1 + 1e-12)))
+
+
+class TestProjectionMonteCarlo(unittest.TestCase):
+
+    def setUp(self):
+        self.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        self.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+        self.duree_max = max(p.duree_epargne for p in self.personnes)
+
+    def test_taux_fixes_identiques_au_calcul_deterministe(self):
+        fixes = [Epargne(e.nom, e.taux_interet, e.fiscalite, e.duree_min, e.versement_max) for e in self.epargnes]
+        resultats = projection_monte_carlo(self.personnes, fixes, nb_trajectoires=50, graine=0)
+        attendus = suggestion_epargne_batch(self.personnes, fixes)
+        for q in ("p5", "p50", "p95"):
+            np.testing.assert_array_equal(resultats[f"montant_net_{q}"], attendus["montant_net_final"])
+        np.testing.assert_array_equal(resultats["probabilite_objectif"], attendus["objectif_atteint"])
+
+    def test_percentiles_et_probabilite_sur_les_trajectoires(self):
+        projection = ProjectionMonteCarlo(self.epargnes, self.duree_max, nb_trajectoires=2000, graine=1)
+        resultats = projection.evaluer(self.personnes, percentiles=(10, 90))
+        self.assertEqual(len(resultats), len(suggestion_epargne_batch(self.personnes, self.epargnes)))
+
+        for i in range(0, len(resultats), 37):
+            personne = self.personnes[resultats["indice_personne"][i]]
+            epargne = self.epargnes[resultats["indice_epargne"][i]]
+            # Capital net de chaque trajectoire, calculé directement
+            facteurs = projection.facteurs[resultats["indice_epargne"][i], personne.duree_epargne]
+            versement_annuel = resultats["total_versement"][i] / personne.duree_epargne
+            capitaux = (versement_annuel * facteurs - resultats["total_versement"][i]) * (1 - epargne.fiscalite) \
+                + resultats["total_versement"][i]
+            np.testing.assert_allclose([resultats["montant_net_p10"][i], resultats["montant_net_p90"][i]],
+                                       np.percentile(capitaux, [10, 90]), rtol=1e-9)
+            self.assertAlmostEqual(resultats["probabilite_objectif"][i], np.mean(capitaux >= personne.objectif))
+
+    def test_moyenne_des_facteurs(self):
+        # Taux indépendants d'une année à l'autre : le facteur moyen est celui du taux moyen
+        epargne = Epargne("Fonds", 0.05, 0.3, 0, None, volatilite=0.1)
+        facteurs = ProjectionMonteCarlo([epargne], 20, nb_trajectoires=20_000, graine=2).facteurs[0]
+        erreur_type = facteurs.std(axis=1) / np.sqrt(facteurs.shape[1])
+        attendus = calcul_interets_composes(1.0, 0.05, np.arange(21))
+        self.assertTrue(np.all(np.abs(facteurs.mean(axis=1) - attendus) <= 4 * erreur_type + 1e-12))
+
+    def test_reproductible_et_independant_des_blocs(self):
+        reference = ProjectionMonteCarlo(self.epargnes, 12, nb_trajectoires=500, graine=3)
+        par_petits_blocs = ProjectionMonteCarlo(self.epargnes, 12, nb_trajectoires=500, graine=3, taille_bloc=7)
+        autre_graine = ProjectionMonteCarlo(self.epargnes, 12, nb_trajectoires=500, graine=4)
+        np.testing.assert_array_equal(reference.facteurs, par_petits_blocs.facteurs)
+        self.assertFalse(np.array_equal(reference.facteurs, autre_graine.facteurs))
+
+        projection = ProjectionMonteCarlo(self.epargnes, self.duree_max, nb_trajectoires=500, graine=3)
+        entiers = projection.evaluer(self.personnes)
+        par_blocs = projection.evaluer(self.personnes, taille_bloc=3)
+        for col in entiers.colonnes:
+            np.testing.assert_array_equal(entiers[col], par_blocs[col])
+
+    def test_arguments_invalides(self):
+        projection = ProjectionMonteCarlo(self.epargnes, 5, nb_trajectoires=10, graine=0)
+        with self.assertRaises(ValueError):
+            projection.evaluer(self.personnes)
+        with self.assertRaises(ValueError):
+            ProjectionMonteCarlo(self.epargnes, self.duree_max, nb_trajectoires=10).evaluer(self.personnes, percentiles=[101])
+        with self.assertRaises(ValueError):
+            ProjectionMonteCarlo(self.epargnes, 5, nb_trajectoires=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
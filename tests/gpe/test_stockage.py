@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.gpe.core import (import_personnes, import_epargnes, save_personnes, save_epargnes, save_resultats,
+                          import_resultats, charger_personne_table, suggestion_epargne_batch)
+from src.gpe.stockage import ecrire_colonnes, lire_colonnes, ecrire_dataframe_binaire, EcrivainColonnes
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "src" / "gpe" / "data"
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+
+class TestColonnes(unittest.TestCase):
+
+    def test_aller_retour_types(self):
+        df = pd.DataFrame({
+            "nom": pd.Series(["Alice", None, "Claire"], dtype="str"),
+            "age": pd.array([22, None, 28], dtype="Int64"),
+            "entier": np.array([1, 2, 3]),
+            "montant": [1.5, np.nan, 3.0],
+            "atteint": [True, False, True],
+            "produit": pd.Categorical(["A", "B", "A"]),
+        })
+        with tempfile.TemporaryDirectory() as dossier:
+            ecrire_colonnes(df, str(Path(dossier) / "df.colonnes"))
+            relu = lire_colonnes(str(Path(dossier) / "df.colonnes"))
+            pd.testing.assert_frame_equal(relu, df)
+
+    def test_ecriture_par_blocs(self):
+        attendu = pd.DataFrame({
+            "nom": pd.Series(["Alice", "Bob", "Claire"], dtype=object),
+            "age": pd.array([22, None, 28], dtype="Int64"),
+            "entier": np.array([1, 2, 3]),
+            "montant": [1.5, np.nan, 3.0],
+        })
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = str(Path(dossier) / "df.colonnes")
+            with EcrivainColonnes(chemin, 3, {"nom": "<U6", "age": "int64", "entier": "int64", "montant": "float64"}) as ecrivain:
+                ecrivain.ecrire({"nom": np.array(["Alice", "Bob"]), "age": np.array([22, 0]), "entier": np.array([1, 2]),
+                                 "montant": np.array([1.5, np.nan])}, {"age": np.array([False, True])})
+                ecrivain.ecrire({"nom": np.array(["Claire"]), "age": np.array([28]), "entier": np.array([3]),
+                                 "montant": np.array([3.0])})
+            pd.testing.assert_frame_equal(lire_colonnes(chemin), attendu)
+            # Seules les colonnes avec des valeurs manquantes gardent un masque
+            self.assertEqual(sorted(f.name for f in Path(chemin).glob("*.na.npy")), ["1.na.npy"])
+
+            ecrivain = EcrivainColonnes(str(Path(dossier) / "court.colonnes"), 2, {"entier": "int64"})
+            with self.assertRaises(ValueError):
+                ecrivain.ecrire({"entier": np.arange(3)})
+            ecrivain.ecrire({"entier": np.arange(1)})
+            with self.assertRaises(ValueError):
+                ecrivain.fermer()
+
+    @unittest.skipIf(PYARROW_DISPONIBLE, "pyarrow est installé")
+    def test_parquet_sans_pyarrow(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            ecrit = ecrire_dataframe_binaire(pd.DataFrame({"a": [1.0]}), str(Path(dossier) / "df.parquet"))
+            self.assertTrue(ecrit.endswith(".colonnes"))
+            self.assertTrue(Path(ecrit).is_dir())
+
+
+class TestFormatsBinaires(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.personnes = import_personnes(str(DATA_DIR / "personnes.csv"))
+        cls.epargnes = import_epargnes(str(DATA_DIR / "epargnes.csv"))
+
+    def formats(self):
+        return [".colonnes", ".parquet"] if PYARROW_DISPONIBLE else [".colonnes"]
+
+    def test_personnes_et_epargnes(self):
+        for extension in self.formats():
+            with tempfile.TemporaryDirectory() as dossier:
+                fichier_personnes = str(Path(dossier) / f"personnes{extension}")
+                fichier_epargnes = str(Path(dossier) / f"epargnes{extension}")
+                save_personnes(self.personnes, fichier_personnes)
+                save_epargnes(self.epargnes, fichier_epargnes)
+
+                self.assertEqual([repr(p) for p in import_personnes(fichier_personnes)], [repr(p) for p in self.personnes])
+                self.assertEqual([repr(e) for e in import_epargnes(fichier_epargnes)], [repr(e) for e in self.epargnes])
+                self.assertEqual(len(charger_personne_table(fichier_personnes)), len(self.personnes))
+
+    def test_resultats(self):
+        resultats = suggestion_epargne_batch(self.personnes, self.epargnes)
+        for extension in self.formats() + [".csv"]:
+            with tempfile.TemporaryDirectory() as dossier:
+                fichier = str(Path(dossier) / f"resultats{extension}")
+                save_resultats(resultats, fichier)
+                relus = import_resultats(fichier)
+                for col, valeurs in resultats.colonnes.items():
+                    if extension == ".csv" and valeurs.dtype == np.float64:
+                        # Le texte ne garantit pas l'aller-retour exact des flottants
+                        np.testing.assert_allclose(relus[col], valeurs, rtol=1e-15, err_msg=col)
+                    else:
+                        np.testing.assert_array_equal(relus[col], valeurs, err_msg=col)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.gpe.core import import_personnes, import_epargnes, charger_personne_table
+from src.gpe.synth import generer_personnes, generer_epargnes, blocs_personnes, main
+
+try:
+    import openpyxl  # noqa: F401
+    OPENPYXL_DISPONIBLE = True
+except ImportError:
+    OPENPYXL_DISPONIBLE = False
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+
+class TestGenerateur(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.chemin = Path(self.dossier.name)
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def _nb_rejets(self, extension: str) -> int:
+        fichier = generer_personnes(str(self.chemin / f"personnes{extension}"), 2500, part_sales=0.02, taille_bloc=1000)
+        self.assertEqual(Path(fichier).suffix, extension)
+        rejets = []
+        personnes = import_personnes(fichier, rejets)
+        self.assertEqual(len(personnes) + len(rejets), 2500)
+        return len(rejets)
+
+    def test_tous_les_formats_importables(self):
+        # Les mêmes cellules sont sales dans tous les formats
+        nb_rejets = {self._nb_rejets(extension) for extension in (".csv", ".txt", ".colonnes")}
+        self.assertEqual(len(nb_rejets), 1)
+        self.assertGreater(nb_rejets.pop(), 0)
+
+        for extension in (".csv", ".colonnes"):
+            rejets = []
+            epargnes = import_epargnes(generer_epargnes(str(self.chemin / f"epargnes{extension}"), 300, part_sales=0.05), rejets)
+            self.assertEqual(len(epargnes) + len(rejets), 300)
+            self.assertTrue(any(e.versement_max is None for e in epargnes))
+            self.assertTrue(any(e.volatilite > 0 for e in epargnes))
+
+    @unittest.skipUnless(OPENPYXL_DISPONIBLE, "openpyxl n'est pas installé")
+    def test_format_xlsx(self):
+        self.assertEqual(self._nb_rejets(".xlsx"), self._nb_rejets(".csv"))
+
+    @unittest.skipUnless(PYARROW_DISPONIBLE, "pyarrow n'est pas installé")
+    def test_format_parquet(self):
+        self.assertEqual(self._nb_rejets(".parquet"), self._nb_rejets(".csv"))
+
+    @unittest.skipIf(OPENPYXL_DISPONIBLE, "openpyxl est installé")
+    def test_repli_sans_ecraser(self):
+        fichier = generer_personnes(str(self.chemin / "personnes.xlsx"), 100)
+        self.assertEqual(Path(fichier).name, "personnes.csv")
+        with self.assertRaises(FileExistsError):
+            generer_personnes(str(self.chemin / "personnes.xlsx"), 100)
+        with self.assertRaises(SystemExit):
+            main([str(self.chemin / "cli"), "--personnes", "100", "--formats", "csv", "xlsx"])
+
+    def test_valeurs_identiques_selon_le_format(self):
+        table_csv = charger_personne_table(generer_personnes(str(self.chemin / "p.csv"), 1500, taille_bloc=400))
+        table_colonnes = charger_personne_table(generer_personnes(str(self.chemin / "p.colonnes"), 1500, taille_bloc=400))
+        for col, valeurs in table_csv.colonnes.items():
+            np.testing.assert_array_equal(valeurs, table_colonnes[col])
+
+    def test_nombres_mal_formes_lus_par_le_nettoyage(self):
+        fichier = generer_personnes(str(self.chemin / "p.csv"), 3000, part_sales=0.2)
+        contenu = Path(fichier).read_text()
+        self.assertIn(",+", contenu)
+        self.assertIn("e+", contenu)
+        rejets = []
+        personnes = import_personnes(fichier, rejets)
+        self.assertTrue(all(isinstance(p.revenu_annuel, float) for p in personnes))
+        self.assertTrue(all(r.motif.startswith("Valeurs manquantes") for r in rejets))
+
+    def test_valeurs_invalides(self):
+        fichier = generer_personnes(str(self.chemin / "p.csv"), 500, part_sales=0.0, part_invalides=0.05)
+        with self.assertRaises(ValueError):
+            import_personnes(fichier)
+
+    def test_reproductible(self):
+        premier = Path(generer_personnes(str(self.chemin / "a.csv"), 1200, graine=7, taille_bloc=500)).read_bytes()
+        second = Path(generer_personnes(str(self.chemin / "b.csv"), 1200, graine=7, taille_bloc=500)).read_bytes()
+        autre = Path(generer_personnes(str(self.chemin / "c.csv"), 1200, graine=8, taille_bloc=500)).read_bytes()
+        self.assertEqual(premier, second)
+        self.assertNotEqual(premier, autre)
+
+    def test_distributions(self):
+        bloc = next(blocs_personnes(20_000))
+        self.assertTrue(np.all((bloc["age"] >= 18) & (bloc["age"] <= 85)))
+        self.assertTrue(np.all((bloc["duree_epargne"] >= 1) & (bloc["duree_epargne"] <= 40)))
+        self.assertAlmostEqual(np.mean(bloc["loyer"] == 0), 0.4, delta=0.02)
+        self.assertGreater(np.median(bloc["revenu_annuel"]), 25_000)
+        self.assertEqual(len(set(bloc["nom"].tolist())), 20_000)
+
+    def test_arguments_invalides(self):
+        with self.assertRaises(ValueError):
+            generer_personnes(str(self.chemin / "p.json"), 10)
+        with self.assertRaises(ValueError):
+            generer_personnes(str(self.chemin / "p.csv"), 10, part_sales=1.5)
+        with self.assertRaises(ValueError):
+            generer_personnes(str(self.chemin / "p.xlsx"), 2_000_000)
+
+    def test_cli(self):
+        self.assertEqual(main([str(self.chemin), "--personnes", "300", "--formats", "csv", "txt", "--charger"]), 0)
+        self.assertTrue((self.chemin / "personnes.txt").exists())
+        self.assertTrue((self.chemin / "epargnes.csv").exists())
+
+    def test_cli_tailles_invalides(self):
+        for option, valeur in (("--personnes", "0"), ("--epargnes", "-1"), ("--taille-bloc", "0"), ("--part-sales", "2")):
+            with self.subTest(option=option), self.assertRaises(SystemExit) as contexte:
+                main([str(self.chemin), option, valeur])
+            self.assertEqual(contexte.exception.code, 2)
+        self.assertEqual(list(self.chemin.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import timeit
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.gpe.utils import calcul_interets_composes, nettoyer_dataframe_personne, nettoyer_dataframe_epargne, TableFacteursCroissance
+
+try:
+    from hypothesis import given, strategies as st
+except ImportError:  # pragma: no cover - hypothesis est une dépendance de test optionnelle
+    given = None
+
+
+def calcul_par_boucle(versement_annuel, taux_annuel, duree_annees):
+    montant = 0
+    for _ in range(duree_annees):
+        montant = (montant + versement_annuel) * (1 + taux_annuel)
+    return montant
+
+
+class TestCalculInteretsComposes(unittest.TestCase):
+
+    def test_taux_nul(self):
+        self.assertEqual(calcul_interets_composes(1200, 0.0, 10), 12000)
+
+    def test_duree_nulle(self):
+        self.assertEqual(calcul_interets_composes(1200, 0.03, 0), 0)
+
+    def test_retourne_un_float_pour_des_scalaires(self):
+        self.assertIsInstance(calcul_interets_composes(1200, 0.03, 10), float)
+
+    def test_broadcasting(self):
+        versements = np.array([[1000.0], [2000.0]])
+        taux = np.array([0.0, 0.02, 0.05])
+        durees = np.array([5, 10, 40])
+        resultat = calcul_interets_composes(versements, taux, durees)
+
+        self.assertEqual(resultat.shape, (2, 3))
+        for i, v in enumerate(versements[:, 0]):
+            for j, (t, d) in enumerate(zip(taux, durees)):
+                self.assertAlmostEqual(resultat[i, j], calcul_par_boucle(v, t, int(d)), delta=1e-9 * resultat[i, j])
+
+    if given is not None:
+        @given(
+            versement=st.floats(min_value=0, max_value=1e7),
+            taux=st.one_of(st.just(0.0), st.floats(min_value=-0.5, max_value=0.5)),
+            duree=st.integers(min_value=0, max_value=100),
+        )
+        def test_egal_a_la_boucle(self, versement, taux, duree):
+            attendu = calcul_par_boucle(versement, taux, duree)
+            self.assertTrue(np.isclose(calcul_interets_composes(versement, taux, duree), attendu, rtol=1e-10, atol=1e-6))
+
+
+class TestTableFacteursCroissance(unittest.TestCase):
+
+    def test_capital_lineaire_en_versement(self):
+        table = TableFacteursCroissance()
+        for versement, taux, duree in [(1200.0, 0.03, 10), (4740.0, 0.0175, 36), (500.0, 0.0, 6)]:
+            self.assertEqual(versement * table.facteur(taux, duree), calcul_interets_composes(versement, taux, duree))
+
+    def test_succes_et_echecs(self):
+        table = TableFacteursCroissance()
+        grille = table.facteurs(np.array([0.02, 0.03]), np.array([5, 10, 20]))
+        self.assertEqual(grille.shape, (2, 3))
+        self.assertEqual((table.succes, table.echecs), (0, 6))
+        table.facteurs(np.array([0.03]), np.array([10, 40]))
+        self.assertEqual((table.succes, table.echecs), (1, 7))
+        self.assertEqual(table.facteur(0.02, 20), grille[0, 2])
+
+    def test_couples_repetes_comptes_une_fois(self):
+        table = TableFacteursCroissance()
+        grille = table.facteurs(np.array([0.03, 0.02, 0.03]), np.array([10, 10, 5]))
+        self.assertEqual(grille.shape, (3, 3))
+        self.assertEqual((table.succes, table.echecs), (0, 4))
+        np.testing.assert_array_equal(grille[0], grille[2])
+        np.testing.assert_array_equal(grille[:, 0], grille[:, 1])
+        self.assertEqual(grille[1, 2], calcul_interets_composes(1.0, 0.02, 5))
+
+    def test_facteur_sans_passer_par_la_grille(self):
+        # suggestion_epargne appelle facteur() pour chaque produit de chaque personne : un succès
+        # doit rester une simple consultation du dictionnaire, sans np.unique ni grille
+        table = TableFacteursCroissance()
+        grille = table.facteurs(np.array([0.02]), np.array([20]))
+        with mock.patch.object(TableFacteursCroissance, "facteurs", side_effect=AssertionError("facteurs appelé")):
+            self.assertEqual(table.facteur(0.02, 20), grille[0, 0])
+            self.assertEqual(table.facteur(0.05, 3), calcul_interets_composes(1.0, 0.05, 3))
+        self.assertEqual((table.succes, table.echecs), (1, 2))
+
+        # Un succès coûte bien moins qu'un calcul du facteur
+        succes = min(timeit.repeat(lambda: table.facteur(0.02, 20), number=2000, repeat=5))
+        calcul = min(timeit.repeat(lambda: calcul_interets_composes(1.0, 0.02, 20), number=2000, repeat=5))
+        self.assertLess(succes, calcul)
+
+    def test_eviction_lru(self):
+        table = TableFacteursCroissance(taille_max=2)
+        table.facteur(0.01, 1)
+        table.facteur(0.02, 1)
+        table.facteur(0.01, 1)
+        table.facteur(0.03, 1)
+        self.assertEqual(len(table), 2)
+        table.facteur(0.01, 1)
+        self.assertEqual(table.echecs, 3)
+        table.facteur(0.02, 1)
+        self.assertEqual(table.echecs, 4)
+
+
+class TestNettoyage(unittest.TestCase):
+
+    def test_nettoyer_dataframe_personne(self):
+        df = pd.DataFrame({
+            "nom": ["Alice", "None", "Claire"],
+            "age": ["22", "35.7", ""],
+            "revenu_annuel": ["21000", "None", " 1e4 "],
+            "loyer": [400, 800, 750],
+            "depenses_mensuelles": ["300", "", "700"],
+        }, dtype=object)
+        df_clean = nettoyer_dataframe_personne(df)
+
+        self.assertTrue(pd.isna(df_clean["nom"].iloc[1]))
+        self.assertEqual(str(df_clean["age"].dtype), "Int64")
+        self.assertEqual(df_clean["age"].iloc[1], 35)
+        self.assertTrue(pd.isna(df_clean["age"].iloc[2]))
+        self.assertEqual(df_clean["revenu_annuel"].dtype, "float64")
+        self.assertEqual(list(df_clean["revenu_annuel"].fillna(-1)), [21000.0, -1, 10000.0])
+        self.assertTrue(pd.isna(df_clean["depenses_mensuelles"].iloc[1]))
+
+    def test_valeur_invalide_nommee(self):
+        df = pd.DataFrame({
+            "taux_interet": ["0.03", "trois"],
+            "fiscalite": [0.3, 0.3],
+            "duree_min": [0, 4],
+            "versement_max": [None, 1000.0],
+        })
+        with self.assertRaisesRegex(ValueError, "'trois'.*'taux_interet'"):
+            nettoyer_dataframe_epargne(df)
+
+    def test_duree_min_entiere_sans_valeur_manquante(self):
+        df = pd.DataFrame({
+            "taux_interet": [0.03], "fiscalite": [0.3], "duree_min": ["4.0"], "versement_max": [None],
+        })
+        self.assertEqual(nettoyer_dataframe_epargne(df)["duree_min"].dtype, int)
+
+
+if __name__ == '__main__':
+    unittest.main()